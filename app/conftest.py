@@ -1,6 +1,11 @@
 pytest_plugins = [
     "core.tests.fixtures.pick_pool_user",
+    "core.tests.fixtures.query_budget",
+    "core.tests.fixtures.replica",
+    "nfl.tests.fixtures.cache",
+    "nfl.tests.fixtures.fake_redis",
     "nfl.tests.fixtures.game",
+    "nfl.tests.fixtures.huey",
     "nfl.tests.fixtures.pick",
     "nfl.tests.fixtures.user",
     "nfl.tests.fixtures.week",
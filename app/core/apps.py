@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = "core"
+
+    def ready(self):
+        # Connect the connection counters and task stats
+        from core import db, tasks  # noqa: F401
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from asgiref.sync import SyncToAsync, ThreadSensitiveContext
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+
+
+class ExecutorPool(object):
+    """Single thread executors kept alive between requests.
+
+    Django opens the database connections per thread, so reusing the thread
+    of an executor reuses its persistent connections as well. At most
+    ``size`` idle executors are kept, executors beyond that close their
+    connections and stop.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.idle: List[ThreadPoolExecutor] = []
+
+    def acquire(self) -> ThreadPoolExecutor:
+        if self.idle:
+            return self.idle.pop()
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="asgi-db")
+
+    def release(self, executor: ThreadPoolExecutor):
+        if len(self.idle) < self.size:
+            self.idle.append(executor)
+            return
+        executor.submit(connections.close_all)
+        executor.shutdown(wait=False)
+
+
+class PooledThreadSensitiveContext(ThreadSensitiveContext):
+    """Thread sensitive context running its sync code on a given executor."""
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        super().__init__()
+        self.executor = executor
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        if self.token:
+            SyncToAsync.context_to_thread_executor[self] = self.executor
+        return self
+
+    async def __aexit__(self, exc, value, tb):
+        # The executor goes back to the pool instead of being shut down
+        SyncToAsync.context_to_thread_executor.pop(self, None)
+        await super().__aexit__(exc, value, tb)
+
+
+class PooledThreadsASGIHandler(ASGIHandler):
+    """ASGI handler running the sync code of requests on pooled threads.
+
+    Django's handler starts a new thread for the sync code of every request,
+    e.g. the ORM calls of async views, which opens a new database connection
+    per request no matter what ``CONN_MAX_AGE`` is. Up to
+    ``ASGI_DB_THREADS`` threads are reused per worker process here.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executors = ExecutorPool(settings.ASGI_DB_THREADS)
+
+    async def __call__(self, scope, receive, send):
+        executor = self.executors.acquire()
+        try:
+            async with PooledThreadSensitiveContext(executor):
+                await super().__call__(scope, receive, send)
+        finally:
+            self.executors.release(executor)
@@ -0,0 +1,89 @@
+import logging
+import threading
+from collections import defaultdict
+from functools import wraps
+from typing import Dict
+
+from django.core.signals import request_started
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from huey.contrib.djhuey import HUEY
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats(object):
+    """Number of opened and reused database connections of this process.
+
+    A connection is reused if it is still open when a request or task of
+    the same thread starts, with ``CONN_MAX_AGE`` nearly all connections
+    should be reused.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened: Dict[str, int] = defaultdict(int)
+        self.reused: Dict[str, int] = defaultdict(int)
+
+    def count(self, counter: Dict[str, int], alias: str):
+        with self.lock:
+            counter[alias] += 1
+
+    def reset(self):
+        with self.lock:
+            self.opened.clear()
+            self.reused.clear()
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {"opened": dict(self.opened), "reused": dict(self.reused)}
+
+
+connection_stats = ConnectionStats()
+
+
+def count_opened(sender, connection, **kwargs):
+    connection_stats.count(connection_stats.opened, connection.alias)
+
+
+def count_reused(**kwargs):
+    """Count the connections of this thread which are still open, connected
+    after Django's own ``close_old_connections`` handler of requests."""
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None:
+            connection_stats.count(connection_stats.reused, conn.alias)
+
+
+def in_transaction() -> bool:
+    return any(conn.in_atomic_block for conn in connections.all(initialized_only=True))
+
+
+connection_created.connect(count_opened)
+request_started.connect(count_reused)
+
+
+def reuse_connections(fn):
+    """Recycle the connections of the worker thread around a huey task.
+
+    Like ``close_db`` of huey, but counts reused connections. Immediate
+    tasks run within a request or a test, and a task called within a
+    transaction must keep its connection, so their connections are left
+    alone.
+    """
+
+    @wraps(fn)
+    def inner(*args, **kwargs):
+        recycle = not HUEY.immediate and not in_transaction()
+        if recycle:
+            close_old_connections()
+            count_reused()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if recycle:
+                close_old_connections()
+                logger.debug(
+                    f"Connections of {fn.__name__}: {connection_stats.as_dict()}"
+                )
+
+    return inner
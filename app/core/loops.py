@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from asgiref.sync import AsyncToSync, SyncToAsync
+
+logger = logging.getLogger(__name__)
+
+
+class ManagedLoop(object):
+    """Event loop of a worker thread, running in a thread of its own.
+
+    ``async_to_sync`` starts a new loop in a new thread for every call, so
+    clients bound to a loop like HTTP connection pools can't be reused
+    between calls. ``run`` runs the coroutines of all calls of the worker
+    thread on this one loop instead. Like with ``async_to_sync`` the sync
+    code called by the coroutines, e.g. ORM queries, runs in the worker
+    thread and uses its database connections.
+
+    Objects shared by the coroutines, see ``shared``, are closed with the
+    loop.
+    """
+
+    registry: Dict[asyncio.AbstractEventLoop, "ManagedLoop"] = {}
+    local = threading.local()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.objects: Dict[Hashable, Any] = {}
+        self.thread = threading.Thread(
+            target=self.loop.run_forever,
+            name=f"loop-{threading.current_thread().name}",
+            daemon=True,
+        )
+        self.thread.start()
+        self.registry[self.loop] = self
+
+    @classmethod
+    def for_thread(cls) -> "ManagedLoop":
+        """Managed loop of the current thread, started on first use."""
+        managed = getattr(cls.local, "managed", None)
+        if managed is None or managed.loop.is_closed():
+            managed = cls.local.managed = cls()
+        return managed
+
+    @classmethod
+    def current(cls) -> Optional["ManagedLoop"]:
+        """Managed loop running the current coroutine, if any."""
+        try:
+            return cls.registry.get(asyncio.get_running_loop())
+        except RuntimeError:
+            return None
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run the coroutine function ``fn`` on this loop and wait for it."""
+        # async_to_sync schedules the coroutine on the loop of the outer
+        # sync_to_async call if there is one, pretend this loop is it
+        threadlocal = SyncToAsync.threadlocal
+        outer = (
+            getattr(threadlocal, "main_event_loop", None),
+            getattr(threadlocal, "main_event_loop_pid", None),
+        )
+        threadlocal.main_event_loop = self.loop
+        threadlocal.main_event_loop_pid = os.getpid()
+        try:
+            return AsyncToSync(fn)(*args, **kwargs)
+        finally:
+            threadlocal.main_event_loop, threadlocal.main_event_loop_pid = outer
+
+    def shared(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Object of this loop created by ``factory`` on first use.
+
+        Objects having an ``aclose`` coroutine are closed with the loop.
+        Must be called on this loop.
+        """
+        if key not in self.objects:
+            self.objects[key] = factory()
+        return self.objects[key]
+
+    async def _shutdown(self):
+        for key, obj in self.objects.items():
+            if hasattr(obj, "aclose"):
+                try:
+                    await obj.aclose()
+                except Exception as e:
+                    logger.warning(f"Could not close {key}: {e}")
+        self.objects.clear()
+        tasks = [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.loop.shutdown_asyncgens()
+        await self.loop.shutdown_default_executor()
+
+    def close(self):
+        """Close the shared objects, stop the loop and its thread."""
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.registry.pop(self.loop, None)
+
+
+def run_sync(fn: Callable, *args, **kwargs) -> Any:
+    """Like ``async_to_sync(fn)(*args, **kwargs)`` on the managed loop of the
+    current thread."""
+    return ManagedLoop.for_thread().run(fn, *args, **kwargs)
+
+
+def close_thread_loop():
+    """Close the managed loop of the current thread if it has one."""
+    managed = getattr(ManagedLoop.local, "managed", None)
+    if managed is not None:
+        managed.close()
+        ManagedLoop.local.managed = None
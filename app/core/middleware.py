@@ -0,0 +1,238 @@
+import json
+import logging
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from core.routers import STICKY_COOKIE, RoutingState, replica_reads
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise middleware which keeps async requests on the event loop.
+
+    WhiteNoise itself is sync only, so Django would run every request of an
+    async view in a thread for the whole duration of the response. Only the
+    static file lookup is moved to a thread here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        response = await sync_to_async(self.process_request)(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+
+class RequestStats(object):
+    """Query count, DB time and render time collected during a request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.connections_opened = 0
+        self.view = None
+        self.query_budget = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.query_budget is not None and self.queries > self.query_budget
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "view": self.view,
+            "queries": self.queries,
+            "query_budget": self.query_budget,
+            "connections_opened": self.connections_opened,
+            "db_ms": round(self.db_time * 1000, 2),
+            "render_ms": round(self.render_time * 1000, 2),
+            "total_ms": round(self.total_time * 1000, 2),
+        }
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+request_stats_recorded = Signal()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request."""
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def count_opened_connection(connection, **kwargs):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.connections_opened += 1
+
+
+connection_created.connect(install_query_recorder)
+connection_created.connect(count_opened_connection)
+
+
+class RequestStatsMiddleware(object):
+    """Record query count, DB time, render time and latency of each request.
+
+    With ``DEBUG`` enabled the numbers are sent as ``Server-Timing`` and
+    ``X-Query-Count`` headers, otherwise they are logged as JSON. Views can
+    declare the maximum number of queries they may run with a
+    ``query_budget`` attribute, exceeding it is logged as a warning.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    def start(self, request) -> Tuple[RequestStats, Token]:
+        for conn in connections.all():
+            install_query_recorder(conn)
+        stats = RequestStats()
+        return stats, _request_stats.set(stats)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _request_stats.get()
+        if stats is not None:
+            view = getattr(view_func, "view_class", view_func)
+            stats.view = f"{view.__module__}.{view.__qualname__}"
+            stats.query_budget = getattr(view, "query_budget", None)
+
+    def process_template_response(self, request, response):
+        stats = _request_stats.get()
+        if stats is not None:
+            render_start = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time += time.perf_counter() - render_start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, stats: RequestStats):
+        stats.total_time = time.perf_counter() - stats.start
+        if stats.over_budget:
+            logger.warning(
+                f"{stats.view} ran {stats.queries} queries, "
+                f"its budget is {stats.query_budget}"
+            )
+        request_stats_recorded.send(sender=self.__class__, request=request, stats=stats)
+        if settings.DEBUG:
+            response["X-Query-Count"] = stats.queries
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"db;dur={stats.db_time * 1000:.2f}",
+                    f"render;dur={stats.render_time * 1000:.2f}",
+                    f"total;dur={stats.total_time * 1000:.2f}",
+                ]
+            )
+        else:
+            logger.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        **stats.as_dict(),
+                    }
+                )
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware(object):
+    """Route the reads of a request to the database replicas.
+
+    Once a request wrote to the primary, its remaining reads and all reads
+    of the same browser within ``REPLICA_STICKY_SECONDS`` use the primary,
+    so users always see their own changes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_reads(STICKY_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with replica_reads(STICKY_COOKIE in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def finish(self, response, state: RoutingState):
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,16 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """Verify that the current user is authenticated within async views."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(
+                request.get_full_path(),
+                self.get_login_url(),
+                self.get_redirect_field_name(),
+            )
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
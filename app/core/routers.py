@@ -0,0 +1,57 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+STICKY_COOKIE = "use_primary"
+
+
+class RoutingState(object):
+    """Whether reads of the current request have to use the primary."""
+
+    def __init__(self, use_primary: bool = False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+_routing_state: ContextVar[Optional[RoutingState]] = ContextVar(
+    "routing_state", default=None
+)
+
+
+@contextmanager
+def replica_reads(use_primary: bool = False) -> Iterator[RoutingState]:
+    """Send the reads within this context to the replicas until a write."""
+    state = RoutingState(use_primary)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+class ReplicaRouter(object):
+    """Send reads to one of the ``DATABASE_REPLICAS`` and writes to default.
+
+    Only reads within ``replica_reads`` use replicas, e.g. the reads of web
+    requests, so background tasks always see the latest data. After the
+    first write all reads of the context use the primary as well.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state.use_primary or not settings.DATABASE_REPLICAS:
+            return "default"
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.use_primary = state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
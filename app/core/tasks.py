@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from huey import crontab
+from huey.contrib.djhuey import HUEY, periodic_task
+from huey.signals import (
+    SIGNAL_COMPLETE,
+    SIGNAL_ENQUEUED,
+    SIGNAL_ERROR,
+    SIGNAL_EXECUTING,
+)
+
+from core.loops import close_thread_loop
+
+logger = logging.getLogger(__name__)
+
+# Priorities of the PriorityRedisHuey queue, ingestion must never wait for
+# maintenance work like backfills and cache rebuilds.
+PRIORITY_HIGH = 100
+PRIORITY_DEFAULT = 50
+PRIORITY_MAINTENANCE = 0
+
+
+class TaskStats(object):
+    """Runs, skips, errors, run and wait times of the huey tasks of this
+    process keyed by task name.
+
+    Every run and skip is logged as JSON as well.
+    """
+
+    fields = ("runs", "skips", "coalesced", "errors", "run_time", "wait_time")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tasks: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(self.fields, 0)
+        )
+        self.running: Dict[str, float] = {}
+
+    def add(self, name: str, **values: float):
+        with self.lock:
+            for field, value in values.items():
+                self.tasks[name][field] += value
+
+    def reset(self):
+        with self.lock:
+            self.tasks.clear()
+            self.running.clear()
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {name: dict(stats) for name, stats in self.tasks.items()}
+
+
+task_stats = TaskStats()
+
+
+def log_task(name: str, status: str, **extra):
+    logger.info(json.dumps({"task": name, "status": status, **extra}))
+
+
+@HUEY.signal(SIGNAL_ENQUEUED)
+def record_enqueued(signal, task, *args, **kwargs):
+    HUEY.put(f"enqueued:{task.id}", time.time())
+
+
+@HUEY.signal(SIGNAL_EXECUTING)
+def record_executing(signal, task, *args, **kwargs):
+    enqueued = HUEY.get(f"enqueued:{task.id}")
+    wait_time = max(time.time() - enqueued, 0) if enqueued is not None else 0
+    task_stats.add(task.name, wait_time=wait_time)
+    with task_stats.lock:
+        task_stats.running[task.id] = time.perf_counter()
+
+
+@HUEY.signal(SIGNAL_COMPLETE, SIGNAL_ERROR)
+def record_finished(signal, task, *args, **kwargs):
+    with task_stats.lock:
+        start = task_stats.running.pop(task.id, None)
+    run_time = time.perf_counter() - start if start is not None else 0
+    failed = signal == SIGNAL_ERROR
+    task_stats.add(task.name, runs=1, errors=int(failed), run_time=run_time)
+    log_task(
+        task.name, "error" if failed else "complete", run_ms=round(run_time * 1000, 2)
+    )
+
+
+@HUEY.on_shutdown()
+def close_worker_loop():
+    """Close the managed event loop and HTTP pools of a stopping worker."""
+    close_thread_loop()
+
+
+@periodic_task(crontab(minute="*/15"), priority=PRIORITY_MAINTENANCE)
+def report_task_stats():
+    """Log the summed up stats of all tasks of this consumer."""
+    logger.info(json.dumps({"task_stats": task_stats.as_dict()}))
+
+
+# Deletes the lock KEYS[1] only if it still holds the token ARGV[1]
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class TaskLock(object):
+    """Lock shared by all huey workers, stored in the cache.
+
+    The lock expires after ``timeout`` seconds, so a crashed worker can't
+    block a task forever. A lock is only released by its owner, on Redis
+    the check and the delete are a single script, so a lock which expired
+    and was taken by another worker in the meantime is kept.
+    """
+
+    def __init__(self, key: str, timeout: int):
+        self.key = f"lock:{key}"
+        self.timeout = timeout
+        # The Redis cache stores integers as is, so scripts can compare them
+        self.token = uuid.uuid4().int
+
+    def acquire(self) -> bool:
+        return cache.add(self.key, self.token, self.timeout)
+
+    def release(self):
+        try:
+            client = get_redis_connection("default")
+        except NotImplementedError:
+            # Local caches aren't shared with other workers
+            if cache.get(self.key) == self.token:
+                cache.delete(self.key)
+            return
+        release = client.register_script(RELEASE_LOCK_SCRIPT)
+        release(keys=[cache.make_key(self.key)], args=[self.token])
+
+
+def locked(
+    key: Optional[Callable[..., str]] = None, coalesce: bool = False, timeout: int = 600
+):
+    """Run a task only if no run with the same lock key is in progress.
+
+    Parameters
+    ----------
+    key : Callable[..., str], optional
+        Builds the lock key from the task's arguments, defaults to the task
+        name only
+    coalesce : bool
+        Skip the run if locked, but let the running one run once more after
+        it finished, e.g. because its data changed in the meantime
+    timeout : int
+        Seconds until the lock expires
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs) -> Any:
+            lock_key = fn.__name__
+            if key is not None:
+                lock_key = f"{lock_key}:{key(*args, **kwargs)}"
+            rerun_key = f"rerun:{lock_key}"
+            if coalesce:
+                cache.set(rerun_key, 1, timeout)
+            lock = TaskLock(lock_key, timeout)
+            res = None
+            ran = False
+            while lock.acquire():
+                ran = True
+                try:
+                    cache.delete(rerun_key)
+                    res = fn(*args, **kwargs)
+                finally:
+                    lock.release()
+                if not (coalesce and cache.get(rerun_key)):
+                    break
+            if not ran:
+                # The run holding the lock takes care of a coalesced run
+                task_stats.add(fn.__name__, **{"coalesced" if coalesce else "skips": 1})
+                log_task(
+                    fn.__name__, "coalesced" if coalesce else "skipped", lock=lock_key
+                )
+            return res
+
+        return inner
+
+    return decorator
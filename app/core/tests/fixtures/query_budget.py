@@ -0,0 +1,20 @@
+import pytest
+
+from core.middleware import request_stats_recorded
+
+
+@pytest.fixture(autouse=True)
+def query_budget():
+    """Fail tests as soon as a view runs more queries than its budget."""
+
+    def check_budget(sender, request, stats, **kwargs):
+        if stats.over_budget:
+            pytest.fail(
+                f"{stats.view} ran {stats.queries} queries for {request.path}, "
+                f"its budget is {stats.query_budget}",
+                pytrace=False,
+            )
+
+    request_stats_recorded.connect(check_budget)
+    yield
+    request_stats_recorded.disconnect(check_budget)
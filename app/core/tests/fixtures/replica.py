@@ -0,0 +1,22 @@
+import pytest
+from django.conf import settings
+from django.db import connections
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Add a separate ``replica`` test database to check the routing."""
+    default = connections["default"].settings_dict
+    test_name = None
+    if default["ENGINE"] != "django.db.backends.sqlite3":
+        test_name = f"{default['TEST']['NAME'] or 'test_' + default['NAME']}_replica"
+    settings.DATABASES.setdefault(
+        "replica", {**default, "TEST": {**default["TEST"], "NAME": test_name}}
+    )
+
+
+@pytest.fixture
+def replica(settings):
+    """Use the ``replica`` database as only read replica."""
+    settings.DATABASE_REPLICAS = ["replica"]
+    return "replica"
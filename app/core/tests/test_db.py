@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from core.asgi import ExecutorPool
+from core.db import connection_stats, reuse_connections
+from django.core.signals import request_started
+from nfl.models import Team
+from pick_pool.asgi import application
+
+
+class TestExecutorPool:
+    def test_reuse(self):
+        pool = ExecutorPool(1)
+        first, second = pool.acquire(), pool.acquire()
+        assert first is not second
+        pool.release(first)
+        pool.release(second)
+        assert second._shutdown
+        assert pool.acquire() is first
+
+
+@pytest.mark.django_db
+class TestPooledThreadsASGIHandler:
+    def test_threads_reused(self):
+        threads = set()
+
+        def record_thread(**kwargs):
+            threads.add(threading.get_ident())
+
+        async def requests():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://testserver"
+            ) as client:
+                for _i in range(3):
+                    response = await client.get("/login/")
+                    assert response.status_code == 200
+
+        request_started.connect(record_thread)
+        try:
+            asyncio.run(requests())
+        finally:
+            request_started.disconnect(record_thread)
+        assert len(threads) == 1
+        assert threading.get_ident() not in threads
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+class TestReuseConnections:
+    def test_task(self, huey_immediate):
+        huey_immediate.immediate = False
+
+        @reuse_connections
+        def task():
+            return Team.objects.count()
+
+        assert task() == task()
+        connection_stats.reset()
+        task()
+        stats = connection_stats.as_dict()
+        assert stats["opened"] == {}
+        assert stats["reused"]["default"] == 1
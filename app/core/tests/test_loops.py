@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import sync_to_async
+from core.loops import ManagedLoop, close_thread_loop, run_sync
+
+
+class Resource(object):
+    closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def managed_loop():
+    """Fixture closing the managed loop of the test's thread afterwards."""
+    yield ManagedLoop.for_thread()
+    close_thread_loop()
+
+
+class TestManagedLoop:
+    def test_one_loop_per_thread(self, managed_loop):
+        async def running_loop():
+            return asyncio.get_running_loop()
+
+        assert run_sync(running_loop) is managed_loop.loop
+        assert run_sync(running_loop) is managed_loop.loop
+        other = []
+
+        def run_in_thread():
+            other.append(run_sync(running_loop))
+            close_thread_loop()
+
+        thread = threading.Thread(target=run_in_thread)
+        thread.start()
+        thread.join()
+        assert other[0] is not managed_loop.loop
+
+    def test_sync_code_in_calling_thread(self, managed_loop):
+        async def sync_thread():
+            return await sync_to_async(threading.get_ident)()
+
+        assert run_sync(sync_thread) == threading.get_ident()
+
+    def test_exceptions(self, managed_loop):
+        async def fail():
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError, match="failed"):
+            run_sync(fail)
+
+    def test_close(self, managed_loop):
+        async def shared():
+            return ManagedLoop.current().shared("resource", Resource)
+
+        resource = run_sync(shared)
+        assert run_sync(shared) is resource
+        close_thread_loop()
+        assert resource.closed
+        assert managed_loop.loop.is_closed()
+        assert not managed_loop.thread.is_alive()
+        assert ManagedLoop.for_thread() is not managed_loop
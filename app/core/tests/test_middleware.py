@@ -0,0 +1,43 @@
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+from nfl.views import ScheduleView, StandingsView
+
+
+@pytest.mark.django_db
+class TestRequestStatsMiddleware:
+    def test_debug_headers(self, client, nfl_games, user, settings):
+        settings.DEBUG = True
+        client.force_login(user)
+        response = client.get(reverse("nfl:schedule-week", args=(2019, 5)))
+        assert int(response["X-Query-Count"]) == ScheduleView.query_budget
+        timings = dict(
+            timing.split(";dur=") for timing in response["Server-Timing"].split(", ")
+        )
+        assert set(timings) == {"db", "render", "total"}
+        assert float(timings["total"]) >= float(timings["render"]) > 0
+        assert float(timings["db"]) > 0
+
+    def test_structured_log(self, client, nfl_games, user, caplog):
+        client.force_login(user)
+        url = reverse("nfl:standings-week", args=(2019, 5))
+        with caplog.at_level(logging.INFO, logger="core.middleware"):
+            response = client.get(url)
+        assert "X-Query-Count" not in response
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["view"] == "nfl.views.StandingsView"
+        assert record["path"] == url
+        assert record["status"] == 200
+        assert record["queries"] == StandingsView.query_budget
+        assert record["query_budget"] == StandingsView.query_budget
+        assert record["render_ms"] > 0
+        assert record["connections_opened"] == 0
+
+    def test_query_budget_exceeded(self, client, nfl_games, user, monkeypatch, caplog):
+        monkeypatch.setattr(StandingsView, "query_budget", 2)
+        client.force_login(user)
+        with pytest.raises(pytest.fail.Exception, match="its budget is 2"):
+            client.get(reverse("nfl:standings-week", args=(2019, 5)))
+        assert "nfl.views.StandingsView ran 5 queries" in caplog.text
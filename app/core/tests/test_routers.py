@@ -0,0 +1,59 @@
+from datetime import UTC, datetime
+
+import pytest
+from core.routers import STICKY_COOKIE, replica_reads
+from django.urls import reverse
+from nfl.models import Year
+
+
+def make_year(db_alias: str, value: int = 2019) -> Year:
+    return Year.objects.using(db_alias).create(
+        value=value,
+        start_timestamp=datetime(value, 8, 1, tzinfo=UTC),
+        end_timestamp=datetime(value + 1, 2, 1, tzinfo=UTC),
+    )
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+class TestReplicaRouter:
+    def test_reads_use_replica(self, replica):
+        make_year("replica")
+        assert not Year.objects.exists()
+        with replica_reads():
+            assert Year.objects.get().value == 2019
+
+    def test_without_replicas(self, settings):
+        settings.DATABASE_REPLICAS = []
+        make_year("replica")
+        with replica_reads():
+            assert not Year.objects.exists()
+
+    def test_write_sticks_to_primary(self, replica):
+        make_year("replica")
+        with replica_reads() as state:
+            assert Year.objects.count() == 1
+            Year.objects.create(
+                value=2020,
+                start_timestamp=datetime(2020, 8, 1, tzinfo=UTC),
+                end_timestamp=datetime(2021, 2, 1, tzinfo=UTC),
+            )
+            assert state.wrote
+            assert list(Year.objects.values_list("value", flat=True)) == [2020]
+
+    def test_sticky_cookie(self, client, replica, django_user_model):
+        user = django_user_model.objects.create_user(
+            username="player", password="secret"
+        )
+        user.save(using="replica")
+        response = client.post(
+            reverse("core:login"), {"username": "player", "password": "secret"}
+        )
+        assert response.status_code == 302
+        assert response.cookies[STICKY_COOKIE]["max-age"] == 10
+
+        # The session only exists on the primary
+        response = client.get(reverse("core:profile"))
+        assert response.status_code == 200
+        del client.cookies[STICKY_COOKIE]
+        response = client.get(reverse("core:profile"))
+        assert response.status_code == 302
@@ -0,0 +1,98 @@
+import logging
+
+import pytest
+from core.tasks import TaskLock, locked, task_stats
+from django.core.cache import cache
+from fakeredis import FakeConnection, FakeServer
+from huey.contrib.djhuey import HUEY
+
+
+@HUEY.task()
+def add(a, b):
+    return a + b
+
+
+class TestLocked:
+    def test_skip(self):
+        calls = []
+
+        @locked(key=lambda season: season)
+        def job(season):
+            calls.append(season)
+
+        task_stats.reset()
+        lock = TaskLock("job:2019", 60)
+        assert lock.acquire()
+        job(2019)
+        job(2020)
+        lock.release()
+        job(2019)
+        assert calls == [2020, 2019]
+        assert task_stats.as_dict()["job"]["skips"] == 1
+
+    def test_coalesce(self):
+        calls = []
+
+        @locked(coalesce=True)
+        def job():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                # Started while the first run is in progress
+                job()
+
+        task_stats.reset()
+        job()
+        assert calls == [0, 1]
+        assert task_stats.as_dict()["job"]["coalesced"] == 1
+
+    def test_lock_expires(self, locmem_cache):
+        lock = TaskLock("job", 60)
+        assert lock.acquire()
+        assert not TaskLock("job", 60).acquire()
+        locmem_cache.delete(lock.key)
+        other = TaskLock("job", 60)
+        assert other.acquire()
+        # Releasing an expired lock keeps the lock of others
+        lock.release()
+        assert not TaskLock("job", 60).acquire()
+
+    @pytest.fixture
+    def redis_cache(self, settings):
+        """The Redis cache backend on an in-memory redis server."""
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": "redis://localhost",
+                "OPTIONS": {
+                    "CONNECTION_POOL_KWARGS": {
+                        "connection_class": FakeConnection,
+                        "server": FakeServer(),
+                    }
+                },
+            }
+        }
+        return cache
+
+    def test_release_on_redis(self, redis_cache):
+        lock = TaskLock("job", 60)
+        assert lock.acquire()
+        redis_cache.delete(lock.key)
+        other = TaskLock("job", 60)
+        assert other.acquire()
+        lock.release()
+        assert not TaskLock("job", 60).acquire()
+        other.release()
+        assert TaskLock("job", 60).acquire()
+
+
+class TestTaskStats:
+    def test_signals(self, caplog):
+        task_stats.reset()
+        with caplog.at_level(logging.INFO, logger="core.tasks"):
+            assert add(1, 2).get() == 3
+        stats = task_stats.as_dict()["add"]
+        assert stats["runs"] == 1
+        assert stats["errors"] == 0
+        assert stats["run_time"] > 0
+        assert stats["wait_time"] >= 0
+        assert '"task": "add", "status": "complete"' in caplog.text
@@ -1,32 +1,88 @@
 import asyncio
 import logging
-from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from asgiref.sync import sync_to_async
-from django.db.models import Q
+from core.loops import ManagedLoop, run_sync
 from django.db.models.base import Model
+from django.dispatch import Signal
 
 from nfl.defines import SeasonType
+from nfl.live import game_events, publish_events
 from nfl.models import Game, Week, Year
+from nfl.ratelimit import RateLimitedTransport
 
 logger = logging.getLogger("EspnApiClient")
 
 
+class EspnApiError(Exception):
+    """Request to the ESPN API failed."""
+
+
+# Sent after an ingestion run stored games whose scores changed or which
+# became final, with the lists ``scored_games`` and ``finalized_games``.
+games_updated = Signal()
+
+
 class EspnApiClient(object):
+    """Import seasons and games from the ESPN API and update live scores.
+
+    The sync methods run their coroutines on the managed event loop of the
+    calling thread, see ``core.loops``, which keeps the HTTP connection pool
+    between calls. All ORM calls of the coroutines run in the calling thread
+    and use its database connection instead of opening one in another
+    thread. Async callers can share a pool by using the client with
+    ``async with``.
+    """
+
     api_base_url = "http://sports.core.api.espn.com/v2/sports/football/leagues/nfl"
     httpx_limits = httpx.Limits(max_keepalive_connections=2, max_connections=5)
     dt_format_str = "%Y-%m-%dT%H:%M%z"
+    # Events are published off the event loop, in order, by a single thread
+    publish_executor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="nfl-publish"
+    )
 
-    def __init__(self, loop=None):
-        if loop is None:
-            try:
-                self.loop = asyncio.get_running_loop()
-            except RuntimeError:
-                self.loop = asyncio.new_event_loop()
-        else:
-            self.loop = loop
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport = None, background: bool = False
+    ):
+        self.transport = transport
+        self.background = background
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "EspnApiClient":
+        self.http_client = self._new_http_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        http_client, self.http_client = self.http_client, None
+        await http_client.aclose()
+
+    def _new_http_client(self) -> httpx.AsyncClient:
+        """Client sending all requests through the shared ESPN rate limiter,
+        with a low priority if ``background``."""
+        transport = self.transport or httpx.AsyncHTTPTransport(limits=self.httpx_limits)
+        return httpx.AsyncClient(
+            transport=RateLimitedTransport(transport, background=self.background)
+        )
+
+    @asynccontextmanager
+    async def _http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """The client of ``async with``, the pooled client of the managed loop
+        or a new client closed after use."""
+        if self.http_client is not None:
+            yield self.http_client
+            return
+        managed = ManagedLoop.current()
+        if managed is not None and self.transport is None:
+            yield managed.shared(("espn", self.background), self._new_http_client)
+            return
+        async with self._new_http_client() as http_client:
+            yield http_client
 
     @sync_to_async
     def _get_or_create(self, object_class: Model, **kwargs):
@@ -34,7 +90,7 @@ class EspnApiClient(object):
         cur_object, created = object_class.objects.get_or_create(
             **kwargs, defaults=defaults_dict,
         )
-        if created:
+        if not created:
             updated_fields = []
             for k, v in defaults_dict.items():
                 if getattr(cur_object, k) != v:
@@ -44,24 +100,21 @@ class EspnApiClient(object):
                 cur_object.save(update_fields=updated_fields)
         return cur_object
 
+    @staticmethod
+    def _request_failed(msg: str, strict: bool):
+        """Raise an ``EspnApiError`` for a failed request if ``strict``, log
+        it otherwise."""
+        if strict:
+            raise EspnApiError(msg)
+        logger.warning(msg)
+
     def check_games(self, event_ids: List[int] = None) -> List[Game]:
         """Check all started but not final games or a given list of event ids and update the database"""
         try:
             if event_ids is None:
-                now_ts = datetime.now(timezone.utc)
-                missing_games = Game.objects.filter(
-                    Q(
-                        timestamp__range=[now_ts - timedelta(days=14), now_ts],
-                        final=False,
-                    )
-                    | Q(
-                        Q(home_team__isnull=True) | Q(visitor_team__isnull=True),
-                        timestamp__range=[
-                            now_ts - timedelta(days=14),
-                            now_ts + timedelta(days=14),
-                        ],
-                    )
-                ).select_related("home_team", "visitor_team")
+                missing_games = Game.objects.missing().select_related(
+                    "home_team", "visitor_team"
+                )
             else:
                 missing_games = Game.objects.filter(event_id__in=event_ids)
         except Game.DoesNotExist:
@@ -69,14 +122,16 @@ class EspnApiClient(object):
         if missing_games.exists():
             missing_games = list(missing_games)
             logger.info(f"Trying to update {len(missing_games)}")
-            return self.loop.run_until_complete(self.check_games_async(missing_games))
+            return run_sync(self.check_games_async, missing_games)
         logger.info("There were no games to update")
         return []
 
     async def check_games_async(self, missing_games: List[Game]) -> List[Game]:
         """Check all started but not final games or a given list of event ids asynchronously and update the database"""
         updated_games = []
-        async with httpx.AsyncClient(limits=self.httpx_limits) as client:
+        scored_games = []
+        finalized_games = []
+        async with self._http_client() as client:
             for game in missing_games:
                 event_url = f"{self.api_base_url}/events/{game.event_id}/competitions/{game.event_id}/competitors"
                 event = await client.get(event_url)
@@ -90,36 +145,77 @@ class EspnApiClient(object):
                             f"Teams unknown for game on {event_json['date']}. Skipping..."
                         )
                         continue
-                    updated_fields = []
-                    if game.home_team is None and comp_res["home"]["team_id"]:
-                        game.home_team_id = comp_res["home"]["team_id"]
-                        updated_fields.append("home_team_id")
-                    if game.visitor_team is None and comp_res["visitor"]["team_id"]:
-                        game.visitor_team_id = comp_res["visitor"]["team_id"]
-                        updated_fields.append("visitor_team_id")
-                    if len(updated_fields):
-                        await sync_to_async(game.save)(update_fields=updated_fields)
-
-                    updated = False
-                    if game.final != comp_res["final"]:
-                        game.final = comp_res["final"]
-                        updated = True
-                    cur_score = comp_res["home"]["score"]
-                    if cur_score and game.home_team_score != cur_score:
-                        game.home_team_score = cur_score
-                        updated = True
-                    cur_score = comp_res["visitor"]["score"]
-                    if cur_score and game.visitor_team_score != cur_score:
-                        game.visitor_team_score = cur_score
-                        updated = True
+                    await self._update_teams(game, comp_res)
+                    updated, scored, finalized = self._update_scores(game, comp_res)
                     if updated:
                         updated_games.append(game)
+                    if scored:
+                        scored_games.append(game)
+                    if finalized:
+                        finalized_games.append(game)
         if len(updated_games):
-            await sync_to_async(Game.objects.bulk_update)(
-                updated_games, ["final", "home_team_score", "visitor_team_score"]
-            )
+            await self._games_updated(updated_games, scored_games, finalized_games)
         return updated_games
 
+    @staticmethod
+    async def _update_teams(game: Game, comp_res: Dict[str, Any]):
+        """Store the teams of a game once they are known."""
+        updated_fields = []
+        if game.home_team is None and comp_res["home"]["team_id"]:
+            game.home_team_id = comp_res["home"]["team_id"]
+            updated_fields.append("home_team_id")
+        if game.visitor_team is None and comp_res["visitor"]["team_id"]:
+            game.visitor_team_id = comp_res["visitor"]["team_id"]
+            updated_fields.append("visitor_team_id")
+        if len(updated_fields):
+            await sync_to_async(game.save)(update_fields=updated_fields)
+
+    @staticmethod
+    def _update_scores(
+        game: Game, comp_res: Dict[str, Any]
+    ) -> Tuple[bool, bool, bool]:
+        """Set the scores and the final state of a game without saving it.
+
+        Returns
+        -------
+        Tuple[bool, bool, bool]
+            Whether the game changed, its score changed and it became final.
+        """
+        updated = finalized = scored = False
+        if game.final != comp_res["final"]:
+            game.final = comp_res["final"]
+            finalized = game.final
+            updated = True
+        cur_score = comp_res["home"]["score"]
+        if cur_score is not None and game.home_team_score != cur_score:
+            game.home_team_score = cur_score
+            scored = updated = True
+        cur_score = comp_res["visitor"]["score"]
+        if cur_score is not None and game.visitor_team_score != cur_score:
+            game.visitor_team_score = cur_score
+            scored = updated = True
+        return updated, scored, finalized
+
+    async def _games_updated(
+        self,
+        updated_games: List[Game],
+        scored_games: List[Game],
+        finalized_games: List[Game],
+    ):
+        """Store the updated games, publish their live events and send
+        ``games_updated``."""
+        await sync_to_async(Game.objects.bulk_update)(
+            updated_games, ["final", "home_team_score", "visitor_team_score"]
+        )
+        await sync_to_async(
+            publish_events, thread_sensitive=False, executor=self.publish_executor
+        )(game_events(scored_games, finalized_games, standings=False))
+        await games_updated.asend(
+            sender=self.__class__,
+            scored_games=scored_games,
+            finalized_games=finalized_games,
+        )
+
     def import_games(self) -> List[Game]:
         try:
             missing_weeks = Week.objects.filter(games__isnull=True).select_related(
@@ -130,16 +226,19 @@ class EspnApiClient(object):
         res = []
         if missing_weeks.exists():
             missing_weeks = list(missing_weeks)
-            gather_res = self.loop.run_until_complete(
-                asyncio.gather(
-                    *[self.import_games_async(week) for week in missing_weeks]
-                )
-            )
+            gather_res = run_sync(self.import_weeks_async, missing_weeks)
             for gr in gather_res:
                 res.extend(gr)
         return res
 
-    async def import_games_async(self, week_object: Week) -> List[Game]:
+    async def import_weeks_async(self, weeks: List[Week]) -> List[List[Game]]:
+        return await asyncio.gather(*[self.import_games_async(week) for week in weeks])
+
+    async def import_games_async(
+        self, week_object: Week, strict: bool = False
+    ) -> List[Game]:
+        """Import the games of a week, failed requests are logged and skipped
+        or raise an ``EspnApiError`` if ``strict``."""
         games = []
 
         season = week_object.year.value
@@ -147,18 +246,18 @@ class EspnApiClient(object):
         week = week_object.nfl_week
 
         events_url = f"{self.api_base_url}/seasons/{season}/types/{season_type}/weeks/{week}/events"
-        async with httpx.AsyncClient(limits=self.httpx_limits) as client:
+        async with self._http_client() as client:
             events_res = await client.get(events_url)
             if events_res.status_code != 200:
-                logger.warning(
-                    f"Could not query list of events for season={season} season_type={season_type} week={week}: {events_res.reason}"
-                )
+                msg = f"Could not query list of events for season={season} season_type={season_type} week={week}: {events_res.reason_phrase}"
+                self._request_failed(msg, strict)
                 return []
             events_json = events_res.json()
             for event in events_json["items"]:
                 event_res = await client.get(event["$ref"])
                 if event_res.status_code != 200:
-                    logger.warning(f"Could not query event: {event_res.reason}")
+                    msg = f"Could not query event: {event_res.reason_phrase}"
+                    self._request_failed(msg, strict)
                     continue
                 event_json = event_res.json()
                 competitors = event_json["competitions"][0]["competitors"]
@@ -184,14 +283,18 @@ class EspnApiClient(object):
                     },
                 )
                 games.append(cur_game)
+        await sync_to_async(Game.objects.mark_tie_break_games)([week_object.id])
         return games
 
-    def import_season(self, season: int = None) -> List[Week]:
-        return self.loop.run_until_complete(self.import_season_async(season))
+    def import_season(self, season: int = None, strict: bool = False) -> List[Week]:
+        return run_sync(self.import_season_async, season, strict)
 
-    async def import_season_async(self, season: int = None) -> List[Week]:
+    async def import_season_async(
+        self, season: int = None, strict: bool = False
+    ) -> List[Week]:
         """
-        Import games of a specific season and or week into the database
+        Import games of a specific season and or week into the database,
+        failed requests raise an ``EspnApiError`` if ``strict``
         """
         season_weeks = []
 
@@ -200,10 +303,11 @@ class EspnApiClient(object):
         else:
             cur_year = season
         year_url = f"{self.api_base_url}/seasons/{cur_year}"
-        async with httpx.AsyncClient(limits=self.httpx_limits) as client:
+        async with self._http_client() as client:
             year_res = await client.get(year_url)
             if year_res.status_code != 200:
-                logger.warning(f"Could not get season {cur_year}: {year_res.reason}")
+                msg = f"Could not get season {cur_year}: {year_res.reason_phrase}"
+                self._request_failed(msg, strict)
                 return []
             yjson = year_res.json()
             year_dt_start = datetime.strptime(yjson["startDate"], self.dt_format_str)
@@ -216,26 +320,25 @@ class EspnApiClient(object):
                     "end_timestamp": year_dt_end,
                 },
             )
-            pre_season_weeks = regular_season_weeks = post_season_weeks = 0
+            # Weeks are numbered through the season types in their order
+            type_weeks = {}
             for season in yjson["types"]["items"]:
                 weeks_url = f"{year_url}/types/{season['type']}/weeks"
                 weeks_res = await client.get(weeks_url)
                 if weeks_res.status_code != 200:
-                    logger.warning(
-                        f"Could not query season type {SeasonType(season['type']).label}: {weeks_res.reason}"
-                    )
+                    msg = f"Could not query season type {SeasonType(season['type']).label}: {weeks_res.reason_phrase}"
+                    self._request_failed(msg, strict)
                     continue
                 weeks_json = weeks_res.json()
-                if season["type"] == 1:
-                    pre_season_weeks = len(weeks_json["items"])
-                elif season["type"] == 2:
-                    regular_season_weeks = len(weeks_json["items"])
-                elif season["type"] == 3:
-                    post_season_weeks = len(weeks_json["items"])
+                type_weeks[season["type"]] = len(weeks_json["items"])
+                previous_weeks = sum(
+                    n for type_id, n in type_weeks.items() if type_id < season["type"]
+                )
                 for week in weeks_json["items"]:
                     week_res = await client.get(week["$ref"])
                     if week_res.status_code != 200:
-                        logger.warning(f"Could not query week: {week_res.reason}")
+                        msg = f"Could not query week: {week_res.reason_phrase}"
+                        self._request_failed(msg, strict)
                         continue
                     week_json = week_res.json()
                     week_dt_start = datetime.strptime(
@@ -244,15 +347,7 @@ class EspnApiClient(object):
                     week_dt_end = datetime.strptime(
                         week_json["endDate"], self.dt_format_str
                     )
-                    real_week = week_json["number"]
-                    if season["type"] == 2:
-                        real_week += pre_season_weeks
-                    elif season["type"] == 3:
-                        real_week += pre_season_weeks + regular_season_weeks
-                    elif season["type"] == 4:
-                        real_week += (
-                            pre_season_weeks + regular_season_weeks + post_season_weeks
-                        )
+                    real_week = week_json["number"] + previous_weeks
                     cur_week = await self._get_or_create(
                         Week,
                         value=real_week,
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class NflConfig(AppConfig):
     name = 'nfl'
+
+    def ready(self):
+        # Huey only discovers tasks in its consumer, the receivers enqueuing
+        # them have to be connected in every process.
+        from nfl import tasks  # noqa: F401
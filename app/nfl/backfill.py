@@ -0,0 +1,101 @@
+import uuid
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class BackfillRun(object):
+    """State of a backfill shared by its huey tasks in the cache.
+
+    A season is imported by one task per week. Each week task records its
+    number of games or its failure and counts down the remaining weeks of
+    the round, the last one starts the fan-in. Retrying a run starts a new
+    round with the failed weeks only.
+
+    Parameters
+    ----------
+    run_id : str
+        Id of the backfill run
+    season : int
+        Season to backfill
+    """
+
+    def __init__(self, run_id: str, season: int):
+        self.run_id = run_id
+        self.season = season
+
+    @classmethod
+    def create(cls, season: int) -> "BackfillRun":
+        run = cls(uuid.uuid4().hex[:12], season)
+        cache.set(run.key("season"), season, settings.NFL_BACKFILL_TIMEOUT)
+        return run
+
+    @classmethod
+    def load(cls, run_id: str) -> Optional["BackfillRun"]:
+        season = cache.get(f"nfl:backfill:{run_id}:season")
+        return cls(run_id, season) if season is not None else None
+
+    def key(self, name: str) -> str:
+        return f"nfl:backfill:{self.run_id}:{name}"
+
+    def fan_out(self, week_ids: List[int]) -> int:
+        """Start a new round importing the given weeks.
+
+        Returns
+        -------
+        int
+            Number of the round.
+        """
+        timeout = settings.NFL_BACKFILL_TIMEOUT
+        cache.set(self.key("season"), self.season, timeout)
+        cache.add(self.key("round"), 0, timeout)
+        round_no = cache.incr(self.key("round"))
+        all_weeks = set(cache.get(self.key("weeks"), [])) | set(week_ids)
+        cache.set_many(
+            {
+                self.key("weeks"): sorted(all_weeks),
+                self.key(f"remaining:{round_no}"): len(week_ids),
+            },
+            timeout,
+        )
+        cache.delete_many([self.key(f"failed:{week_id}") for week_id in week_ids])
+        return round_no
+
+    def week_done(
+        self, round_no: int, week_id: int, games: Optional[int] = None
+    ) -> bool:
+        """Record the imported games of a week or its failure if ``None``.
+
+        Returns
+        -------
+        bool
+            Whether this was the last week of the round.
+        """
+        timeout = settings.NFL_BACKFILL_TIMEOUT
+        if games is None:
+            cache.set(self.key(f"failed:{week_id}"), 1, timeout)
+        else:
+            cache.set(self.key(f"games:{week_id}"), games, timeout)
+        return cache.decr(self.key(f"remaining:{round_no}")) == 0
+
+    def failed_weeks(self) -> List[int]:
+        week_ids = cache.get(self.key("weeks"), [])
+        failed = cache.get_many([self.key(f"failed:{week_id}") for week_id in week_ids])
+        return [
+            week_id for week_id in week_ids if self.key(f"failed:{week_id}") in failed
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """Totals of all rounds of the run."""
+        week_ids = cache.get(self.key("weeks"), [])
+        games = cache.get_many([self.key(f"games:{week_id}") for week_id in week_ids])
+        return {
+            "run": self.run_id,
+            "season": self.season,
+            "rounds": cache.get(self.key("round"), 0),
+            "weeks": len(week_ids),
+            "imported_weeks": len(games),
+            "games": sum(games.values()),
+            "failed_weeks": self.failed_weeks(),
+        }
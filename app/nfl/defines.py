@@ -128,3 +128,9 @@ class PickChoices(models.IntegerChoices):
     HOME_TEAM = 1
     VISITOR_TEAM = 2
     TIED_GAME = 3
+
+
+class LiveEventType(models.TextChoices):
+    SCORE = "score", "Score changed"
+    FINAL = "final", "Game final"
+    STANDINGS = "standings", "Standings changed"
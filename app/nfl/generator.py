@@ -0,0 +1,262 @@
+import random
+from datetime import UTC, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+
+from nfl.defines import PickChoices, TeamChoices
+from nfl.models import Game, Pick, Week, Year
+
+# Number of games per week value, see Week.season_type
+WEEK_GAMES = {
+    1: 1,  # Hall of Fame Week
+    **{value: 16 for value in range(2, 23)},
+    23: 6,  # Wild Card Weekend
+    24: 4,  # Divisional Playoffs
+    25: 2,  # Conference Championships
+    26: 1,  # Pro Bowl
+    27: 1,  # Super Bowl
+}
+BYE_WEEKS = range(9, 19)
+# Kickoffs relative to the start of a week, the current week starts three
+# and a half days before now, so only its first game is final already.
+KICKOFFS = [
+    timedelta(days=2, hours=1),
+    *[timedelta(days=5, hours=17)] * 9,
+    *[timedelta(days=5, hours=20, minutes=25)] * 4,
+    timedelta(days=6, hours=0, minutes=20),
+    timedelta(days=6, hours=23, minutes=15),
+]
+
+
+class LeagueGenerator(object):
+    """Generate a synthetic league for benchmarks and load tests.
+
+    Every season has all 27 weeks with a realistic number of games. Scores
+    follow the team strengths of the season with a home field advantage and
+    players pick according to their skill and participation rate. The last
+    season is the current one, ``current_week`` contains now, games before
+    now are final.
+
+    Parameters
+    ----------
+    players : int
+        Number of players to create
+    seasons : int
+        Number of seasons to create, ending with the current one
+    current_week : int
+        Week value of the current season which contains now
+    seed : int
+        Seed of the random number generator
+    password : str
+        Password of all generated players
+    now : datetime, optional
+        Point in time the league is generated for, defaults to now
+    """
+
+    username_prefix = "player"
+
+    def __init__(
+        self,
+        players: int = 50,
+        seasons: int = 1,
+        current_week: int = 10,
+        seed: int = 0,
+        password: str = "pickpool",
+        now: Optional[datetime] = None,
+    ):
+        self.players = players
+        self.seasons = seasons
+        self.current_week = current_week
+        self.password = password
+        self.now = now or datetime.now(UTC)
+        self.random = random.Random(seed)
+        self.teams = [
+            team
+            for team in TeamChoices
+            if team not in (TeamChoices.AFC, TeamChoices.NFC)
+        ]
+
+    @classmethod
+    def flush(cls):
+        """Delete all seasons and generated players."""
+        Year.objects.all().delete()
+        get_user_model().objects.filter(
+            username__startswith=cls.username_prefix
+        ).delete()
+
+    def generate(self) -> Dict[str, int]:
+        """Create all players, seasons, games and picks.
+
+        Returns
+        -------
+        Dict[str, int]
+            Number of created objects per type.
+        """
+        users = self.create_users()
+        # Skill decides how often a player picks the favorite, participation
+        # how many games are picked at all.
+        skills = {user.id: self.random.betavariate(2, 2) for user in users}
+        participation = {user.id: self.random.betavariate(9, 1.5) for user in users}
+        counts = {"players": len(users), "seasons": 0, "games": 0, "picks": 0}
+        strengths = {team: self.random.gauss(0, 1) for team in self.teams}
+        current_season = self.now.year if self.now.month > 2 else self.now.year - 1
+        for offset in reversed(range(self.seasons)):
+            strengths = {
+                team: 0.6 * strength + self.random.gauss(0, 0.8)
+                for team, strength in strengths.items()
+            }
+            games = self.create_season(current_season - offset, offset, strengths)
+            picks = self.create_picks(games, users, skills, participation, strengths)
+            counts["seasons"] += 1
+            counts["games"] += len(games)
+            counts["picks"] += picks
+        return counts
+
+    def create_users(self) -> List:
+        User = get_user_model()
+        start = User.objects.filter(username__startswith=self.username_prefix).count()
+        password = make_password(self.password)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{self.username_prefix}{idx}",
+                    first_name=f"Player {idx}",
+                    last_name="Generated",
+                    email=f"{self.username_prefix}{idx}@localhost.lan",
+                    password=password,
+                )
+                for idx in range(start, start + self.players)
+            ],
+            batch_size=1000,
+        )
+        return list(User.objects.filter(username__startswith=self.username_prefix))
+
+    def create_season(
+        self, season: int, offset: int, strengths: Dict[int, float]
+    ) -> List[Game]:
+        # Seasons are shifted by whole weeks to keep the kickoff weekdays
+        first_week_start = self.now - timedelta(
+            weeks=52 * offset + self.current_week - 1, days=3, hours=12
+        )
+        year = Year.objects.create(
+            value=season,
+            start_timestamp=first_week_start,
+            end_timestamp=first_week_start + timedelta(weeks=len(WEEK_GAMES)),
+        )
+        Week.objects.bulk_create(
+            [
+                Week(
+                    year=year,
+                    value=value,
+                    start_timestamp=first_week_start + timedelta(weeks=value - 1),
+                    end_timestamp=first_week_start + timedelta(weeks=value),
+                )
+                for value in WEEK_GAMES
+            ]
+        )
+        event_id = (Game.objects.aggregate(Max("event_id"))["event_id__max"] or 0) + 1
+        games = []
+        for week in Week.objects.filter(year=year).order_by("value"):
+            for idx, (home_team, visitor_team) in enumerate(
+                self.pairings(week.value, strengths)
+            ):
+                kickoff = week.start_timestamp + KICKOFFS[idx]
+                game = Game(
+                    week=week,
+                    timestamp=kickoff,
+                    event_id=event_id,
+                    home_team_id=home_team,
+                    visitor_team_id=visitor_team,
+                )
+                if kickoff < self.now:
+                    game.home_team_score, game.visitor_team_score = self.score(
+                        strengths.get(home_team, 0), strengths.get(visitor_team, 0)
+                    )
+                    game.final = True
+                games.append(game)
+                event_id += 1
+            # The last game of every week is the tie break game
+            games[-1].tie_break = True
+        Game.objects.bulk_create(games, batch_size=1000)
+        return list(
+            Game.objects.filter(week__year=year)
+            .select_related("week")
+            .order_by("week__value", "timestamp", "id")
+        )
+
+    def pairings(self, week: int, strengths: Dict[int, float]) -> List[Tuple[int, int]]:
+        if week == 26:
+            return [(TeamChoices.NFC, TeamChoices.AFC)]
+        teams = list(self.teams)
+        self.random.shuffle(teams)
+        if week > 22:
+            # Play-off teams are drawn from the strongest teams of the season
+            strongest = sorted(self.teams, key=lambda t: strengths[t], reverse=True)
+            teams = self.random.sample(strongest[:14], 2 * WEEK_GAMES[week])
+        elif week in BYE_WEEKS:
+            teams = teams[:28]
+        teams = teams[: 2 * WEEK_GAMES[week]]
+        return list(zip(teams[::2], teams[1::2]))
+
+    def score(self, home: float, visitor: float) -> Tuple[int, int]:
+        margin = 3 * (home - visitor) + 2
+        home_score = max(0, round(self.random.gauss(22 + margin / 2, 9)))
+        visitor_score = max(0, round(self.random.gauss(22 - margin / 2, 9)))
+        if home_score == visitor_score and self.random.random() < 0.9:
+            # Most ties are decided by a field goal in overtime
+            if self.random.random() < 0.5:
+                home_score += 3
+            else:
+                visitor_score += 3
+        return home_score, visitor_score
+
+    def create_picks(
+        self,
+        games: List[Game],
+        users: List,
+        skills: Dict[int, float],
+        participation: Dict[int, float],
+        strengths: Dict[int, float],
+    ) -> int:
+        picks = []
+        for game in games:
+            if game.week.value > 22 and not game.final:
+                continue
+            favorite = PickChoices.HOME_TEAM
+            underdog = PickChoices.VISITOR_TEAM
+            if (
+                strengths.get(game.visitor_team_id, 0)
+                > strengths.get(game.home_team_id, 0) + 2 / 3
+            ):
+                favorite, underdog = underdog, favorite
+            for user in users:
+                # Upcoming games of the current week are picked by half
+                chance = participation[user.id] * (1 if game.final else 0.5)
+                if self.random.random() > chance:
+                    continue
+                choice = self.random.random()
+                if choice < 0.005:
+                    selection = PickChoices.TIED_GAME
+                elif choice < 0.5 + 0.3 * skills[user.id]:
+                    selection = favorite
+                else:
+                    selection = underdog
+                picks.append(
+                    Pick(
+                        user=user,
+                        game=game,
+                        kickoff=game.timestamp,
+                        selection=selection,
+                        picked_tie_break=(
+                            self.random.randint(1, 21) if game.tie_break else 0
+                        ),
+                    )
+                )
+        Pick.objects.bulk_create(picks, batch_size=5000)
+        Pick.objects.score(
+            Pick.objects.filter(game__week_id__in={game.week_id for game in games})
+        )
+        return len(picks)
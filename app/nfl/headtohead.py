@@ -0,0 +1,185 @@
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from nfl.defines import PickChoices
+from nfl.models import Game, Pick
+from nfl.simulation import SCORE_FIELDS, agreements
+
+
+class PickMatrix(object):
+    """Picks of all users for the games of a season which kicked off.
+
+    The picks are a users x games matrix of ``PickChoices``, cached per
+    season. Picks can't change after the kickoff, so the matrix only grows:
+    loading it adds the columns of the games which kicked off since and
+    fetches their picks with a single query. The winners are reread with the
+    games on every load, so results are always current.
+
+    Picks of games which didn't kick off yet are hidden from other users and
+    never part of the matrix.
+
+    Parameters
+    ----------
+    season : int
+        Season of the games
+    user_ids : List[int]
+        Users in the order of the rows
+    game_ids : List[int]
+        Games in the order of the columns
+    selections : np.ndarray
+        Picks of the users, ``TBP`` if not picked
+    """
+
+    def __init__(
+        self,
+        season: int,
+        user_ids: Optional[List[int]] = None,
+        game_ids: Optional[List[int]] = None,
+        selections: Optional[np.ndarray] = None,
+    ):
+        self.season = season
+        self.user_ids = user_ids or []
+        self.game_ids = game_ids or []
+        if selections is None:
+            selections = np.zeros((len(self.user_ids), len(self.game_ids)))
+        self.selections = selections.astype(np.int8)
+        self.winners = np.full(len(self.game_ids), PickChoices.TBP, dtype=np.int8)
+
+    @staticmethod
+    def key(season: int) -> str:
+        return f"nfl:head_to_head:{season}"
+
+    @classmethod
+    def load(cls, season: int, now: Optional[datetime] = None) -> "PickMatrix":
+        """Current matrix of a season with one query for the games and one
+        for the picks of games which kicked off since it was cached."""
+        games = list(
+            Game.objects.filter(
+                week__year__value=season, timestamp__lte=now or datetime.now(UTC)
+            ).values("id", "final", *SCORE_FIELDS)
+        )
+        state = cache.get(cls.key(season))
+        matrix = cls(season, **state) if state else cls(season)
+        known = set(matrix.game_ids)
+        new_ids = [game["id"] for game in games if game["id"] not in known]
+        if new_ids:
+            matrix.extend(
+                new_ids,
+                Pick.objects.filter(game_id__in=new_ids).values_list(
+                    "user_id", "game_id", "selection"
+                ),
+            )
+            matrix.save()
+        matrix.set_winners(games)
+        return matrix
+
+    def extend(self, game_ids: List[int], picks: Iterable[Tuple[int, int, int]]):
+        """Add the columns of games and the rows of users new to the season."""
+        picks = list(picks)
+        new_users = sorted(
+            {user_id for user_id, _game_id, _selection in picks} - set(self.user_ids)
+        )
+        self.user_ids = self.user_ids + new_users
+        self.game_ids = self.game_ids + list(game_ids)
+        selections = np.zeros((len(self.user_ids), len(self.game_ids)), dtype=np.int8)
+        selections[: self.selections.shape[0], : self.selections.shape[1]] = (
+            self.selections
+        )
+        rows = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        cols = {game_id: col for col, game_id in enumerate(self.game_ids)}
+        for user_id, game_id, selection in picks:
+            selections[rows[user_id], cols[game_id]] = selection
+        self.selections = selections
+        self.winners = np.full(len(self.game_ids), PickChoices.TBP, dtype=np.int8)
+
+    def save(self):
+        cache.set(
+            self.key(self.season),
+            {
+                "user_ids": self.user_ids,
+                "game_ids": self.game_ids,
+                "selections": self.selections,
+            },
+            settings.NFL_HEAD_TO_HEAD_CACHE_TIMEOUT,
+        )
+
+    def set_winners(self, games: Iterable[Dict[str, Any]]):
+        """Set the winners of the columns from games loaded with ``values``."""
+        cols = {game_id: col for col, game_id in enumerate(self.game_ids)}
+        for game in games:
+            if game["id"] in cols:
+                self.winners[cols[game["id"]]] = Game(**game).winner or PickChoices.TBP
+
+    def agreement(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Games each pair of users picked the same and games both picked."""
+        picked = (self.selections != PickChoices.TBP).astype(np.float32)
+        return agreements(self.selections), (picked @ picked.T).astype(np.int32)
+
+    def records(self) -> np.ndarray:
+        """Head-to-head wins, ``wins[u, v]`` counts the final games user u
+        picked right and user v picked wrong. The losses are the transpose."""
+        final = self.winners != PickChoices.TBP
+        right = (self.selections == self.winners) & final
+        wrong = (self.selections != PickChoices.TBP) & final & ~right
+        return (right.astype(np.float32) @ wrong.T.astype(np.float32)).astype(np.int32)
+
+    def majority(self) -> np.ndarray:
+        """Pick of the majority per game, ``TBP`` if no choice has the most
+        picks."""
+        choices = np.array(
+            [PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM, PickChoices.TIED_GAME],
+            dtype=np.int8,
+        )
+        counts = (self.selections[None, :, :] == choices[:, None, None]).sum(axis=1)
+        top = counts.max(axis=0)
+        unique = (counts == top).sum(axis=0) == 1
+        return np.where(
+            unique & (top > 0), choices[counts.argmax(axis=0)], PickChoices.TBP
+        ).astype(np.int8)
+
+    def contrarian(self) -> Dict[int, Dict[str, Any]]:
+        """Share of the picks of each user against the majority and how many
+        of these were right, keyed by user id."""
+        majority = self.majority()
+        picked = self.selections != PickChoices.TBP
+        against = picked & (majority != PickChoices.TBP) & (self.selections != majority)
+        right = against & (self.selections == self.winners)
+        picks, against, right = (
+            picked.sum(axis=1),
+            against.sum(axis=1),
+            right.sum(axis=1),
+        )
+        return {
+            user_id: {
+                "score": float(against[row] / picks[row]) if picks[row] else 0,
+                "against": int(against[row]),
+                "won": int(right[row]),
+            }
+            for row, user_id in enumerate(self.user_ids)
+        }
+
+    def compare(self, user_id: int) -> Dict[int, Dict[str, Any]]:
+        """Agreement and head-to-head record of a user with all other users
+        keyed by their user id, empty if the user has no picks yet."""
+        if user_id not in self.user_ids:
+            return {}
+        row = self.user_ids.index(user_id)
+        agree, common = self.agreement()
+        wins = self.records()
+        return {
+            other_id: {
+                "games": int(common[row, col]),
+                "agreed": int(agree[row, col]),
+                "agreement": (
+                    float(agree[row, col] / common[row, col]) if common[row, col] else 0
+                ),
+                "won": int(wins[row, col]),
+                "lost": int(wins[col, row]),
+            }
+            for col, other_id in enumerate(self.user_ids)
+            if other_id != user_id
+        }
@@ -0,0 +1,153 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from django.conf import settings
+from redis import asyncio as aioredis
+
+from nfl.defines import LiveEventType
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = "nfl:live"
+LIVE_STREAM = "nfl:live:events"
+
+
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def get_async_redis() -> aioredis.Redis:
+    return aioredis.Redis.from_url(settings.REDIS_URL)
+
+
+def game_events(
+    scored_games: Iterable[Any], finalized_games: Iterable[Any], standings: bool = True
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Build the live events for games updated by an ingestion run.
+
+    Parameters
+    ----------
+    scored_games : Iterable[Game]
+        Games whose score changed
+    finalized_games : Iterable[Game]
+        Games which became final
+    standings : bool
+        Add standings events of the weeks of finalized games
+
+    Returns
+    -------
+    List[Tuple[str, Dict[str, Any]]]
+        List of event types with their payload.
+    """
+    events = []
+    for game in scored_games:
+        events.append(
+            (
+                LiveEventType.SCORE,
+                {
+                    "game": game.id,
+                    "week": game.week_id,
+                    "home_team_score": game.home_team_score,
+                    "visitor_team_score": game.visitor_team_score,
+                },
+            )
+        )
+    weeks = set()
+    for game in finalized_games:
+        events.append(
+            (
+                LiveEventType.FINAL,
+                {"game": game.id, "week": game.week_id, "winner": game.winner},
+            )
+        )
+        weeks.add(game.week_id)
+    if standings:
+        events.extend(standings_events(weeks))
+    return events
+
+
+def standings_events(week_ids: Iterable[int]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Build the live events telling browsers to reload standings of weeks."""
+    return [
+        (LiveEventType.STANDINGS, {"week": week_id}) for week_id in sorted(week_ids)
+    ]
+
+
+def publish_events(events: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """Append events to the replay stream and notify all listening browsers.
+
+    A single notification on the pub/sub channel wakes up every open
+    connection, which then reads the new events from the stream. Errors are
+    logged only, a missing Redis must never break the ingestion.
+
+    Returns
+    -------
+    List[str]
+        Stream ids of the published events.
+    """
+    if not events:
+        return []
+    conn = get_redis()
+    try:
+        pipe = conn.pipeline()
+        for event_type, payload in events:
+            pipe.xadd(
+                LIVE_STREAM,
+                {"type": str(event_type), "data": json.dumps(payload)},
+                maxlen=settings.NFL_LIVE_REPLAY_SIZE,
+                approximate=True,
+            )
+        event_ids = [eid.decode() for eid in pipe.execute()]
+        conn.publish(LIVE_CHANNEL, event_ids[-1])
+        return event_ids
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish {len(events)} live events: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def format_event(event_id: str, event_type: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+async def event_stream(
+    week_id: Optional[int], last_event_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Yield server-sent events of a week until the client disconnects.
+
+    Events newer than ``last_event_id`` are replayed first, so a browser
+    reconnecting with the ``Last-Event-ID`` header does not miss any update.
+    While nothing happens a comment line is sent as heartbeat.
+    """
+    conn = get_async_redis()
+    pubsub = conn.pubsub()
+    await pubsub.subscribe(LIVE_CHANNEL)
+    try:
+        yield f"retry: {settings.NFL_LIVE_RETRY}\n\n"
+        if not last_event_id:
+            latest = await conn.xrevrange(LIVE_STREAM, count=1)
+            last_event_id = latest[0][0].decode() if latest else "0-0"
+        while True:
+            res = await conn.xread({LIVE_STREAM: last_event_id}, count=100)
+            for _stream, entries in res:
+                for entry_id, fields in entries:
+                    last_event_id = entry_id.decode()
+                    data = fields[b"data"].decode()
+                    if week_id is not None and json.loads(data).get("week") != week_id:
+                        continue
+                    yield format_event(last_event_id, fields[b"type"].decode(), data)
+            if res:
+                continue
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.NFL_LIVE_HEARTBEAT_INTERVAL,
+            )
+            if message is None:
+                yield ": heartbeat\n\n"
+    finally:
+        await pubsub.unsubscribe(LIVE_CHANNEL)
+        await pubsub.close()
+        await conn.close()
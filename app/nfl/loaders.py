@@ -0,0 +1,497 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from core.models import lost_pick_query, won_pick_query
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+from django.db.models.aggregates import Count, Max
+
+from nfl.defines import PickChoices, TeamChoices
+from nfl.headtohead import PickMatrix
+from nfl.models import (
+    Game,
+    Pick,
+    SeasonResult,
+    SeasonResultManager,
+    Team,
+    TeamRating,
+    TeamStanding,
+    TeamStandingManager,
+    Week,
+    Year,
+)
+from nfl.projections import LiveProjection
+from nfl.ratings import game_home_win
+from nfl.scoring import Scoring
+from nfl.simulation import results_key
+
+
+class ModelLoader(object):
+    """Batch and memoize loads of a model by primary key.
+
+    All keys requested within the same event loop iteration are fetched with
+    a single query, every key is fetched at most once.
+    """
+
+    def __init__(self, queryset: QuerySet):
+        self.queryset = queryset
+        self.cache: Dict[Any, asyncio.Future] = {}
+        self.batch: List[Any] = []
+
+    def load(self, pk: Any) -> asyncio.Future:
+        if pk not in self.cache:
+            self.cache[pk] = asyncio.get_running_loop().create_future()
+            if not self.batch:
+                asyncio.ensure_future(self.dispatch())
+            self.batch.append(pk)
+        return self.cache[pk]
+
+    async def load_many(self, pks: Iterable[Any]) -> List[Optional[Any]]:
+        return await asyncio.gather(*[self.load(pk) for pk in pks])
+
+    def prime(self, obj: Any) -> Any:
+        """Add an already fetched object, returns the memoized instance."""
+        future = self.cache.get(obj.pk)
+        if future is None:
+            future = self.cache[obj.pk] = asyncio.get_running_loop().create_future()
+        if not future.done():
+            future.set_result(obj)
+        return future.result() or obj
+
+    async def dispatch(self):
+        batch, self.batch = self.batch, []
+        try:
+            objects = {obj.pk: obj async for obj in self.queryset.filter(pk__in=batch)}
+        except Exception as e:
+            for pk in batch:
+                self.cache[pk].set_exception(e)
+            return
+        for pk in batch:
+            if not self.cache[pk].done():
+                self.cache[pk].set_result(objects.get(pk))
+
+
+def aggregates_version_key(season: int) -> str:
+    return f"nfl:aggregates:{season}:version"
+
+
+class RequestLoader(object):
+    """Per request loader shared by all nfl view mixins.
+
+    Weeks, games, teams, users and picks are fetched with one query per
+    entity type and related objects are attached to the instances, so
+    neither the views nor the templates trigger lazy lookups.
+
+    Season standings and team stats only change when games become final,
+    they are cached per season and recomputed by ``refresh_aggregates``
+    after an ingestion run.
+    """
+
+    def __init__(self):
+        self.weeks = ModelLoader(Week.objects.select_related("year"))
+        self.games = ModelLoader(Game.objects.all())
+        self.teams = ModelLoader(Team.objects.all())
+        self.users = ModelLoader(get_user_model().objects.all())
+        self.picks = ModelLoader(Pick.objects.all())
+        self._results: Dict[Any, asyncio.Future] = {}
+
+    async def _memoize(self, key: Any, coro_func, *args) -> Any:
+        if key not in self._results:
+            self._results[key] = asyncio.ensure_future(coro_func(*args))
+        return await self._results[key]
+
+    async def aggregates_version(self, season: int) -> int:
+        return await self._memoize(
+            ("aggregates_version", season),
+            cache.aget,
+            aggregates_version_key(season),
+            0,
+        )
+
+    async def _cached(self, season: int, name: str, coro_func, *args) -> Any:
+        version = await self.aggregates_version(season)
+        key = f"nfl:aggregates:{season}:{version}:{name}"
+        res = await cache.aget(key)
+        if res is None:
+            res = await coro_func(*args)
+            await cache.aset(key, res, settings.NFL_AGGREGATES_CACHE_TIMEOUT)
+        return res
+
+    async def refresh_aggregates(self, week: Week) -> List[Week]:
+        """Recompute the cached aggregates of a season after games of a week
+        became final.
+
+        The season standings and the team stats of the week and all later
+        weeks which started already are stored under a new version of the
+        season. Readers switch to it once all of them are stored. The points
+        of the picks of these weeks and snapshots of the team standings of
+        completed weeks are stored or patched before.
+
+        Returns
+        -------
+        List[Week]
+            Weeks whose team stats were recomputed.
+        """
+        season = week.year.value
+        version = time.time_ns()
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(version)
+        self._results[("aggregates_version", season)] = future
+        weeks = [
+            cur_week
+            async for cur_week in Week.objects.select_related("year").filter(
+                year_id=week.year_id,
+                value__gte=week.value,
+                start_timestamp__lte=datetime.now(UTC),
+            )
+        ]
+        # Stored points and snapshots are derived from the games, they are
+        # patched first
+        await sync_to_async(Pick.objects.score)(
+            Pick.objects.filter(game__week__in=weeks)
+        )
+        await sync_to_async(TeamStanding.objects.snapshot)(weeks)
+        await asyncio.gather(
+            self.season_standings(season),
+            *[self.team_stats(cur_week) for cur_week in weeks],
+        )
+        await cache.aset(aggregates_version_key(season), version, None)
+        return weeks
+
+    async def attach_games(self, games: List[Game]) -> List[Game]:
+        games = [self.games.prime(game) for game in games]
+        team_ids = {
+            team_id
+            for game in games
+            for team_id in (game.home_team_id, game.visitor_team_id)
+            if team_id is not None
+        }
+        teams = dict(zip(team_ids, await self.teams.load_many(team_ids)))
+        for game in games:
+            game.home_team = teams.get(game.home_team_id)
+            game.visitor_team = teams.get(game.visitor_team_id)
+        return games
+
+    async def attach_picks(self, picks: List[Pick]) -> List[Pick]:
+        picks = [self.picks.prime(pick) for pick in picks]
+        user_ids = {pick.user_id for pick in picks}
+        game_ids = {pick.game_id for pick in picks}
+        users, games = await asyncio.gather(
+            self.users.load_many(user_ids), self.games.load_many(game_ids)
+        )
+        users = dict(zip(user_ids, users))
+        games = dict(zip(game_ids, await self.attach_games(games)))
+        for pick in picks:
+            pick.user = users[pick.user_id]
+            pick.game = games[pick.game_id]
+        return picks
+
+    async def pick_history(self, user: Any, limit: int, **filters) -> List[Pick]:
+        """A page of the picks of a user with their games, see
+        ``PickManager.history``."""
+        picks = [pick async for pick in Pick.objects.history(user, **filters)[:limit]]
+        return await self.attach_picks(picks)
+
+    async def week(self, query: Q) -> Optional[Week]:
+        week = await Week.objects.select_related("year").filter(query).afirst()
+        return self.weeks.prime(week) if week else None
+
+    async def all_teams(self) -> List[Team]:
+        return await self._memoize("all_teams", self._all_teams)
+
+    async def _all_teams(self) -> List[Team]:
+        return [
+            self.teams.prime(team)
+            async for team in Team.objects.exclude(
+                id__in=(TeamChoices.AFC, TeamChoices.NFC)
+            )
+        ]
+
+    async def all_users(self) -> List[Any]:
+        return await self._memoize("all_users", self._all_users)
+
+    async def _all_users(self) -> List[Any]:
+        return [self.users.prime(user) async for user in get_user_model().objects.all()]
+
+    async def week_games(self, week: Week) -> List[Game]:
+        return await self._memoize(("week_games", week.id), self._week_games, week)
+
+    async def _week_games(self, week: Week) -> List[Game]:
+        games = [
+            game
+            async for game in Game.objects.filter(week=week).order_by(
+                "timestamp", "home_team"
+            )
+        ]
+        return await self.attach_games(games)
+
+    async def week_picks(self, week: Week) -> List[Pick]:
+        return await self._memoize(("week_picks", week.id), self._week_picks, week)
+
+    async def _week_picks(self, week: Week) -> List[Pick]:
+        # The games of all picks are memoized by loading the week's games first
+        await self.week_games(week)
+        picks = [
+            pick
+            async for pick in Pick.objects.filter(game__week=week).order_by(
+                "user__first_name", "game__timestamp", "game__home_team"
+            )
+        ]
+        return await self.attach_picks(picks)
+
+    async def season_standings(self, season: int) -> Dict[int, Dict[str, Any]]:
+        """Won and lost picks of all users of a season keyed by user id."""
+        return await self._memoize(
+            ("season_standings", season),
+            self._cached,
+            season,
+            "season_standings",
+            self._season_standings,
+            season,
+        )
+
+    async def _season_standings(self, season: int) -> Dict[int, Dict[str, Any]]:
+        res = {}
+        async for row in (
+            Pick.objects.filter(game__week__year__value=season, game__final=True)
+            .values("user")
+            .annotate(
+                won=Count("id", filter=won_pick_query),
+                lost=Count("id", filter=lost_pick_query),
+                points=Scoring.from_settings().total(),
+            )
+            .order_by()
+        ):
+            won, lost = row["won"], row["lost"]
+            res[row["user"]] = {
+                "points": row["points"],
+                "won": won,
+                "lost": lost,
+                "won_lost_ratio": won / (won + lost) if won or lost else 0,
+            }
+        return res
+
+    async def week_points(self, week: Week) -> Dict[int, int]:
+        """Points of the final games of a week keyed by user id."""
+        return await self._memoize(("week_points", week.id), self._week_points, week)
+
+    async def _week_points(self, week: Week) -> Dict[int, int]:
+        return {
+            row["user"]: row["points"]
+            async for row in Pick.objects.filter(game__week=week, game__final=True)
+            .values("user")
+            .annotate(points=Scoring.from_settings().total())
+            .order_by()
+        }
+
+    async def simulations(self, week: Week) -> Tuple[Dict, Dict]:
+        """Latest win probabilities and eliminations of a week and of its
+        season keyed by user id, empty until they were simulated after a
+        score change, see ``nfl_simulate``."""
+        return await self._memoize(("simulations", week.id), self._simulations, week)
+
+    async def _simulations(self, week: Week) -> Tuple[Dict, Dict]:
+        keys = [results_key("week", week.id), results_key("season", week.year_id)]
+        results = await cache.aget_many(keys)
+        return tuple(results.get(key, {}) for key in keys)
+
+    async def live_projection(self, week: Week) -> LiveProjection:
+        """Projected points of the live games of a week, see
+        ``LiveProjection``."""
+        return await self._memoize(
+            ("live_projection", week.id), LiveProjection.aload, week.id
+        )
+
+    async def consensus(self, week: Week) -> Dict[int, Dict[int, int]]:
+        """Number of picks per selection of the week's games which kicked
+        off, keyed by game id.
+
+        Picks can't change after the kickoff, so the counts are cached until
+        the next game of the week kicks off.
+        """
+        now = datetime.now(UTC)
+        game_ids = sorted(
+            game.id for game in await self.week_games(week) if game.timestamp <= now
+        )
+        return await self._memoize(
+            ("consensus", week.id),
+            self._cached,
+            week.year.value,
+            f"consensus:{week.id}:{len(game_ids)}",
+            self._consensus,
+            game_ids,
+        )
+
+    async def _consensus(self, game_ids: List[int]) -> Dict[int, Dict[int, int]]:
+        res = {}
+        if not game_ids:
+            return res
+        async for row in (
+            Pick.objects.filter(game_id__in=game_ids)
+            .values("game", "selection")
+            .annotate(picks=Count("id"))
+            .order_by()
+        ):
+            res.setdefault(row["game"], {})[row["selection"]] = row["picks"]
+        return res
+
+    async def contrarian(self, season: int) -> Dict[int, Dict[str, Any]]:
+        """Picks of all users against the majority of a season, see
+        ``PickMatrix.contrarian``."""
+        return (await self.pick_matrix(season)).contrarian()
+
+    async def team_ratings(self) -> Dict[int, float]:
+        """Current Elo ratings of all rated teams keyed by team id."""
+        return await self._memoize("team_ratings", self._team_ratings)
+
+    async def _team_ratings(self) -> Dict[int, float]:
+        return {
+            team_id: rating
+            async for team_id, rating in TeamRating.objects.values_list(
+                "team_id", "rating"
+            )
+        }
+
+    async def pick_matrix(self, season: int) -> PickMatrix:
+        """Picks of all users of a season's started games, see
+        ``PickMatrix``."""
+        return await self._memoize(
+            ("pick_matrix", season), sync_to_async(PickMatrix.load), season
+        )
+
+    async def season_rollup(self, year: Year) -> Dict[int, Dict[str, int]]:
+        """Rollup of a season which is not stored yet, cached like the
+        season standings, see ``SeasonResultManager.compute``."""
+        return await self._cached(
+            year.value,
+            "season_rollup",
+            sync_to_async(SeasonResult.objects.compute),
+            year,
+        )
+
+    async def career_standings(self) -> Dict[int, Dict[str, Any]]:
+        """All-time standings of all users keyed by user id.
+
+        The careers of the stored seasons are cached until another season
+        is stored, only the rollups of the seasons after are added, so the
+        number of past seasons doesn't matter.
+        """
+        return await self._memoize("career_standings", self._career_standings)
+
+    async def _career_standings(self) -> Dict[int, Dict[str, Any]]:
+        latest = await SeasonResult.objects.aaggregate(latest=Max("id"))
+        key = f"nfl:career:{latest['latest']}"
+        stored = await cache.aget(key)
+        if stored is None:
+            stored = await sync_to_async(SeasonResult.objects.careers)()
+            await cache.aset(key, stored, settings.NFL_AGGREGATES_CACHE_TIMEOUT)
+        careers = stored["careers"]
+        years = [
+            year
+            async for year in Year.objects.filter(
+                start_timestamp__lte=datetime.now(UTC)
+            )
+            .exclude(value__in=stored["seasons"])
+            .order_by("value")
+        ]
+        rollups = await asyncio.gather(*[self.season_rollup(year) for year in years])
+        for year, rollup in zip(years, rollups):
+            SeasonResultManager.accumulate(careers, year.value, rollup)
+        for career in careers.values():
+            won, lost = career["won"], career["lost"]
+            career["won_lost_ratio"] = won / (won + lost) if won or lost else 0
+        return careers
+
+    @staticmethod
+    def season_games(week: Week) -> QuerySet:
+        return TeamStanding.objects.season_games(week)
+
+    async def team_stats(self, week: Week) -> Dict[int, Dict[str, int]]:
+        """Season records and points of all teams up to a week keyed by team id.
+
+        Completed weeks read their snapshot, see ``TeamStandingManager``, the
+        others are aggregated from the final games.
+        """
+        return await self._memoize(
+            ("team_stats", week.id),
+            self._cached,
+            week.year.value,
+            f"team_stats:{week.id}",
+            self._team_stats,
+            week,
+        )
+
+    async def _team_stats(self, week: Week) -> Dict[int, Dict[str, int]]:
+        if week.end_timestamp <= datetime.now(UTC):
+            res = {
+                row.pop("team"): row
+                async for row in TeamStanding.objects.filter(week=week).values(
+                    "team", *TeamStandingManager.fields
+                )
+            }
+            if res:
+                return res
+        return await sync_to_async(TeamStanding.objects.compute)(week)
+
+    @staticmethod
+    def prime_team_standings(
+        games: List[Game], team_stats: Dict[int, Dict[str, int]]
+    ) -> None:
+        """Set ``Team.standings`` of the teams of games from loaded stats."""
+        for game in games:
+            for team in (game.home_team, game.visitor_team):
+                if team is not None:
+                    stats = team_stats.get(team.id, {})
+                    team.__dict__["standings"] = (
+                        stats.get("won", 0),
+                        stats.get("lost", 0),
+                        stats.get("tie", 0),
+                    )
+
+    @staticmethod
+    def prime_win_probabilities(
+        games: List[Game], team_ratings: Dict[int, float]
+    ) -> None:
+        """Set ``Game.home_win_probability`` and
+        ``Game.visitor_win_probability`` of games which are not final from
+        loaded team ratings, ``None`` for final games and unrated teams."""
+        for game in games:
+            home = team_ratings.get(game.home_team_id)
+            visitor = team_ratings.get(game.visitor_team_id)
+            game.home_win_probability = game.visitor_win_probability = None
+            if not game.final and home is not None and visitor is not None:
+                game.home_win_probability = game_home_win(home, visitor)
+                game.visitor_win_probability = 1 - game.home_win_probability
+
+    @staticmethod
+    def prime_consensus(
+        games: List[Game], consensus: Dict[int, Dict[int, int]]
+    ) -> None:
+        """Set ``Game.consensus`` of games from loaded pick counts, the shares
+        of the selections, the majority and whether it was wrong. ``None``
+        for games without visible picks."""
+        for game in games:
+            counts = consensus.get(game.id)
+            if not counts:
+                game.consensus = None
+                continue
+            picks = sum(counts.values())
+            top = max(counts.values())
+            leaders = [choice for choice, n in counts.items() if n == top]
+            majority = leaders[0] if len(leaders) == 1 else None
+            winner = game.winner
+            game.consensus = {
+                "picks": picks,
+                "home": counts.get(PickChoices.HOME_TEAM, 0) / picks,
+                "visitor": counts.get(PickChoices.VISITOR_TEAM, 0) / picks,
+                "tie": counts.get(PickChoices.TIED_GAME, 0) / picks,
+                "majority": majority,
+                "minority_won": (
+                    winner is not None and majority is not None and winner != majority
+                ),
+            }
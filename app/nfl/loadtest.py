@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import random
+import re
+import statistics
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from nfl.api import EspnApiClient
+from nfl.models import Game
+
+logger = logging.getLogger(__name__)
+
+PAGES = {
+    "picks": "/nfl/picks/",
+    "standings": "/nfl/",
+    "schedule": "/nfl/schedule/",
+    "teams": "/nfl/teams/",
+}
+DEFAULT_MIX = {"picks": 5, "standings": 3, "schedule": 1, "teams": 1, "submit": 1}
+csrf_token_re = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+pick_field_re = re.compile(r'name="pick_(\d+)"')
+
+
+class StandInFeed(object):
+    """Stand-in for the ESPN API serving live scores of the given games.
+
+    Every poll of a game's competitors advances its score, after
+    ``final_after`` polls the game is final. Use ``transport`` as transport
+    of the ``EspnApiClient``.
+    """
+
+    def __init__(self, games: List[Game], final_after: int = 8, seed: int = 0):
+        self.games = {game.event_id: game for game in games}
+        self.final_after = final_after
+        self.random = random.Random(seed)
+        self.polls = defaultdict(int)
+        self.scores = defaultdict(lambda: {"home": 0, "away": 0})
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/")
+        try:
+            event_id = int(path[path.index("events") + 1])
+            game = self.games[event_id]
+        except (ValueError, IndexError, KeyError):
+            return httpx.Response(404, json={"error": "unknown event"})
+        if path[-1] == "score":
+            return httpx.Response(200, json=self.score(event_id, path[-2]))
+        self.polls[event_id] += 1
+        if self.polls[event_id] <= self.final_after:
+            for side in ("home", "away"):
+                self.scores[event_id][side] += self.random.choice([0, 0, 0, 3, 7])
+        elif self.scores[event_id]["home"] == self.scores[event_id]["away"]:
+            self.scores[event_id]["home"] += 3
+        base_url = f"{EspnApiClient.api_base_url}/events/{event_id}/competitors"
+        return httpx.Response(
+            200,
+            json={
+                "items": [
+                    {
+                        "homeAway": side,
+                        "id": str(team_id),
+                        "score": {"$ref": f"{base_url}/{side}/score"},
+                    }
+                    for side, team_id in (
+                        ("home", game.home_team_id),
+                        ("away", game.visitor_team_id),
+                    )
+                ]
+            },
+        )
+
+    def score(self, event_id: int, side: str) -> Dict[str, Any]:
+        res = {"value": self.scores[event_id][side]}
+        if self.polls[event_id] > self.final_after:
+            other = "away" if side == "home" else "home"
+            res["winner"] = res["value"] > self.scores[event_id][other]
+        return res
+
+
+class LoadTest(object):
+    """Replay game day traffic of simulated players against a running site.
+
+    Every player logs in and then requests pages or submits picks according
+    to the weighted ``mix`` until ``duration`` is over. Optionally the live
+    games of the current week are ingested concurrently from a
+    ``StandInFeed`` every ``ingest_interval`` seconds.
+
+    Parameters
+    ----------
+    base_url : str
+        URL of the site under test
+    usernames : List[str]
+        Players to simulate, all of them use ``password``
+    password : str
+        Password of the players
+    duration : float
+        Seconds to run
+    mix : Dict[str, int], optional
+        Weights of the page views and ``submit`` for pick submissions
+    think_time : float
+        Mean pause of a player between two requests in seconds
+    ingest_interval : float, optional
+        Seconds between two ingestion runs, no ingestion if not given
+    transport : httpx.AsyncBaseTransport, optional
+        Transport of the simulated players, e.g. to test an ASGI app
+    seed : int
+        Seed of the random number generator
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        usernames: List[str],
+        password: str,
+        duration: float,
+        mix: Optional[Dict[str, int]] = None,
+        think_time: float = 1.0,
+        ingest_interval: Optional[float] = None,
+        transport: httpx.AsyncBaseTransport = None,
+        seed: int = 0,
+    ):
+        self.base_url = base_url
+        self.usernames = usernames
+        self.password = password
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.think_time = think_time
+        self.ingest_interval = ingest_interval
+        self.transport = transport
+        self.random = random.Random(seed)
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        deadline = time.perf_counter() + self.duration
+        tasks = [
+            self.simulate_player(username, deadline) for username in self.usernames
+        ]
+        if self.ingest_interval:
+            tasks.append(self.ingest(deadline))
+        await asyncio.gather(*tasks)
+        return self.report()
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.warning(f"{method} {url} failed: {e}")
+            self.errors[name] += 1
+            return None
+        self.samples[name].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    async def simulate_player(self, username: str, deadline: float):
+        async with httpx.AsyncClient(
+            base_url=self.base_url, transport=self.transport, timeout=30
+        ) as client:
+            response = await self.request(client, "login", "GET", "/login/")
+            match = csrf_token_re.search(response.text) if response else None
+            if match is None:
+                return
+            response = await self.request(
+                client,
+                "login",
+                "POST",
+                "/login/",
+                data={
+                    "csrfmiddlewaretoken": match.group(1),
+                    "username": username,
+                    "password": self.password,
+                },
+            )
+            if response is None or response.status_code != 302:
+                logger.warning(f"Could not log in {username}")
+                return
+            game_ids = set()
+            names, weights = zip(*self.mix.items())
+            while time.perf_counter() < deadline:
+                name = self.random.choices(names, weights)[0]
+                if name == "submit" and game_ids:
+                    await self.request(
+                        client,
+                        name,
+                        "POST",
+                        PAGES["picks"],
+                        data={
+                            f"pick_{game_id}": f"{self.random.choice([1, 2])}_0"
+                            for game_id in game_ids
+                        },
+                        headers={"X-CSRFToken": client.cookies.get("csrftoken", "")},
+                    )
+                else:
+                    name = "picks" if name == "submit" else name
+                    response = await self.request(client, name, "GET", PAGES[name])
+                    if name == "picks" and response is not None:
+                        game_ids.update(pick_field_re.findall(response.text))
+                if self.think_time:
+                    await asyncio.sleep(self.random.expovariate(1 / self.think_time))
+
+    async def ingest(self, deadline: float):
+        now = datetime.now(UTC)
+        games = [
+            game
+            async for game in Game.objects.filter(
+                week__start_timestamp__lte=now, week__end_timestamp__gt=now, final=False
+            ).select_related("home_team", "visitor_team")
+        ]
+        feed = StandInFeed(games)
+        client = EspnApiClient(transport=feed.transport)
+        while games and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await client.check_games_async(games)
+            except Exception as e:
+                logger.warning(f"Ingestion failed: {e}")
+                self.errors["ingest"] += 1
+            else:
+                self.samples["ingest"].append(time.perf_counter() - start)
+            games = [game for game in games if not game.final]
+            await asyncio.sleep(self.ingest_interval)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles and errors per endpoint."""
+        res = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            samples = sorted(self.samples[name])
+            stats = {"requests": len(samples), "errors": self.errors[name]}
+            if samples:
+                if len(samples) > 1:
+                    percentiles = statistics.quantiles(
+                        samples, n=100, method="inclusive"
+                    )
+                else:
+                    percentiles = samples * 99
+                stats.update(
+                    {
+                        "rps": round(len(samples) / self.duration, 2),
+                        "p50_ms": round(percentiles[49] * 1000, 2),
+                        "p95_ms": round(percentiles[94] * 1000, 2),
+                        "p99_ms": round(percentiles[98] * 1000, 2),
+                        "max_ms": round(samples[-1] * 1000, 2),
+                    }
+                )
+            res[name] = stats
+        return res
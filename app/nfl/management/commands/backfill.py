@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nfl.backfill import BackfillRun
+from nfl.tasks import nfl_backfill_season, retry_backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill seasons from the ESPN API with one huey task per week, "
+        "retry the failed weeks of a backfill or show its report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("seasons", nargs="*", type=int, help="Seasons to import")
+        parser.add_argument("--retry", metavar="RUN", help="Retry the failed weeks")
+        parser.add_argument("--report", metavar="RUN", help="Show the totals")
+
+    def handle(self, *args, **kwargs):
+        if kwargs["report"]:
+            run = self.load(kwargs["report"])
+            self.stdout.write(json.dumps(run.report(), indent=2))
+        elif kwargs["retry"]:
+            week_ids = retry_backfill(self.load(kwargs["retry"]).run_id)
+            self.stdout.write(f"Retrying {len(week_ids)} weeks of {kwargs['retry']}")
+        elif kwargs["seasons"]:
+            for season in kwargs["seasons"]:
+                run = BackfillRun.create(season)
+                nfl_backfill_season(season, run.run_id)
+                self.stdout.write(f"Backfill of {season}: {run.run_id}")
+        else:
+            raise CommandError("Give seasons to backfill, --retry or --report")
+
+    @staticmethod
+    def load(run_id: str) -> BackfillRun:
+        run = BackfillRun.load(run_id)
+        if run is None:
+            raise CommandError(f"Unknown or expired backfill {run_id}")
+        return run
@@ -0,0 +1,205 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.middleware import request_stats_recorded
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    override_settings,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from nfl.generator import LeagueGenerator
+from nfl.models import Week
+
+# Cached aggregates must neither come from nor leak into the site's cache
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+VIEWS = {
+    "standings": "nfl:standings-week",
+    "teams": "nfl:teams-week",
+    "schedule": "nfl:schedule-week",
+    "picks": "nfl:picks-week",
+}
+
+
+def parse_sizes(value: str) -> List[Tuple[int, int]]:
+    try:
+        return [tuple(int(i) for i in size.split("x", 1)) for size in value.split(",")]
+    except ValueError:
+        raise CommandError(f"Invalid sizes {value}, expected e.g. 50x1,500x20")
+
+
+def summarize(durations: List[float], **extra) -> Dict[str, Any]:
+    return {
+        "min_ms": round(min(durations) * 1000, 2),
+        "median_ms": round(statistics.median(durations) * 1000, 2),
+        "mean_ms": round(statistics.mean(durations) * 1000, 2),
+        "max_ms": round(max(durations) * 1000, 2),
+        **extra,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the nfl views and week evaluation on generated leagues of "
+        "several sizes and write the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=parse_sizes,
+            default="50x1,200x5",
+            help="Comma separated league sizes as <players>x<seasons>",
+        )
+        parser.add_argument("-r", "--repeat", type=int, default=5)
+        parser.add_argument("-w", "--current-week", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "-o", "--output", default="-", help="JSON output file, - for stdout"
+        )
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help=(
+                "Use the configured database instead of a temporary test "
+                "database, all seasons and generated players are deleted"
+            ),
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["repeat"] < 1:
+            raise CommandError("At least one repetition is required")
+        if not 1 < kwargs["current_week"] <= 27:
+            raise CommandError("The current week has to be within 2 and 27")
+        if not kwargs["in_place"]:
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                runs = [
+                    self.run_size(players, seasons, **kwargs)
+                    for players, seasons in kwargs["sizes"]
+                ]
+        finally:
+            if not kwargs["in_place"]:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+        result = json.dumps(
+            {
+                "commit": git_commit(),
+                "created": datetime.now(UTC).isoformat(),
+                "database": connection.vendor,
+                "repeat": kwargs["repeat"],
+                "runs": runs,
+            },
+            indent=2,
+        )
+        if kwargs["output"] == "-":
+            self.stdout.write(result)
+        else:
+            with open(kwargs["output"], "w") as output:
+                output.write(result + "\n")
+
+    def run_size(self, players: int, seasons: int, **kwargs) -> Dict[str, Any]:
+        self.stderr.write(f"Generating {players} players and {seasons} seasons")
+        start = time.perf_counter()
+        with transaction.atomic():
+            LeagueGenerator.flush()
+            counts = LeagueGenerator(
+                players=players,
+                seasons=seasons,
+                current_week=kwargs["current_week"],
+                seed=kwargs["seed"],
+            ).generate()
+        counts["generate_s"] = round(time.perf_counter() - start, 2)
+        cache.clear()
+        week = (
+            Week.objects.select_related("year")
+            .filter(value=kwargs["current_week"])
+            .order_by("-year__value")
+            .first()
+        )
+        client = Client()
+        client.force_login(
+            get_user_model()
+            .objects.filter(username__startswith=LeagueGenerator.username_prefix)
+            .first()
+        )
+        benchmarks = {}
+        for name, url_name in VIEWS.items():
+            url = reverse(url_name, args=(week.year.value, week.value))
+            benchmarks[name] = self.benchmark_view(client, url, kwargs["repeat"])
+        benchmarks["evaluate_week"] = self.benchmark(
+            lambda: Week.objects.evaluate_week(week.year.value, week.value - 1),
+            kwargs["repeat"],
+        )
+        return {**counts, "benchmarks": benchmarks}
+
+    @staticmethod
+    def benchmark_view(client: Client, url: str, repeat: int) -> Dict[str, Any]:
+        records = []
+
+        def record_stats(sender, request, stats, **kwargs):
+            records.append(stats)
+
+        request_stats_recorded.connect(record_stats)
+        try:
+            client.get(url)  # warm up
+            records.clear()
+            durations = []
+            for _i in range(repeat):
+                start = time.perf_counter()
+                response = client.get(url)
+                durations.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}")
+        finally:
+            request_stats_recorded.disconnect(record_stats)
+        return summarize(
+            durations,
+            queries=records[-1].queries,
+            db_ms=round(statistics.median(r.db_time for r in records) * 1000, 2),
+            render_ms=round(
+                statistics.median(r.render_time for r in records) * 1000, 2
+            ),
+        )
+
+    @staticmethod
+    def benchmark(func: Callable, repeat: int) -> Dict[str, Any]:
+        func()  # warm up
+        durations = []
+        for _i in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                durations.append(time.perf_counter() - start)
+        return summarize(durations, queries=len(queries))
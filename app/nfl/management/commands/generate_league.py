@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from nfl.generator import LeagueGenerator
+from nfl.models import Year
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic league with players, seasons, games and picks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-p", "--players", type=int, default=50)
+        parser.add_argument("-s", "--seasons", type=int, default=1)
+        parser.add_argument(
+            "-w",
+            "--current-week",
+            type=int,
+            default=10,
+            help="Week of the current season which contains now [1-27]",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--password", default="pickpool", help="Password of all players"
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Delete all seasons and generated players first",
+        )
+
+    def handle(self, *args, **kwargs):
+        if not 1 <= kwargs["current_week"] <= 27:
+            raise CommandError("The current week has to be within 1 and 27")
+        with transaction.atomic():
+            if kwargs["flush"]:
+                LeagueGenerator.flush()
+            elif Year.objects.exists():
+                raise CommandError("Seasons exist already, use --flush to replace them")
+            counts = LeagueGenerator(
+                players=kwargs["players"],
+                seasons=kwargs["seasons"],
+                current_week=kwargs["current_week"],
+                seed=kwargs["seed"],
+                password=kwargs["password"],
+            ).generate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {counts['players']} players, {counts['seasons']} seasons, "
+                f"{counts['games']} games and {counts['picks']} picks"
+            )
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from nfl.generator import LeagueGenerator
+from nfl.loadtest import DEFAULT_MIX, LoadTest
+
+
+def parse_mix(value: str):
+    try:
+        mix = {
+            name: int(weight)
+            for name, weight in (item.split("=", 1) for item in value.split(","))
+        }
+    except ValueError:
+        raise CommandError(f"Invalid mix {value}, expected e.g. picks=5,submit=1")
+    if unknown := set(mix) - set(DEFAULT_MIX):
+        raise CommandError(f"Unknown pages in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate logged in players refreshing pages and submitting picks "
+        "against a running site, optionally while scores are ingested, and "
+        "report latency percentiles per endpoint. Use a league created with "
+        "generate_league in the database the site uses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("-u", "--users", type=int, default=50)
+        parser.add_argument("-d", "--duration", type=float, default=60)
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default=DEFAULT_MIX,
+            help="Weights of picks, standings, schedule, teams and submit",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=1.0,
+            help="Mean pause of a player between two requests in seconds",
+        )
+        parser.add_argument(
+            "--ingest",
+            type=float,
+            metavar="INTERVAL",
+            help=(
+                "Ingest the games of the current week from a stand-in feed every "
+                "INTERVAL seconds, this changes their scores in the database"
+            ),
+        )
+        parser.add_argument("--password", default="pickpool")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "-o", "--output", default="-", help="JSON output file, - for stdout"
+        )
+
+    def handle(self, *args, **kwargs):
+        usernames = list(
+            get_user_model()
+            .objects.filter(username__startswith=LeagueGenerator.username_prefix)
+            .order_by("id")
+            .values_list("username", flat=True)[: kwargs["users"]]
+        )
+        if not usernames:
+            raise CommandError("No generated players found, run generate_league")
+        report = asyncio.run(
+            LoadTest(
+                base_url=kwargs["base_url"],
+                usernames=usernames,
+                password=kwargs["password"],
+                duration=kwargs["duration"],
+                mix=kwargs["mix"],
+                think_time=kwargs["think_time"],
+                ingest_interval=kwargs["ingest"],
+                seed=kwargs["seed"],
+            ).run()
+        )
+        result = json.dumps(
+            {
+                "users": len(usernames),
+                "duration": kwargs["duration"],
+                "endpoints": report,
+            },
+            indent=2,
+        )
+        if kwargs["output"] == "-":
+            self.stdout.write(result)
+        else:
+            with open(kwargs["output"], "w") as output:
+                output.write(result + "\n")
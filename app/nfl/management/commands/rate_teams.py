@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from nfl.models import TeamRating
+
+
+class Command(BaseCommand):
+    help = (
+        "Add the final games which are not rated yet to the Elo ratings of the "
+        "teams or rate all games again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild", action="store_true", help="Rate the whole history again"
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["rebuild"]:
+            game_ids = TeamRating.objects.rebuild()
+        else:
+            game_ids = TeamRating.objects.rate_games()
+        self.stdout.write(f"Rated {len(game_ids)} games")
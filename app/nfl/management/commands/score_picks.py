@@ -0,0 +1,36 @@
+from core.loops import run_sync
+from django.core.management.base import BaseCommand
+
+from nfl.loaders import RequestLoader
+from nfl.models import Pick, SeasonResult, Week, WeekResult
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the points of all picks by the current scoring rules, e.g. after "
+        "NFL_SCORING_RULES changed, and store the results of the weeks and "
+        "seasons again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, help="Only score this season")
+
+    def handle(self, *args, **kwargs):
+        picks = Pick.objects.all()
+        weeks = Week.objects.select_related("year").order_by("year__value", "value")
+        if kwargs["season"]:
+            picks = picks.filter(game__week__year__value=kwargs["season"])
+            weeks = weeks.filter(year__value=kwargs["season"])
+        count = Pick.objects.score(picks)
+        deleted, _ = WeekResult.objects.filter(week__in=weeks).delete()
+        SeasonResult.objects.filter(year__week__in=weeks).delete()
+        first_weeks = {}
+        for week in weeks:
+            first_weeks.setdefault(week.year_id, week)
+        for week in first_weeks.values():
+            run_sync(RequestLoader().refresh_aggregates, week)
+        SeasonResult.objects.freeze()
+        self.stdout.write(
+            f"Scored {count} picks, dropped {deleted} week results and refreshed "
+            f"{len(first_weeks)} seasons"
+        )
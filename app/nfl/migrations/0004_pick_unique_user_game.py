@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_picks(apps, schema_editor):
+    """Keep only the latest pick of every user and game."""
+    db_alias = schema_editor.connection.alias
+    Pick = apps.get_model("nfl", "Pick")
+    duplicates = (
+        Pick.objects.using(db_alias)
+        .values("user", "game")
+        .annotate(count=Count("id"), latest=Max("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        Pick.objects.using(db_alias).filter(
+            user=duplicate["user"], game=duplicate["game"]
+        ).exclude(id=duplicate["latest"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0003_auto_20220117_2019"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_picks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="pick",
+            constraint=models.UniqueConstraint(
+                fields=("user", "game"), name="nfl_pick_unique_user_game"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0004_pick_unique_user_game"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                fields=["week", "timestamp"], name="nfl_game_week_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["timestamp"], name="nfl_game_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="week",
+            index=models.Index(
+                fields=["start_timestamp", "end_timestamp"], name="nfl_week_range_idx"
+            ),
+        ),
+    ]
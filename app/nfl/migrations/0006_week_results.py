@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_tie_break_games(apps, schema_editor):
+    Game = apps.get_model("nfl", "Game")
+    last_games = {}
+    for game_id, week_id in Game.objects.order_by("timestamp", "id").values_list(
+        "id", "week_id"
+    ):
+        last_games[week_id] = game_id
+    Game.objects.filter(id__in=last_games.values()).update(tie_break=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0005_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="tie_break",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_tie_break_games, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="WeekResult",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("points", models.PositiveSmallIntegerField()),
+                ("tie_break", models.PositiveSmallIntegerField(null=True)),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="week_results",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "week",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="nfl.week",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["week", "rank"], name="nfl_weekresult_rank_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("week", "user"), name="nfl_weekresult_unique_week_user"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0006_week_results"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamRating",
+            fields=[
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating",
+                        serialize=False,
+                        to="nfl.team",
+                    ),
+                ),
+                ("rating", models.FloatField(default=1500)),
+                ("season", models.PositiveSmallIntegerField()),
+                ("games", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="rated",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0007_team_ratings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamStanding",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("won", models.PositiveSmallIntegerField(default=0)),
+                ("lost", models.PositiveSmallIntegerField(default=0)),
+                ("tie", models.PositiveSmallIntegerField(default=0)),
+                ("points_for", models.PositiveIntegerField(default=0)),
+                ("points_against", models.PositiveIntegerField(default=0)),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="week_standings",
+                        to="nfl.team",
+                    ),
+                ),
+                (
+                    "week",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="team_standings",
+                        to="nfl.week",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("week", "team"),
+                        name="nfl_teamstanding_unique_week_team",
+                    )
+                ],
+            },
+        ),
+    ]
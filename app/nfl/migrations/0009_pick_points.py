@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:57
+
+from django.db import migrations, models
+from django.db.models import F, Q
+
+# Won picks, the selections are home 1, visitor 2 and tie 3. Migrations
+# keep their own copy instead of importing the app's queries.
+WON_PICK = (
+    Q(game__visitor_team_score__gt=F("game__home_team_score"), selection=2)
+    | Q(game__home_team_score__gt=F("game__visitor_team_score"), selection=1)
+    | Q(game__visitor_team_score=F("game__home_team_score"), selection=3)
+)
+
+
+def score_final_picks(apps, schema_editor):
+    # Points of the default rules, a point per correct pick. Other rules are
+    # applied with manage.py score_picks.
+    Pick = apps.get_model("nfl", "Pick")
+    Pick.objects.filter(WON_PICK, game__final=True).update(points=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0008_team_standings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pick",
+            name="points",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(score_final_picks, migrations.RunPython.noop),
+    ]
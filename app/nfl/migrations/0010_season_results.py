@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0009_pick_points"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeasonResult",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("points", models.PositiveIntegerField(default=0)),
+                ("won", models.PositiveSmallIntegerField(default=0)),
+                ("lost", models.PositiveSmallIntegerField(default=0)),
+                ("weeks_won", models.PositiveSmallIntegerField(default=0)),
+                ("longest_streak", models.PositiveSmallIntegerField(default=0)),
+                ("first_streak", models.PositiveSmallIntegerField(default=0)),
+                ("last_streak", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="season_results",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "year",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="nfl.year",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("year", "user"),
+                        name="nfl_seasonresult_unique_year_user",
+                    )
+                ],
+            },
+        ),
+    ]
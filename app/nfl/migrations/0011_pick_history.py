@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Q, Subquery
+
+# Won picks, the selections are home 1, visitor 2 and tie 3. Migrations
+# keep their own copy instead of importing the app's queries.
+WON_PICK = (
+    Q(game__visitor_team_score__gt=F("game__home_team_score"), selection=2)
+    | Q(game__home_team_score__gt=F("game__visitor_team_score"), selection=1)
+    | Q(game__visitor_team_score=F("game__home_team_score"), selection=3)
+)
+
+
+def copy_kickoffs(apps, schema_editor):
+    Game = apps.get_model("nfl", "Game")
+    Pick = apps.get_model("nfl", "Pick")
+    Pick.objects.update(
+        kickoff=Subquery(
+            Game.objects.filter(pk=OuterRef("game_id")).values("timestamp")[:1]
+        )
+    )
+    Pick.objects.filter(game__final=True).update(correct=False)
+    Pick.objects.filter(WON_PICK, game__final=True).update(correct=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nfl", "0010_season_results"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pick",
+            name="correct",
+            field=models.BooleanField(null=True),
+        ),
+        migrations.AddField(
+            model_name="pick",
+            name="kickoff",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="pick",
+            index=models.Index(
+                fields=["user", "kickoff", "game", "correct"],
+                name="nfl_pick_history_idx",
+            ),
+        ),
+        migrations.RunPython(copy_kickoffs, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,27 @@
-from datetime import UTC, datetime
-from typing import Dict, List, Tuple
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Tuple
 from zoneinfo import ZoneInfo
 
-from core.models import PickPoolUser
+import numpy as np
+
+from core.models import PickPoolUser, lost_pick_query, won_pick_query
 from django.conf import settings
-from django.db import models
-from django.db.models import F, Q
-from django.db.models.aggregates import Count
+from django.db import connections, models, router, transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    When,
+)
+from django.db.models.aggregates import Count, Sum
+from django.db.models.functions import Abs, Cast, Coalesce
+from django.utils.functional import cached_property
 
 from nfl.defines import (
     CityChoices,
@@ -15,6 +30,8 @@ from nfl.defines import (
     StadiumChoices,
     TeamChoices,
 )
+from nfl.ratings import INITIAL_RATING, elo_pass
+from nfl.scoring import GAME_FIELDS, Scoring
 
 est_tz = ZoneInfo("EST")
 
@@ -46,7 +63,7 @@ class Team(models.Model):
             return self.full_name.rsplit(" ", 1)[1]
         return self.full_name
 
-    @property
+    @cached_property
     def standings(self) -> Tuple[int, int, int]:
         cur_date = datetime.now(UTC)
         cur_week = (
@@ -54,6 +71,8 @@ class Team(models.Model):
             .filter(start_timestamp__lte=cur_date, end_timestamp__gt=cur_date)
             .first()
         )
+        if cur_week is None:
+            return 0, 0, 0
         season_games = Game.objects.filter(
             Q(home_team=self.id) | Q(visitor_team=self.id),
             final=True,
@@ -113,15 +132,23 @@ class YearManager(models.Manager):
         List[Tuple[int, List[PickPoolUser]]]
             List of tuples containing earned points with corresponding users.
         """
-        try:
-            cur_year = self.get(year=year)
-        except Year.DoesNotExist:
-            pass
-        return []
+        rows = (
+            Pick.objects.filter(game__week__year__value=year)
+            .values("user")
+            .annotate(total=Scoring.from_settings().total())
+            .order_by()
+        )
+        points = {row["user"]: row["total"] for row in rows}
+        users = PickPoolUser.objects.in_bulk(list(points))
+        res = {}
+        for user_id, total in sorted(points.items()):
+            res.setdefault(total, []).append(users[user_id])
+        return sorted(res.items(), key=lambda i: i[0], reverse=True)
 
 
 class Year(DateRangeMixin):
     value = models.PositiveSmallIntegerField(unique=True)
+    objects = YearManager()
 
     def __str__(self) -> str:
         return f"Year: {self.value}"
@@ -145,33 +172,27 @@ class WeekManager(models.Manager):
         Returns
         -------
         List[Tuple[int, List[PickPoolUser]]]
-            List of tuples containing earned points with corresponding users.
+            List of tuples containing earned points with corresponding users,
+            users with equal points are ordered by their tie break.
         """
         try:
             cur_week = self.get(year__value=year, value=week)
-            user_points = {}
-            for game in cur_week.games.all():
-                game_points = game.evaluate_game()
-                for pick, points in game_points.items():
-                    if pick.user in user_points:
-                        user_points[pick.user] += points
-                    else:
-                        user_points[pick.user] = points
-
-            res = {}
-            for user, points in user_points.items():
-                if points in res:
-                    res[points].append(user)
-                else:
-                    res[points] = [user]
-            return sorted(res.items(), reverse=True)
         except Week.DoesNotExist:
             return []
+        res = {}
+        for result in WeekResult.objects.leaderboard(cur_week):
+            res.setdefault(result.points, []).append(result.user)
+        return sorted(res.items(), reverse=True)
 
 
 class Week(DateRangeMixin):
     class Meta:
         unique_together = ["year", "value"]
+        indexes = [
+            models.Index(
+                fields=["start_timestamp", "end_timestamp"], name="nfl_week_range_idx"
+            )
+        ]
 
     value = models.PositiveSmallIntegerField()
     year = models.ForeignKey(Year, on_delete=models.CASCADE)
@@ -214,7 +235,53 @@ class Week(DateRangeMixin):
         return f"Week: {self.value}, {self.year}"
 
 
+class GameManager(models.Manager):
+    def missing(self, now: datetime = None) -> models.QuerySet:
+        """Games which need an update from the API.
+
+        These are started but not final games and games without known teams
+        of the last and next 14 days.
+        """
+        now = now or datetime.now(UTC)
+        # A single range keeps the number of read rows independent of the
+        # history, the conditions are checked on these rows only.
+        return self.filter(
+            Q(timestamp__lte=now, final=False)
+            | Q(home_team__isnull=True)
+            | Q(visitor_team__isnull=True),
+            timestamp__range=[now - timedelta(days=14), now + timedelta(days=14)],
+        )
+
+    def mark_tie_break_games(self, week_ids: List[int]) -> List[int]:
+        """Mark the last game of each week as its tie break game.
+
+        Returns
+        -------
+        List[int]
+            Ids of the tie break games.
+        """
+        last_games = {}
+        for game_id, week_id in (
+            self.filter(week_id__in=week_ids)
+            .order_by("timestamp", "id")
+            .values_list("id", "week_id")
+        ):
+            last_games[week_id] = game_id
+        game_ids = list(last_games.values())
+        self.filter(week_id__in=week_ids, tie_break=True).exclude(
+            id__in=game_ids
+        ).update(tie_break=False)
+        self.filter(id__in=game_ids, tie_break=False).update(tie_break=True)
+        return game_ids
+
+
 class Game(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=["week", "timestamp"], name="nfl_game_week_ts_idx"),
+            models.Index(fields=["timestamp"], name="nfl_game_ts_idx"),
+        ]
+
     week = models.ForeignKey(Week, on_delete=models.CASCADE, related_name="games")
     timestamp = models.DateTimeField()
     event_id = models.PositiveIntegerField()
@@ -235,6 +302,32 @@ class Game(models.Model):
     )
     visitor_team_score = models.PositiveSmallIntegerField(null=True, default=None)
     final = models.BooleanField(default=False)
+    # The last game of a week, marked on import, see ``mark_tie_break_games``
+    tie_break = models.BooleanField(default=False)
+    # Whether the result is part of the team ratings, see ``TeamRatingManager``
+    rated = models.BooleanField(default=False)
+    objects = GameManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_timestamp = instance.__dict__.get("timestamp")
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # The pick history orders by the kickoff copied to the picks, keep it
+        # in sync with rescheduled games
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            rescheduled = "timestamp" in update_fields
+        else:
+            loaded = getattr(self, "_loaded_timestamp", None)
+            rescheduled = not adding and self.timestamp != loaded
+        if rescheduled:
+            self.picks.exclude(kickoff=self.timestamp).update(kickoff=self.timestamp)
+        self._loaded_timestamp = self.timestamp
 
     @property
     def winner(self) -> PickChoices:
@@ -265,6 +358,39 @@ class Game(models.Model):
             user_points[pick] = pick.awarded_points
         return user_points
 
+    def outcome_points(
+        self, winner: PickChoices, scoring: Scoring = None
+    ) -> Dict[PickChoices, int]:
+        """Points of the picks of this game if it ended with ``winner``, to
+        project live or unfinished games by the scoring rules. The week of
+        the game is loaded if it isn't already.
+
+        Returns
+        -------
+        Dict[PickChoices, int]
+            Points of a pick by its selection.
+        """
+        scoring = scoring or Scoring.from_settings()
+        home, visitor = {
+            PickChoices.HOME_TEAM: (1, 0),
+            PickChoices.VISITOR_TEAM: (0, 1),
+            PickChoices.TIED_GAME: (0, 0),
+        }[winner]
+        outcome = Game(
+            week=self.week,
+            home_team_score=home,
+            visitor_team_score=visitor,
+            final=True,
+        )
+        return {
+            choice: scoring.points(Pick(game=outcome, selection=choice))
+            for choice in (
+                PickChoices.HOME_TEAM,
+                PickChoices.VISITOR_TEAM,
+                PickChoices.TIED_GAME,
+            )
+        }
+
     def is_monday_night(self) -> bool:
         """Check if this game is a monday night game.
 
@@ -282,7 +408,172 @@ class Game(models.Model):
         return f"{self.visitor_team} at {self.home_team} on {self.timestamp}"
 
 
+class PickManager(models.Manager):
+    history_results = {
+        "won": Q(correct=True),
+        "lost": Q(correct=False),
+        "open": Q(correct__isnull=True),
+    }
+
+    def submit(
+        self,
+        user: PickPoolUser,
+        selections: Dict[int, Tuple[int, int]],
+        now: datetime = None,
+    ) -> Tuple[List["Pick"], List[int]]:
+        """Create or change the picks of a user with a single upsert.
+
+        Games are fetched with one query, picks of unknown games or of games
+        which already kicked off are rejected.
+
+        Parameters
+        ----------
+        user : PickPoolUser
+            User submitting the picks
+        selections : Dict[int, Tuple[int, int]]
+            Mapping of game ids to the picked selection and tie break
+        now : datetime, optional
+            Point in time to check the kickoff against, defaults to now
+
+        Returns
+        -------
+        Tuple[List[Pick], List[int]]
+            Saved picks and the ids of the rejected games.
+        """
+        now = now or datetime.now(UTC)
+        games = Game.objects.only("id", "timestamp").in_bulk(list(selections))
+        picks, rejected = [], []
+        for game_id, (selection, tie_break) in selections.items():
+            game = games.get(game_id)
+            if game is None or game.timestamp <= now:
+                rejected.append(game_id)
+                continue
+            picks.append(
+                Pick(
+                    user=user,
+                    game=game,
+                    kickoff=game.timestamp,
+                    selection=selection,
+                    picked_tie_break=tie_break,
+                )
+            )
+        if picks:
+            # MySQL upserts on any unique key and does not accept a target
+            unique_fields = None
+            db_features = connections[router.db_for_write(self.model)].features
+            if db_features.supports_update_conflicts_with_target:
+                unique_fields = ["user", "game"]
+            self.bulk_create(
+                picks,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=["selection", "picked_tie_break", "kickoff"],
+            )
+        return picks, rejected
+
+    def score(self, picks: models.QuerySet = None, scoring: Scoring = None) -> int:
+        """Store the points of picks by the scoring rules with one update.
+
+        The points are read from a subquery of the picks' games, so it runs
+        on databases not selecting from the updated table as well.
+
+        Parameters
+        ----------
+        picks : QuerySet, optional
+            Picks to score, defaults to all picks
+        scoring : Scoring, optional
+            Scoring rules, defaults to the ones of the settings
+
+        Returns
+        -------
+        int
+            Number of updated picks.
+        """
+        scoring = scoring or Scoring.from_settings()
+        picks = self.all() if picks is None else picks
+        games = Game.objects.filter(pk=OuterRef("game_id"))
+        return picks.update(
+            points=Subquery(
+                games.annotate(points=scoring.expression(GAME_FIELDS)).values("points")[
+                    :1
+                ]
+            ),
+            correct=Subquery(
+                games.annotate(correct=GAME_FIELDS.correct()).values("correct")[:1]
+            ),
+        )
+
+    def history(
+        self,
+        user: PickPoolUser,
+        cursor: Tuple[datetime, int] = None,
+        season: "Year" = None,
+        team: int = None,
+        result: str = None,
+        until: datetime = None,
+    ) -> models.QuerySet:
+        """Picks of a user, the latest kickoff first.
+
+        Pages are read with a keyset on the kickoff and the game, which
+        matches the index ``nfl_pick_history_idx``, so deep pages cost as
+        much as the first one. The season is a range of kickoffs on the same
+        index.
+
+        Parameters
+        ----------
+        user : PickPoolUser
+            User whose picks are listed
+        cursor : Tuple[datetime, int], optional
+            Kickoff and game id of the last pick of the previous page
+        season : Year, optional
+            Only picks of this season
+        team : int, optional
+            Only picks of the games of this team
+        result : str, optional
+            Only picks with this result, a key of ``history_results``
+        until : datetime, optional
+            Only picks of games which kicked off until then
+
+        Returns
+        -------
+        QuerySet
+            Picks ordered by kickoff and game, descending.
+        """
+        picks = self.filter(user=user)
+        if cursor is not None:
+            kickoff, game_id = cursor
+            # The redundant bound makes it a range scan of the index
+            picks = picks.filter(
+                Q(kickoff__lt=kickoff) | Q(kickoff=kickoff, game_id__lt=game_id),
+                kickoff__lte=kickoff,
+            )
+        if season is not None:
+            picks = picks.filter(
+                kickoff__gte=season.start_timestamp, kickoff__lt=season.end_timestamp
+            )
+        if team is not None:
+            picks = picks.filter(Q(game__home_team=team) | Q(game__visitor_team=team))
+        if result is not None:
+            picks = picks.filter(self.history_results[result])
+        if until is not None:
+            picks = picks.filter(kickoff__lte=until)
+        return picks.order_by("-kickoff", "-game_id")
+
+
 class Pick(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "game"], name="nfl_pick_unique_user_game"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "kickoff", "game", "correct"],
+                name="nfl_pick_history_idx",
+            )
+        ]
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="picks"
     )
@@ -291,6 +582,18 @@ class Pick(models.Model):
         choices=PickChoices.choices, default=PickChoices.TBP
     )
     picked_tie_break = models.PositiveSmallIntegerField(default=0)
+    # Kickoff of the game, the key of the pick history with the game
+    kickoff = models.DateTimeField(null=True)
+    # Points by the scoring rules once the game is final, see nfl.scoring
+    points = models.PositiveSmallIntegerField(default=0)
+    # Whether the winner was picked, None until the game is final
+    correct = models.BooleanField(null=True)
+    objects = PickManager()
+
+    def save(self, *args, **kwargs):
+        if self.kickoff is None:
+            self.kickoff = self.game.timestamp
+        super().save(*args, **kwargs)
 
     @property
     def awarded_points(self) -> int:
@@ -301,9 +604,7 @@ class Pick(models.Model):
         int
             Points earned, if any
         """
-        if self.selection == self.game.winner:
-            return 1
-        return 0
+        return Scoring.from_settings().points(self)
 
     @property
     def tie_break(self) -> int:
@@ -329,3 +630,566 @@ class Pick(models.Model):
 
     def __str__(self) -> str:
         return f"{self.user.first_name} picked '{PickChoices(self.selection).label}' for {self.game}"
+
+
+def tie_break_distance() -> Case:
+    """Database expression of ``Pick.tie_break``, scores are cast to signed
+    integers so the differences can be negative on MySQL as well."""
+    home = Cast("game__home_team_score", IntegerField())
+    visitor = Cast("game__visitor_team_score", IntegerField())
+    return Case(
+        When(won_pick_query, then=Abs(Abs(home - visitor) - F("picked_tie_break"))),
+        When(
+            game__home_team_score__gt=F("game__visitor_team_score"),
+            then=home + F("picked_tie_break"),
+        ),
+        When(
+            game__visitor_team_score__gt=F("game__home_team_score"),
+            then=visitor + F("picked_tie_break"),
+        ),
+        default=F("picked_tie_break"),
+        output_field=IntegerField(),
+    )
+
+
+class WeekResultManager(models.Manager):
+    def rank(self, week: Week) -> List["WeekResult"]:
+        """Rank all users with picks of a week with a single query.
+
+        Users are ordered by their points, then by the distance of their tie
+        break from the final margin of the tie break game. Users with equal
+        points and distance share a rank.
+
+        Returns
+        -------
+        List[WeekResult]
+            Unsaved results ordered by rank.
+        """
+        return self.rank_weeks([week]).get(week.id, [])
+
+    def rank_weeks(self, weeks: List[Week]) -> Dict[int, List["WeekResult"]]:
+        """Rank all users with picks of several weeks with a single query,
+        see ``rank``.
+
+        Returns
+        -------
+        Dict[int, List[WeekResult]]
+            Unsaved results ordered by rank keyed by week id.
+        """
+        rows = (
+            Pick.objects.filter(game__week__in=weeks)
+            .values("game__week", "user")
+            .annotate(
+                points=Scoring.from_settings().total(),
+                tie_break=Sum(
+                    tie_break_distance(),
+                    filter=Q(game__tie_break=True, game__final=True),
+                ),
+            )
+            .order_by(
+                "game__week", "-points", F("tie_break").asc(nulls_last=True), "user"
+            )
+        )
+        weeks = {week.id: week for week in weeks}
+        res = {}
+        for row in rows:
+            results = res.setdefault(row["game__week"], [])
+            rank = len(results) + 1
+            if results and (results[-1].points, results[-1].tie_break) == (
+                row["points"],
+                row["tie_break"],
+            ):
+                rank = results[-1].rank
+            results.append(
+                WeekResult(
+                    week=weeks[row["game__week"]],
+                    user_id=row["user"],
+                    points=row["points"],
+                    tie_break=row["tie_break"],
+                    rank=rank,
+                )
+            )
+        return res
+
+    def leaderboard(self, week: Week, now: datetime = None) -> List["WeekResult"]:
+        """Ranked results of a week with their users.
+
+        Results of a week which is over and whose games are all final are
+        stored on first use and never recomputed.
+        """
+        results = list(
+            self.filter(week=week).select_related("user").order_by("rank", "user_id")
+        )
+        if results:
+            return results
+        results = self.rank(week)
+        users = PickPoolUser.objects.in_bulk([result.user_id for result in results])
+        for result in results:
+            result.user = users[result.user_id]
+        now = now or datetime.now(UTC)
+        if (
+            results
+            and week.end_timestamp <= now
+            and not week.games.filter(final=False).exists()
+        ):
+            self.bulk_create(results, ignore_conflicts=True)
+        return results
+
+
+class WeekResult(models.Model):
+    """Rank of a user in a finished week, see ``WeekResultManager``."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["week", "user"], name="nfl_weekresult_unique_week_user"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["week", "rank"], name="nfl_weekresult_rank_idx")
+        ]
+
+    week = models.ForeignKey(Week, on_delete=models.CASCADE, related_name="results")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="week_results"
+    )
+    points = models.PositiveSmallIntegerField()
+    # Distance of the tie break from the final margin, None without a pick of
+    # the tie break game
+    tie_break = models.PositiveSmallIntegerField(null=True)
+    rank = models.PositiveSmallIntegerField()
+    objects = WeekResultManager()
+
+    def __str__(self) -> str:
+        return f"{self.rank}. {self.user} with {self.points} points in {self.week}"
+
+
+class TeamRatingManager(models.Manager):
+    def rate_games(self) -> List[int]:
+        """Add the results of all final games which are not rated yet to the
+        team ratings, in the order of the kickoffs.
+
+        The new games are rated with ``elo_pass`` and the changed ratings are
+        stored with one upsert. Without stored ratings this rates the whole
+        history at once.
+
+        Returns
+        -------
+        List[int]
+            Ids of the rated games.
+        """
+        with transaction.atomic():
+            games = list(
+                Game.objects.select_for_update(of=("self",))
+                .filter(
+                    final=True,
+                    rated=False,
+                    home_team__isnull=False,
+                    visitor_team__isnull=False,
+                    home_team_score__isnull=False,
+                    visitor_team_score__isnull=False,
+                )
+                .order_by("timestamp", "id")
+                .values_list(
+                    "id",
+                    "week__year__value",
+                    "home_team_id",
+                    "visitor_team_id",
+                    "home_team_score",
+                    "visitor_team_score",
+                )
+            )
+            if not games:
+                return []
+            ids, game_seasons, home_ids, visitor_ids, home_scores, visitor_scores = (
+                np.array(column) for column in zip(*games)
+            )
+            stored = self.in_bulk()
+            team_ids = sorted(set(stored) | set(home_ids) | set(visitor_ids))
+            index = {team_id: idx for idx, team_id in enumerate(team_ids)}
+            ratings = np.array(
+                [
+                    stored[team_id].rating if team_id in stored else INITIAL_RATING
+                    for team_id in team_ids
+                ],
+                dtype=float,
+            )
+            seasons = np.array(
+                [
+                    stored[team_id].season if team_id in stored else 0
+                    for team_id in team_ids
+                ]
+            )
+            home = np.array([index[team_id] for team_id in home_ids.tolist()])
+            visitor = np.array([index[team_id] for team_id in visitor_ids.tolist()])
+            elo_pass(
+                ratings,
+                seasons,
+                home,
+                visitor,
+                game_seasons,
+                np.sign(home_scores - visitor_scores) / 2 + 0.5,
+                settings.NFL_ELO_K,
+                settings.NFL_ELO_HOME_ADVANTAGE,
+                settings.NFL_ELO_REVERSION,
+            )
+            played = np.bincount(
+                np.concatenate([home, visitor]), minlength=len(team_ids)
+            )
+            unique_fields = None
+            db_features = connections[router.db_for_write(self.model)].features
+            if db_features.supports_update_conflicts_with_target:
+                unique_fields = ["team"]
+            self.bulk_create(
+                [
+                    TeamRating(
+                        team_id=team_id,
+                        rating=float(ratings[idx]),
+                        season=int(seasons[idx]),
+                        games=(stored[team_id].games if team_id in stored else 0)
+                        + int(played[idx]),
+                    )
+                    for team_id, idx in index.items()
+                    if played[idx]
+                ],
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=["rating", "season", "games"],
+            )
+            ids = ids.tolist()
+            Game.objects.filter(id__in=ids).update(rated=True)
+        return ids
+
+    def rebuild(self) -> List[int]:
+        """Rate the whole history again, e.g. after results were corrected."""
+        with transaction.atomic():
+            self.all().delete()
+            Game.objects.filter(rated=True).update(rated=False)
+            return self.rate_games()
+
+
+class TeamRating(models.Model):
+    """Elo rating of a team, see ``TeamRatingManager``."""
+
+    team = models.OneToOneField(
+        Team, on_delete=models.CASCADE, primary_key=True, related_name="rating"
+    )
+    rating = models.FloatField(default=INITIAL_RATING)
+    # Season of the last rated game, the rating reverts to the mean with the
+    # first game of a new season
+    season = models.PositiveSmallIntegerField()
+    games = models.PositiveIntegerField(default=0)
+    objects = TeamRatingManager()
+
+    def __str__(self) -> str:
+        return f"{self.team} rated {self.rating:.0f}"
+
+
+class TeamStandingManager(models.Manager):
+    fields = ("won", "lost", "tie", "points_for", "points_against")
+
+    @staticmethod
+    def season_games(week: Week) -> models.QuerySet:
+        """Final games of a season up to a week, the preseason doesn't count
+        for the regular season and the playoffs."""
+        season_games = Game.objects.filter(
+            final=True,
+            week__year__value=week.year.value,
+            week__value__lte=week.value,
+        )
+        if week.season_type in [SeasonType.REGULAR, SeasonType.POST]:
+            season_games = season_games.exclude(week__value__lt=5)
+        return season_games
+
+    def compute(self, week: Week) -> Dict[int, Dict[str, int]]:
+        """Season records and points of all teams up to a week keyed by team
+        id, aggregated with one grouped query for home and one for visitor
+        games."""
+        season_games = self.season_games(week)
+        res = {}
+        for team, score, opp_score in (
+            ("home_team", "home_team_score", "visitor_team_score"),
+            ("visitor_team", "visitor_team_score", "home_team_score"),
+        ):
+            rows = (
+                season_games.values(team)
+                .annotate(
+                    won=Count("id", filter=Q(**{f"{score}__gt": F(opp_score)})),
+                    lost=Count("id", filter=Q(**{f"{score}__lt": F(opp_score)})),
+                    tie=Count("id", filter=Q(**{score: F(opp_score)})),
+                    points_for=Coalesce(
+                        Sum(score, filter=Q(**{f"{score}__gt": F(opp_score)})), 0
+                    ),
+                    points_against=Coalesce(
+                        Sum(opp_score, filter=Q(**{f"{score}__lt": F(opp_score)})), 0
+                    ),
+                )
+                .order_by()
+            )
+            for row in rows:
+                stats = res.setdefault(row[team], dict.fromkeys(self.fields, 0))
+                for field in self.fields:
+                    stats[field] += row[field]
+        return res
+
+    def snapshot(self, weeks: List[Week], now: datetime = None) -> List[Week]:
+        """Store the standings of the teams after each completed week, or
+        patch them after a score correction.
+
+        A week is completed when it is over and all its games are final.
+
+        Returns
+        -------
+        List[Week]
+            Weeks whose snapshot was stored.
+        """
+        now = now or datetime.now(UTC)
+        weeks = [week for week in weeks if week.end_timestamp <= now]
+        if not weeks:
+            return []
+        running = set(
+            Game.objects.filter(week__in=weeks, final=False).values_list(
+                "week_id", flat=True
+            )
+        )
+        completed = [week for week in weeks if week.id not in running]
+        unique_fields = None
+        db_features = connections[router.db_for_write(self.model)].features
+        if db_features.supports_update_conflicts_with_target:
+            unique_fields = ["week", "team"]
+        with transaction.atomic():
+            for week in completed:
+                stats = self.compute(week)
+                self.filter(week=week).exclude(team__in=stats).delete()
+                self.bulk_create(
+                    [
+                        TeamStanding(week=week, team_id=team_id, **team_stats)
+                        for team_id, team_stats in stats.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=self.fields,
+                )
+        return completed
+
+
+class TeamStanding(models.Model):
+    """Season record and points of a team after a completed week, see
+    ``TeamStandingManager``."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["week", "team"], name="nfl_teamstanding_unique_week_team"
+            )
+        ]
+
+    week = models.ForeignKey(
+        Week, on_delete=models.CASCADE, related_name="team_standings"
+    )
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="week_standings"
+    )
+    won = models.PositiveSmallIntegerField(default=0)
+    lost = models.PositiveSmallIntegerField(default=0)
+    tie = models.PositiveSmallIntegerField(default=0)
+    points_for = models.PositiveIntegerField(default=0)
+    points_against = models.PositiveIntegerField(default=0)
+    objects = TeamStandingManager()
+
+    def __str__(self) -> str:
+        return f"{self.team} {self.won}-{self.lost}-{self.tie} after {self.week}"
+
+
+class SeasonResultManager(models.Manager):
+    fields = (
+        "points",
+        "won",
+        "lost",
+        "weeks_won",
+        "longest_streak",
+        "first_streak",
+        "last_streak",
+    )
+
+    def compute(self, year: Year, now: datetime = None) -> Dict[int, Dict[str, int]]:
+        """Season rollup of all users with picks of final games keyed by user
+        id.
+
+        The picks are read in the order of their kickoff with one query, the
+        weeks which ended are ranked with another one, see
+        ``WeekResultManager.rank_weeks``.
+
+        Streaks are runs of correct picks, picks of a team in a tied game
+        neither extend nor break them. ``first_streak`` is the run from the
+        first pick of the season, ``last_streak`` the run up to its last pick.
+        """
+        now = now or datetime.now(UTC)
+        weeks = list(Week.objects.filter(year=year, end_timestamp__lte=now))
+        weeks_won = {}
+        for results in WeekResult.objects.rank_weeks(weeks).values():
+            for result in results:
+                if result.rank == 1:
+                    weeks_won[result.user_id] = weeks_won.get(result.user_id, 0) + 1
+        picks = (
+            Pick.objects.filter(game__week__year=year, game__final=True)
+            .annotate(
+                won=ExpressionWrapper(won_pick_query, output_field=BooleanField()),
+                lost=ExpressionWrapper(lost_pick_query, output_field=BooleanField()),
+                score=Scoring.from_settings().expression(),
+            )
+            .order_by("game__timestamp", "game_id")
+            .values_list("user_id", "won", "lost", "score")
+        )
+        res, first_streaks = {}, {}
+        for user_id, won, lost, points in picks:
+            stats = res.get(user_id)
+            if stats is None:
+                stats = res[user_id] = dict.fromkeys(self.fields, 0)
+            stats["points"] += points
+            if lost and user_id not in first_streaks:
+                first_streaks[user_id] = stats["last_streak"]
+            self.count_pick(stats, won, lost)
+        for user_id, stats in res.items():
+            stats["first_streak"] = first_streaks.get(user_id, stats["last_streak"])
+            stats["weeks_won"] = weeks_won.get(user_id, 0)
+        return res
+
+    @staticmethod
+    def count_pick(stats: Dict[str, int], won: bool, lost: bool):
+        """Count a pick of a final game in the stats of its user, a won pick
+        extends the streak, a lost one breaks it."""
+        if won:
+            stats["won"] += 1
+            stats["last_streak"] += 1
+            stats["longest_streak"] = max(stats["longest_streak"], stats["last_streak"])
+        elif lost:
+            stats["lost"] += 1
+            stats["last_streak"] = 0
+
+    def freeze(self, now: datetime = None) -> List[Year]:
+        """Store the rollups of all seasons which ended and are not stored
+        yet. Stored seasons are never recomputed unless their results are
+        deleted.
+
+        Returns
+        -------
+        List[Year]
+            Seasons whose rollups were stored.
+        """
+        now = now or datetime.now(UTC)
+        years = list(
+            Year.objects.filter(end_timestamp__lte=now, results__isnull=True)
+            .distinct()
+            .order_by("value")
+        )
+        for year in years:
+            self.bulk_create(
+                [
+                    SeasonResult(year=year, user_id=user_id, **stats)
+                    for user_id, stats in self.compute(year, now).items()
+                ],
+                ignore_conflicts=True,
+            )
+        return years
+
+    def careers(self) -> Dict[str, Any]:
+        """Careers of all users in the stored seasons with one query, see
+        ``accumulate``.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The stored ``seasons`` in order and the ``careers`` keyed by user
+            id.
+        """
+        rows = self.order_by("year__value", "user_id").values(
+            "year__value", "user_id", *self.fields
+        )
+        seasons, careers = [], {}
+        for season, season_rows in groupby(rows, key=lambda row: row["year__value"]):
+            seasons.append(season)
+            self.accumulate(
+                careers, season, {row["user_id"]: row for row in season_rows}
+            )
+        return {"seasons": seasons, "careers": careers}
+
+    @staticmethod
+    def accumulate(
+        careers: Dict[int, Dict[str, Any]],
+        season: int,
+        stats: Dict[int, Dict[str, int]],
+    ):
+        """Add the rollups of a season to careers keyed by user id.
+
+        Seasons have to be added in order, streaks continue from one season
+        to the next.
+        """
+        for user_id, season_stats in stats.items():
+            career = careers.setdefault(
+                user_id,
+                {
+                    "points": 0,
+                    "won": 0,
+                    "lost": 0,
+                    "weeks_won": 0,
+                    "seasons": 0,
+                    "best_season": None,
+                    "best_points": 0,
+                    "longest_streak": 0,
+                    "streak": 0,
+                },
+            )
+            for field in ("points", "won", "lost", "weeks_won"):
+                career[field] += season_stats[field]
+            career["seasons"] += 1
+            if (
+                career["best_season"] is None
+                or season_stats["points"] > career["best_points"]
+            ):
+                career["best_season"] = season
+                career["best_points"] = season_stats["points"]
+            if season_stats["lost"]:
+                career["longest_streak"] = max(
+                    career["longest_streak"],
+                    career["streak"] + season_stats["first_streak"],
+                    season_stats["longest_streak"],
+                )
+                career["streak"] = season_stats["last_streak"]
+            else:
+                career["streak"] += season_stats["won"]
+                career["longest_streak"] = max(
+                    career["longest_streak"], career["streak"]
+                )
+
+
+class SeasonResult(models.Model):
+    """Rollup of a user's picks in a season which ended, see
+    ``SeasonResultManager``."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "user"], name="nfl_seasonresult_unique_year_user"
+            )
+        ]
+
+    year = models.ForeignKey(Year, on_delete=models.CASCADE, related_name="results")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="season_results",
+    )
+    points = models.PositiveIntegerField(default=0)
+    won = models.PositiveSmallIntegerField(default=0)
+    lost = models.PositiveSmallIntegerField(default=0)
+    weeks_won = models.PositiveSmallIntegerField(default=0)
+    # Runs of correct picks, the longest one, the one from the first pick of
+    # the season and the one up to its last pick
+    longest_streak = models.PositiveSmallIntegerField(default=0)
+    first_streak = models.PositiveSmallIntegerField(default=0)
+    last_streak = models.PositiveSmallIntegerField(default=0)
+    objects = SeasonResultManager()
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.won}-{self.lost} in {self.year}"
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from nfl.defines import PickChoices
+from nfl.models import Game, Pick, Week
+from nfl.scoring import Scoring
+
+
+def leader(game: Game) -> Optional[int]:
+    """Current leader of a live game as ``PickChoices``, ``None`` if the game
+    is final or has no score yet."""
+    home, visitor = game.home_team_score, game.visitor_team_score
+    if game.final or home is None or visitor is None:
+        return None
+    if home == visitor:
+        return PickChoices.TIED_GAME
+    return PickChoices.HOME_TEAM if home > visitor else PickChoices.VISITOR_TEAM
+
+
+class LiveProjection(object):
+    """Projected points of the picks of a week's live games.
+
+    A pick of a game which is not final yet projects the points of the
+    scoring rules as if the game ended with the current leader. The leaders
+    of the live games and the projected points per user are kept in the
+    cache and updated incrementally, a score tick only loads the picks of the
+    games whose leader changed. Final games leave the projection, their
+    points are confirmed by the standings.
+
+    Parameters
+    ----------
+    week_id : int
+        Id of the week
+    leaders : Dict[int, int], optional
+        Current leader by game id
+    points : Dict[int, int], optional
+        Projected points by user id
+    """
+
+    def __init__(
+        self,
+        week_id: int,
+        leaders: Optional[Dict[int, int]] = None,
+        points: Optional[Dict[int, int]] = None,
+    ):
+        self.week_id = week_id
+        self.leaders = leaders or {}
+        self.points = points or {}
+
+    @staticmethod
+    def key(week_id: int) -> str:
+        return f"nfl:projection:{week_id}"
+
+    @classmethod
+    def load(cls, week_id: int) -> "LiveProjection":
+        """Cached projection of a week, rebuilt if missing."""
+        state = cache.get(cls.key(week_id))
+        if state is None:
+            return cls.rebuild(week_id)
+        return cls(week_id, **state)
+
+    @classmethod
+    async def aload(cls, week_id: int) -> "LiveProjection":
+        state = await cache.aget(cls.key(week_id))
+        if state is None:
+            return await sync_to_async(cls.rebuild)(week_id)
+        return cls(week_id, **state)
+
+    @classmethod
+    def rebuild(cls, week_id: int) -> "LiveProjection":
+        """Projection of all live games of a week, with at most two queries."""
+        projection = cls(week_id)
+        projection.apply(
+            Game.objects.filter(
+                week_id=week_id,
+                final=False,
+                home_team_score__isnull=False,
+                visitor_team_score__isnull=False,
+            ).select_related("week")
+        )
+        projection.save()
+        return projection
+
+    @classmethod
+    def update(cls, games: Iterable[Game]) -> List[int]:
+        """Apply the current scores of updated games to their weeks'
+        projections.
+
+        Returns
+        -------
+        List[int]
+            Ids of the weeks whose projection changed.
+        """
+        weeks = defaultdict(list)
+        for game in games:
+            weeks[game.week_id].append(game)
+        changed = []
+        for week_id, week_games in sorted(weeks.items()):
+            state = cache.get(cls.key(week_id))
+            if state is None:
+                # Rebuilt from the saved scores of the games already
+                cls.rebuild(week_id)
+                changed.append(week_id)
+                continue
+            projection = cls(week_id, **state)
+            if projection.apply(week_games):
+                projection.save()
+                changed.append(week_id)
+        return changed
+
+    def apply(self, games: Iterable[Game]) -> List[int]:
+        """Move the projected points of games whose leader changed, with one
+        query for the picks of these games and one for the week if the games
+        don't have it loaded.
+
+        Returns
+        -------
+        List[int]
+            Ids of the games whose leader changed.
+        """
+        games, changes = list(games), {}
+        for game in games:
+            old, new = self.leaders.get(game.id), leader(game)
+            if old != new:
+                changes[game.id] = (old, new)
+        if not changes:
+            return []
+        outcomes = self.outcome_points(
+            [game for game in games if game.id in changes], changes
+        )
+        for user_id, game_id, selection in Pick.objects.filter(
+            game_id__in=changes
+        ).values_list("user_id", "game_id", "selection"):
+            old, new = outcomes[game_id]
+            delta = new.get(selection, 0) - old.get(selection, 0)
+            if delta:
+                self.points[user_id] = self.points.get(user_id, 0) + delta
+        for game_id, (_old, new) in changes.items():
+            if new is None:
+                self.leaders.pop(game_id, None)
+            else:
+                self.leaders[game_id] = new
+        self.points = {user_id: n for user_id, n in self.points.items() if n}
+        return list(changes)
+
+    def outcome_points(
+        self, games: List[Game], changes: Dict[int, Tuple[int, int]]
+    ) -> Dict[int, Tuple[Dict[int, int], Dict[int, int]]]:
+        """Points of the picks by selection for the old and the new leader of
+        each changed game, no points without a leader."""
+        scoring, week = Scoring.from_settings(), None
+        outcomes = {}
+        for game in games:
+            if not Game.week.is_cached(game):
+                week = week or Week.objects.get(pk=self.week_id)
+                game.week = week
+            outcomes[game.id] = tuple(
+                {} if winner is None else game.outcome_points(winner, scoring)
+                for winner in changes[game.id]
+            )
+        return outcomes
+
+    def save(self):
+        cache.set(
+            self.key(self.week_id),
+            {"leaders": self.leaders, "points": self.points},
+            settings.NFL_PROJECTION_CACHE_TIMEOUT,
+        )
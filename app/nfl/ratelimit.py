@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Tuple
+
+import httpx
+import redis
+from django.conf import settings
+
+from nfl import live
+
+logger = logging.getLogger(__name__)
+
+# Takes a token from the bucket KEYS[1] refilled with ARGV[1] tokens per
+# second up to ARGV[2] tokens. Requests which must leave ARGV[3] tokens in
+# the bucket for others don't take one below that. Returns the seconds to
+# wait until a token is available, 0 if one was taken.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= reserve + 1 then
+    tokens = tokens - 1
+else
+    wait = (reserve + 1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+def endpoint(url: httpx.URL) -> str:
+    """Name of the ESPN endpoint of a url, its last path segment but ids."""
+    segments = [s for s in url.path.split("/") if s and not s.isdigit()]
+    return segments[-1] if segments else ""
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport taking a token of a Redis token bucket before each request.
+
+    All processes share one bucket per endpoint, so web, huey workers and
+    backfills together stay within the budgets of ``NFL_ESPN_RATE_LIMITS``.
+    Background requests, e.g. of a backfill, leave the share
+    ``NFL_ESPN_RATE_RESERVE`` of the burst to live requests, they get the
+    full rate while no live sync runs. Without Redis requests aren't
+    limited.
+
+    Parameters
+    ----------
+    transport : httpx.AsyncBaseTransport
+        Transport sending the requests
+    background : bool
+        Whether the requests have a low priority
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, background: bool = False):
+        self.transport = transport
+        self.background = background
+        self.conn = None
+        self.script = None
+
+    def budget(self, name: str) -> Tuple[float, float, float]:
+        """Rate, burst and reserved tokens of an endpoint."""
+        limits = settings.NFL_ESPN_RATE_LIMITS
+        rate, burst = limits.get(name, limits["default"])
+        reserve = burst * settings.NFL_ESPN_RATE_RESERVE if self.background else 0
+        return rate, burst, reserve
+
+    async def acquire(self, name: str) -> float:
+        """Wait for a token of an endpoint.
+
+        Returns
+        -------
+        float
+            Seconds waited.
+        """
+        if self.conn is None:
+            self.conn = live.get_async_redis()
+            self.script = self.conn.register_script(TOKEN_BUCKET_SCRIPT)
+        rate, burst, reserve = self.budget(name)
+        waited = 0.0
+        while True:
+            try:
+                wait = float(
+                    await self.script(
+                        keys=[f"nfl:espn:ratelimit:{name}"], args=[rate, burst, reserve]
+                    )
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Could not rate limit ESPN request: {e}")
+                return waited
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        name = endpoint(request.url)
+        waited = await self.acquire(name)
+        if waited:
+            logger.debug(f"Waited {waited:.3f}s for a token of {name}")
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
@@ -0,0 +1,85 @@
+from typing import List
+
+import numpy as np
+from django.conf import settings
+
+INITIAL_RATING = 1500
+
+
+def elo_home_win(home_rating, visitor_rating):
+    """Probability of a home win by the Elo ratings of both teams, works on
+    arrays of ratings as well."""
+    return 1 / (1 + 10 ** ((visitor_rating - home_rating) / 400))
+
+
+def game_home_win(home_rating: float, visitor_rating: float) -> float:
+    """Probability of a home win of a game by the Elo ratings of both teams
+    with the home advantage ``NFL_ELO_HOME_ADVANTAGE``."""
+    return elo_home_win(home_rating + settings.NFL_ELO_HOME_ADVANTAGE, visitor_rating)
+
+
+def rounds(home: np.ndarray, visitor: np.ndarray) -> List[slice]:
+    """Split chronologically ordered games into consecutive rounds in which
+    every team plays at most once, e.g. the weeks of a season."""
+    res, start, teams = [], 0, set()
+    for idx, pair in enumerate(zip(home.tolist(), visitor.tolist())):
+        if teams.intersection(pair):
+            res.append(slice(start, idx))
+            start, teams = idx, set()
+        teams.update(pair)
+    if start < len(home):
+        res.append(slice(start, len(home)))
+    return res
+
+
+def elo_pass(
+    ratings: np.ndarray,
+    seasons: np.ndarray,
+    home: np.ndarray,
+    visitor: np.ndarray,
+    game_seasons: np.ndarray,
+    results: np.ndarray,
+    k: float,
+    home_advantage: float,
+    reversion: float,
+) -> None:
+    """Update Elo ratings in place with the results of chronologically
+    ordered games.
+
+    The games of a round, see ``rounds``, are rated at once with array
+    operations, so a whole history takes one pass of about one step per
+    week. A team's rating reverts by the share ``reversion`` to the initial
+    rating with its first game of a new season.
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        Ratings per team index
+    seasons : np.ndarray
+        Season of the last rated game per team index, 0 if none
+    home, visitor : np.ndarray
+        Team indexes of the games
+    game_seasons : np.ndarray
+        Seasons of the games
+    results : np.ndarray
+        1 for a home win, 0.5 for a tie and 0 for a visitor win
+    k : float
+        Maximum change of a rating per game
+    home_advantage : float
+        Rating points added to the home team
+    reversion : float
+        Share of the distance to the initial rating reverted between seasons
+    """
+    for cur in rounds(home, visitor):
+        teams = np.concatenate([home[cur], visitor[cur]])
+        season = np.concatenate([game_seasons[cur], game_seasons[cur]])
+        new_season = (seasons[teams] != season) & (seasons[teams] != 0)
+        revert = teams[new_season]
+        ratings[revert] -= reversion * (ratings[revert] - INITIAL_RATING)
+        seasons[teams] = season
+        expected = elo_home_win(
+            ratings[home[cur]] + home_advantage, ratings[visitor[cur]]
+        )
+        delta = k * (results[cur] - expected)
+        ratings[home[cur]] += delta
+        ratings[visitor[cur]] -= delta
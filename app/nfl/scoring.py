@@ -0,0 +1,212 @@
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from django.conf import settings
+from django.db.models import (
+    BooleanField,
+    Case,
+    Expression,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.lookups import Exact, GreaterThan, GreaterThanOrEqual
+from django.utils.module_loading import import_string
+
+from nfl.defines import PickChoices
+
+if TYPE_CHECKING:
+    from nfl.models import Pick
+
+
+class Fields(object):
+    """References to the fields of a pick and of its game in the query a
+    scoring expression is compiled for.
+
+    Parameters
+    ----------
+    pick : Callable[[str], Expression]
+        Reference to a field of the pick
+    game : Callable[[str], Expression]
+        Reference to a field of the pick's game
+    """
+
+    def __init__(
+        self,
+        pick: Callable[[str], Expression],
+        game: Callable[[str], Expression],
+    ):
+        self.pick = pick
+        self.game = game
+
+    def winner(self) -> Case:
+        """Winner of the game as ``PickChoices``, ``TBP`` unless final."""
+        home, visitor = self.game("home_team_score"), self.game("visitor_team_score")
+        final = Exact(self.game("final"), True)
+        return Case(
+            When(Q(final, GreaterThan(home, visitor)), then=PickChoices.HOME_TEAM),
+            When(Q(final, GreaterThan(visitor, home)), then=PickChoices.VISITOR_TEAM),
+            When(Q(final, Exact(home, visitor)), then=PickChoices.TIED_GAME),
+            default=PickChoices.TBP,
+            output_field=IntegerField(),
+        )
+
+    def correct(self) -> Case:
+        """Whether the pick is the winner, ``None`` unless the game is final."""
+        return Case(
+            When(Exact(self.game("final"), False), then=None),
+            default=Exact(self.pick("selection"), self.winner()),
+            output_field=BooleanField(),
+        )
+
+
+# Querysets of picks
+PICK_FIELDS = Fields(pick=F, game=lambda name: F(f"game__{name}"))
+# Subqueries of the games of picks, see ``PickManager.score``
+GAME_FIELDS = Fields(pick=OuterRef, game=F)
+
+
+class ScoringRule(object):
+    """A rule of the points a pick of a final game earns.
+
+    Rules add points or multiply the points of all rules. Both are compiled
+    into database expressions, ``pick_points`` and ``pick_factor`` evaluate
+    them for a loaded pick.
+    """
+
+    def points(self, fields: Fields) -> Optional[Expression]:
+        """Points added to a pick, ``None`` if the rule doesn't add any."""
+        return None
+
+    def factor(self, fields: Fields) -> Optional[Expression]:
+        """Factor of the points of a pick, ``None`` if the rule doesn't
+        multiply them."""
+        return None
+
+    def pick_points(self, pick: "Pick") -> int:
+        return 0
+
+    def pick_factor(self, pick: "Pick") -> int:
+        return 1
+
+
+class CorrectPick(ScoringRule):
+    """Points for picking the winner, or a tie of a tied game."""
+
+    def __init__(self, points: int = 1):
+        self.value = points
+
+    def points(self, fields: Fields) -> Expression:
+        return Case(
+            When(Exact(fields.pick("selection"), fields.winner()), then=self.value),
+            default=0,
+        )
+
+    def pick_points(self, pick: "Pick") -> int:
+        return self.value if pick.selection == pick.game.winner else 0
+
+
+class CorrectTieBonus(ScoringRule):
+    """Extra points for predicting a tie."""
+
+    def __init__(self, points: int = 1):
+        self.value = points
+
+    def points(self, fields: Fields) -> Expression:
+        return Case(
+            When(
+                Q(
+                    Exact(fields.pick("selection"), PickChoices.TIED_GAME),
+                    Exact(fields.winner(), PickChoices.TIED_GAME),
+                ),
+                then=self.value,
+            ),
+            default=0,
+        )
+
+    def pick_points(self, pick: "Pick") -> int:
+        tied = pick.selection == pick.game.winner == PickChoices.TIED_GAME
+        return self.value if tied else 0
+
+
+class PlayoffMultiplier(ScoringRule):
+    """Multiply the points of the playoff games, the weeks from
+    ``first_week`` on, see ``Week.season_type``."""
+
+    def __init__(self, factor: int = 2, first_week: int = 23):
+        self.value = factor
+        self.first_week = first_week
+
+    def factor(self, fields: Fields) -> Expression:
+        return Case(
+            When(
+                GreaterThanOrEqual(fields.game("week__value"), self.first_week),
+                then=self.value,
+            ),
+            default=1,
+        )
+
+    def pick_factor(self, pick: "Pick") -> int:
+        return self.value if pick.game.week.value >= self.first_week else 1
+
+
+class Scoring(object):
+    """Points of picks by the scoring rules of the pool.
+
+    The rules are compiled into one expression, the sum of the points of
+    all rules times the product of their factors. Week and season
+    evaluations aggregate it in the database, ``PickManager.score`` stores
+    it as ``Pick.points`` for all picks of a queryset with a single update.
+
+    Parameters
+    ----------
+    rules : List[ScoringRule]
+        Rules of the pool
+    """
+
+    def __init__(self, rules: List[ScoringRule]):
+        self.rules = rules
+
+    @classmethod
+    def from_settings(cls) -> "Scoring":
+        """Scoring of ``NFL_SCORING_RULES``, a list of rule classes by their
+        dotted path with their ``OPTIONS``."""
+        return cls(
+            [
+                import_string(rule["RULE"])(**rule.get("OPTIONS", {}))
+                for rule in settings.NFL_SCORING_RULES
+            ]
+        )
+
+    def expression(self, fields: Fields = PICK_FIELDS) -> Expression:
+        points = [rule.points(fields) for rule in self.rules]
+        factors = [rule.factor(fields) for rule in self.rules]
+        total = Value(0)
+        for expression in points:
+            if expression is not None:
+                total = total + expression
+        for expression in factors:
+            if expression is not None:
+                total = total * expression
+        # Picks of games which are not final don't earn points, e.g. a TBP
+        # pick would match the winner of an unplayed game
+        return Case(
+            When(Exact(fields.game("final"), True), then=total),
+            default=0,
+            output_field=IntegerField(),
+        )
+
+    def points(self, pick: "Pick") -> int:
+        """Points of a loaded pick, evaluated in Python."""
+        total = sum(rule.pick_points(pick) for rule in self.rules)
+        for rule in self.rules:
+            total *= rule.pick_factor(pick)
+        return total
+
+    def total(self) -> Sum:
+        """Aggregation of the points of picks, 0 for picks of games which
+        are not final."""
+        return Sum(self.expression())
@@ -0,0 +1,305 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from nfl.defines import PickChoices
+from nfl.models import Game, Pick, Week, Year
+from nfl.ratings import INITIAL_RATING, game_home_win
+from nfl.scoring import Scoring
+
+GAME_FIELDS = ("id", "final", "home_team_id", "visitor_team_id")
+# Outcomes of the ``weights`` of a ``WinSimulator``
+OUTCOMES = (PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM, PickChoices.TIED_GAME)
+SCORE_FIELDS = ("home_team_score", "visitor_team_score")
+
+
+def agreements(selections: np.ndarray) -> np.ndarray:
+    """Number of games each pair of users made the same pick, as a users x
+    users matrix of the users x games matrix of ``PickChoices``. Games not
+    picked never agree."""
+    agree = np.zeros((len(selections),) * 2, dtype=np.int32)
+    for choice in (
+        PickChoices.HOME_TEAM,
+        PickChoices.VISITOR_TEAM,
+        PickChoices.TIED_GAME,
+    ):
+        picked = (selections == choice).astype(np.float32)
+        agree += (picked @ picked.T).astype(np.int32)
+    return agree
+
+
+class WinSimulator(object):
+    """Monte Carlo simulation of the unfinished games of a week or season.
+
+    The picks of all users are kept as a users x games matrix of
+    ``PickChoices``. Every simulation samples a winner of each unfinished
+    game, the points of all users in all simulations of a chunk are a single
+    matrix product. Simulated games are never tied. A pick of the outcome of
+    a game earns the points of its ``weights``, the points of the scoring
+    rules for that game.
+
+    Parameters
+    ----------
+    user_ids : List[int]
+        Users in the order of the rows
+    selections : np.ndarray
+        Picks of the users for the unfinished games, ``TBP`` if not picked
+    points : np.ndarray
+        Points of the users from the final games
+    home_win : np.ndarray, optional
+        Probability of a home win per unfinished game, 0.5 if not given
+    weights : np.ndarray, optional
+        Points of a correct pick per ``OUTCOMES`` and unfinished game, as an
+        outcomes x games matrix, 1 if not given
+    """
+
+    chunk_size = 10_000
+
+    def __init__(
+        self,
+        user_ids: List[int],
+        selections: np.ndarray,
+        points: np.ndarray,
+        home_win: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+    ):
+        self.user_ids = user_ids
+        self.selections = selections.astype(np.int8)
+        self.points = points.astype(np.int32)
+        if home_win is None:
+            home_win = np.full(self.selections.shape[1], 0.5)
+        self.home_win = home_win.astype(np.float32)
+        if weights is None:
+            weights = np.ones((len(OUTCOMES), self.selections.shape[1]))
+        self.weights = weights.astype(np.int32)
+
+    @classmethod
+    def from_rows(
+        cls,
+        user_ids: List[int],
+        games: List[Dict[str, Any]],
+        picks: Iterable[Tuple[int, int, int]],
+        points: Optional[Dict[int, int]] = None,
+        ratings: Optional[Dict[int, float]] = None,
+        scoring: Optional[Scoring] = None,
+    ) -> "WinSimulator":
+        """Simulator of games and picks loaded with ``values``.
+
+        Parameters
+        ----------
+        user_ids : List[int]
+            All users taking part
+        games : List[Dict[str, Any]]
+            Games with the fields ``GAME_FIELDS``, ``SCORE_FIELDS`` and the
+            ``week__value``
+        picks : Iterable[Tuple[int, int, int]]
+            User id, game id and selection of the picks of the games
+        points : Dict[int, int], optional
+            Points of the users from other games, e.g. previous weeks
+        ratings : Dict[int, float], optional
+            Elo ratings by team id to weight the outcomes, uniform if not given
+        scoring : Scoring, optional
+            Scoring of the picks, ``Scoring.from_settings`` if not given
+        """
+        scoring = scoring or Scoring.from_settings()
+        rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        cols = {game["id"]: col for col, game in enumerate(games)}
+        selections = np.zeros((len(user_ids), len(games)), dtype=np.int8)
+        for user_id, game_id, selection in picks:
+            if user_id in rows and game_id in cols:
+                selections[rows[user_id], cols[game_id]] = selection
+        games = [
+            Game(
+                week=Week(value=game["week__value"]),
+                **{name: game[name] for name in GAME_FIELDS + SCORE_FIELDS},
+            )
+            for game in games
+        ]
+        final = np.array([game.final for game in games], dtype=bool)
+        # Points per outcome and game, a final game only scores its winner
+        weights = np.zeros((len(OUTCOMES), len(games)), dtype=np.int32)
+        for col, game in enumerate(games):
+            for row, outcome in enumerate(OUTCOMES):
+                if not game.final or outcome == game.winner:
+                    weights[row, col] = game.outcome_points(outcome, scoring)[outcome]
+        base = np.array([(points or {}).get(user_id, 0) for user_id in user_ids])
+        for row, outcome in enumerate(OUTCOMES):
+            won = (selections[:, final] == outcome) * weights[row, final]
+            base = base + won.sum(axis=1)
+        home_win = None
+        if ratings is not None:
+            home_win = np.array(
+                [
+                    game_home_win(
+                        ratings.get(game.home_team_id, INITIAL_RATING),
+                        ratings.get(game.visitor_team_id, INITIAL_RATING),
+                    )
+                    for game in games
+                    if not game.final
+                ]
+            )
+        return cls(user_ids, selections[:, ~final], base, home_win, weights[:, ~final])
+
+    def digest(self) -> str:
+        """Fingerprint of all inputs, changes with every score or pick."""
+        h = hashlib.sha1()
+        for array in (
+            np.array(self.user_ids, dtype=np.int64),
+            self.selections,
+            self.points,
+            self.home_win,
+            self.weights,
+        ):
+            h.update(np.ascontiguousarray(array).tobytes())
+            h.update(str(array.shape).encode())
+        return h.hexdigest()
+
+    def outcome_points(self) -> List[np.ndarray]:
+        """Points of the users per unfinished game for each of ``OUTCOMES``,
+        as users x games matrices."""
+        return [
+            (self.selections == outcome) * self.weights[row]
+            for row, outcome in enumerate(OUTCOMES)
+        ]
+
+    def eliminated(self) -> np.ndarray:
+        """Users who can't finish first whatever the outcomes are.
+
+        User u can finish at most ``points[u] - points[v]`` plus the largest
+        difference of their points of each game ahead of user v, u is
+        eliminated if that's negative for any v. Unlike the simulations this
+        takes ties into account.
+        """
+        outcomes = self.outcome_points()
+        eliminated = np.zeros(len(self.user_ids), dtype=bool)
+        for row in range(len(self.user_ids)):
+            lead = np.max([points[row] - points for points in outcomes], axis=0)
+            max_lead = self.points[row] - self.points + lead.sum(axis=1)
+            eliminated[row] = (max_lead < 0).any()
+        return eliminated
+
+    def win_probabilities(self, simulations: int, seed: int = 0) -> np.ndarray:
+        """Share of the simulations in which each user finishes first, a tie
+        for first place counts as a win of all tied users."""
+        wins = np.zeros(len(self.user_ids))
+        if not self.user_ids:
+            return wins
+        home, visitor, _tie = (
+            points.astype(np.float32) for points in self.outcome_points()
+        )
+        # Points are the points of the visitor picks plus the difference of
+        # the home and visitor picks of each home win
+        diff = (home - visitor).T
+        base = (self.points + visitor.sum(axis=1)).astype(np.float32)
+        rng = np.random.default_rng(seed)
+        for start in range(0, simulations, self.chunk_size):
+            size = min(self.chunk_size, simulations - start)
+            home_won = rng.random((size, len(self.home_win)), dtype=np.float32)
+            home_won = (home_won < self.home_win).astype(np.float32)
+            points = home_won @ diff + base
+            wins += (points == points.max(axis=1, keepdims=True)).sum(axis=0)
+        return wins / simulations
+
+    def simulate(self, simulations: int) -> Dict[int, Dict[str, Any]]:
+        """Win probability and elimination of all users keyed by user id.
+
+        Results are cached by the digest of the inputs, so they are reused
+        until the next score change or pick.
+        """
+        digest = self.digest()
+        key = f"nfl:simulation:{digest}:{simulations}"
+        res = cache.get(key)
+        if res is None:
+            probabilities = self.win_probabilities(
+                simulations, seed=int(digest[:8], 16)
+            )
+            eliminated = self.eliminated()
+            res = {
+                user_id: {
+                    "win_probability": float(probabilities[row]),
+                    "eliminated": bool(eliminated[row]),
+                }
+                for row, user_id in enumerate(self.user_ids)
+            }
+            cache.set(key, res, settings.NFL_SIMULATION_CACHE_TIMEOUT)
+        return res
+
+
+def all_user_ids() -> List[int]:
+    return list(get_user_model().objects.order_by("id").values_list("id", flat=True))
+
+
+def week_simulator(
+    week: Week, ratings: Optional[Dict[int, float]] = None
+) -> WinSimulator:
+    """Simulator of the unfinished games of a week, with three queries."""
+    games = list(
+        Game.objects.filter(week=week)
+        .order_by("id")
+        .values(*GAME_FIELDS, *SCORE_FIELDS, "week__value")
+    )
+    picks = Pick.objects.filter(game__week=week).values_list(
+        "user_id", "game_id", "selection"
+    )
+    return WinSimulator.from_rows(all_user_ids(), games, picks, ratings=ratings)
+
+
+def season_simulator(
+    year: Year, ratings: Optional[Dict[int, float]] = None
+) -> WinSimulator:
+    """Simulator of the unfinished games of a season, the points of the final
+    games are aggregated by the database. Needs four queries."""
+    season_games = Game.objects.filter(week__year=year)
+    points = dict(
+        Pick.objects.filter(game__in=season_games.filter(final=True))
+        .values("user")
+        .annotate(won=Scoring.from_settings().total())
+        .order_by()
+        .values_list("user", "won")
+    )
+    remaining = season_games.filter(final=False)
+    games = list(
+        remaining.order_by("id").values(*GAME_FIELDS, *SCORE_FIELDS, "week__value")
+    )
+    picks = Pick.objects.filter(game__in=remaining).values_list(
+        "user_id", "game_id", "selection"
+    )
+    return WinSimulator.from_rows(all_user_ids(), games, picks, points, ratings)
+
+
+def results_key(scope: str, pk: int) -> str:
+    """Cache key of the latest results of a ``week`` or ``season``
+    simulation, which the standings show."""
+    return f"nfl:simulation:{scope}:{pk}"
+
+
+def simulate_week(
+    week: Week,
+    simulations: Optional[int] = None,
+    ratings: Optional[Dict[int, float]] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """Who can still win a week, see ``WinSimulator.simulate``."""
+    res = week_simulator(week, ratings).simulate(
+        simulations or settings.NFL_SIMULATIONS
+    )
+    cache.set(results_key("week", week.id), res, settings.NFL_SIMULATION_CACHE_TIMEOUT)
+    return res
+
+
+def simulate_season(
+    year: Year,
+    simulations: Optional[int] = None,
+    ratings: Optional[Dict[int, float]] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """Who can still win a season, see ``WinSimulator.simulate``."""
+    res = season_simulator(year, ratings).simulate(
+        simulations or settings.NFL_SIMULATIONS
+    )
+    cache.set(
+        results_key("season", year.id), res, settings.NFL_SIMULATION_CACHE_TIMEOUT
+    )
+    return res
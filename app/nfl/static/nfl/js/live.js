@@ -0,0 +1,23 @@
+(function () {
+    const config = document.getElementById("nfl-live");
+    if (!config || !window.EventSource) {
+        return;
+    }
+    const source = new EventSource(config.dataset.url);
+    source.addEventListener("score", event => {
+        const data = JSON.parse(event.data);
+        ["home_team_score", "visitor_team_score"].forEach(field => {
+            document.querySelectorAll(`[data-live-game="${data.game}"][data-live-field="${field}"]`).forEach(el => {
+                el.textContent = data[field] || 0;
+            });
+        });
+    });
+    if (config.dataset.reload) {
+        source.addEventListener(config.dataset.reload, () => {
+            // Never throw away picks which are not submitted, yet.
+            if (!document.querySelector("form input:checked")) {
+                window.location.reload();
+            }
+        });
+    }
+})();
@@ -1,10 +1,228 @@
+import json
+import logging
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+from core.db import reuse_connections
+from core.loops import run_sync
+from core.tasks import PRIORITY_DEFAULT, PRIORITY_HIGH, PRIORITY_MAINTENANCE, locked
+from django.dispatch import receiver
 from huey import crontab
-from huey.contrib.djhuey import periodic_task
+from huey.contrib.djhuey import HUEY, periodic_task, task
+
+from nfl.api import EspnApiClient, EspnApiError, games_updated
+from nfl.backfill import BackfillRun
+from nfl.live import publish_events, standings_events
+from nfl.loaders import RequestLoader
+from nfl.models import SeasonResult, TeamRating, Week
+from nfl.projections import LiveProjection
+from nfl.simulation import simulate_season, simulate_week
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_once(task, key: str, *args):
+    """Enqueue a task unless the same one is still waiting for a worker.
+
+    The task has to delete the key ``pending:<key>`` when it starts.
+    """
+    if HUEY.put_if_empty(f"pending:{key}", 1):
+        return task(*args)
+    logger.debug(f"{key} is pending already")
+
+
+@receiver(games_updated)
+def enqueue_post_ingestion(sender, scored_games, finalized_games, **kwargs):
+    # Scores of games which were final before are corrections
+    week_ids = {game.week_id for game in finalized_games}
+    week_ids.update(game.week_id for game in scored_games if game.final)
+    for week_id in sorted(week_ids):
+        enqueue_once(nfl_refresh_aggregates, f"nfl-aggregates-{week_id}", week_id)
+
 
+@receiver(games_updated)
+def update_team_ratings(sender, finalized_games, **kwargs):
+    if finalized_games:
+        TeamRating.objects.rate_games()
 
-@periodic_task(crontab(minute="*/15"))
+
+@receiver(games_updated)
+def enqueue_simulations(sender, scored_games, finalized_games, **kwargs):
+    # Only final scores change the simulations, the ratings are updated first
+    week_ids = {game.week_id for game in finalized_games}
+    week_ids.update(game.week_id for game in scored_games if game.final)
+    for week_id in sorted(week_ids):
+        enqueue_once(nfl_simulate, f"nfl-simulation-{week_id}", week_id)
+
+
+@receiver(games_updated)
+def update_live_projections(sender, scored_games, finalized_games, **kwargs):
+    games = {game.id: game for game in scored_games + finalized_games}
+    week_ids = LiveProjection.update(games.values())
+    publish_events(standings_events(week_ids))
+
+
+@periodic_task(crontab(minute="*/15"), priority=PRIORITY_HIGH)
+@reuse_connections
+@locked(timeout=30 * 60)
 def nfl_check_games():
-    from .api import EspnApiClient
+    """Update the scores of all started games which aren't final yet.
 
+    A run isn't tied to a week, it checks the missing games of all weeks,
+    e.g. late games of the previous one. Overlapping runs would update the
+    same games and send ``games_updated`` twice, so the lock is global.
+    """
     c = EspnApiClient()
     c.check_games()
+
+
+@task(retries=3, retry_delay=10, priority=PRIORITY_DEFAULT)
+@reuse_connections
+@locked(key=lambda week_id: week_id, coalesce=True)
+def nfl_refresh_aggregates(week_id: int):
+    """Recompute and cache the aggregates of a week with finalized games,
+    then tell the browsers to reload its standings.
+
+    A run of a week which is in progress already runs once more instead.
+    """
+    HUEY.delete(f"pending:nfl-aggregates-{week_id}")
+    week = Week.objects.select_related("year").get(id=week_id)
+    weeks = run_sync(RequestLoader().refresh_aggregates, week)
+    logger.info(f"Refreshed aggregates of {len(weeks)} weeks from {week}")
+    publish_events(standings_events([week_id]))
+
+
+@task(retries=1, retry_delay=10, priority=PRIORITY_DEFAULT)
+@reuse_connections
+@locked(key=lambda week_id: week_id, coalesce=True)
+def nfl_simulate(week_id: int):
+    """Simulate who can still win a week and its season with the current
+    team ratings, so the standings show fresh results, then tell the
+    browsers to reload the standings of the week."""
+    HUEY.delete(f"pending:nfl-simulation-{week_id}")
+    week = Week.objects.select_related("year").get(id=week_id)
+    ratings = dict(TeamRating.objects.values_list("team_id", "rating"))
+    simulate_week(week, ratings=ratings)
+    simulate_season(week.year, ratings=ratings)
+    publish_events(standings_events([week_id]))
+
+
+@periodic_task(crontab(hour="4", minute="30"), priority=PRIORITY_MAINTENANCE)
+@reuse_connections
+@locked(coalesce=True)
+def nfl_rebuild_aggregates():
+    """Rebuild the cached aggregates of the current season every night,
+    e.g. after results were corrected in the admin, and store the rollups of
+    seasons which ended.
+    """
+    now = datetime.now(UTC)
+    years = SeasonResult.objects.freeze(now)
+    if years:
+        logger.info(f"Stored the rollups of seasons {[y.value for y in years]}")
+    week = (
+        Week.objects.select_related("year")
+        .filter(year__start_timestamp__lte=now, year__end_timestamp__gt=now)
+        .order_by("value")
+        .first()
+    )
+    if week is not None:
+        run_sync(RequestLoader().refresh_aggregates, week)
+
+
+@task(retries=2, retry_delay=60, priority=PRIORITY_MAINTENANCE)
+@reuse_connections
+@locked(key=lambda season, run_id: season, timeout=60 * 60)
+def nfl_backfill_season(season: int, run_id: str):
+    """Import the weeks of a season, then fan out one ``nfl_import_week``
+    task per week to all workers.
+    """
+    weeks = EspnApiClient(background=True).import_season(season, strict=True)
+    fan_out(BackfillRun(run_id, season), [week.id for week in weeks])
+
+
+def fan_out(run: BackfillRun, week_ids: List[int]) -> int:
+    """Start a round of a backfill importing the given weeks."""
+    round_no = run.fan_out(week_ids)
+    logger.info(f"Backfill {run.run_id} round {round_no}: {len(week_ids)} weeks")
+    if not week_ids:
+        nfl_finish_backfill(run.run_id)
+    for week_id in week_ids:
+        nfl_import_week(run.run_id, round_no, week_id)
+    return round_no
+
+
+def retry_backfill(run_id: str) -> List[int]:
+    """Import the failed weeks of a backfill again.
+
+    Returns
+    -------
+    List[int]
+        Ids of the weeks to import again.
+    """
+    run = BackfillRun.load(run_id)
+    if run is None:
+        raise ValueError(f"Unknown or expired backfill {run_id}")
+    week_ids = run.failed_weeks()
+    if week_ids:
+        fan_out(run, week_ids)
+    return week_ids
+
+
+@task(retries=2, retry_delay=30, context=True, priority=PRIORITY_MAINTENANCE)
+@reuse_connections
+def nfl_import_week(run_id: str, round_no: int, week_id: int, task=None):
+    """Import the games of a week of a backfill.
+
+    Failed imports are retried by huey, after the last retry the week is
+    recorded as failed whatever the error, otherwise the round would never
+    finish. The last week of a round starts the fan-in.
+    """
+    run = BackfillRun.load(run_id)
+    if run is None:
+        logger.warning(f"Backfill {run_id} expired, skipped week {week_id}")
+        return
+    try:
+        week = Week.objects.select_related("year").get(id=week_id)
+        client = EspnApiClient(background=True)
+        games = run_sync(client.import_games_async, week, strict=True)
+    except Exception as e:
+        if task is not None and task.retries:
+            raise
+        # Errors other than the ones of the API are bugs, log their traceback
+        expected = isinstance(e, (EspnApiError, httpx.HTTPError))
+        logger.warning(
+            f"Backfill {run_id} could not import week {week_id}: {e}",
+            exc_info=not expected,
+        )
+        games = None
+    if run.week_done(round_no, week_id, None if games is None else len(games)):
+        nfl_finish_backfill(run_id)
+
+
+@task(priority=PRIORITY_MAINTENANCE)
+@reuse_connections
+def nfl_finish_backfill(run_id: str) -> Optional[Dict[str, Any]]:
+    """Fan-in of a backfill round, refresh the cached aggregates of the
+    season and report the totals of the run, ``None`` if it expired.
+    """
+    run = BackfillRun.load(run_id)
+    if run is None:
+        logger.warning(f"Backfill {run_id} expired before it finished")
+        return None
+    week = (
+        Week.objects.select_related("year")
+        .filter(year__value=run.season)
+        .order_by("value")
+        .first()
+    )
+    if week is not None:
+        run_sync(RequestLoader().refresh_aggregates, week)
+    report = run.report()
+    logger.info(json.dumps({"backfill": report}))
+    if report["failed_weeks"]:
+        logger.warning(
+            f"Backfill {run_id} failed for weeks {report['failed_weeks']}, "
+            f"retry with: manage.py backfill --retry {run_id}"
+        )
+    return report
@@ -0,0 +1,15 @@
+import pytest
+from fakeredis import FakeServer, FakeStrictRedis, aioredis
+
+from nfl import live
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Fixture replacing all redis connections by an in-memory redis server."""
+    server = FakeServer()
+    monkeypatch.setattr(live, "get_redis", lambda: FakeStrictRedis(server=server))
+    monkeypatch.setattr(
+        live, "get_async_redis", lambda: aioredis.FakeRedis(server=server)
+    )
+    return FakeStrictRedis(server=server)
@@ -0,0 +1,14 @@
+import pytest
+from huey.contrib.djhuey import HUEY
+
+
+@pytest.fixture(autouse=True)
+def huey_immediate(monkeypatch):
+    """Fixture running all huey tasks immediately with an in-memory storage."""
+    immediate = HUEY.immediate
+    monkeypatch.setattr(HUEY, "immediate_use_memory", True)
+    HUEY.immediate = True
+    HUEY.storage = HUEY.create_storage()
+    yield HUEY
+    HUEY.immediate = immediate
+    HUEY.storage = HUEY.create_storage()
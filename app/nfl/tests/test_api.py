@@ -0,0 +1,67 @@
+import os
+import threading
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from core.loops import ManagedLoop, close_thread_loop
+from nfl.api import EspnApiClient
+from nfl.loadtest import StandInFeed
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.django_db
+class TestSyncFacade:
+    @pytest.fixture
+    def espn_transports(self, monkeypatch, settings, fake_redis, make_nfl_game):
+        """Live game served by a stand-in feed as the default transport,
+        returns the feed and the created transports."""
+        settings.NFL_ESPN_RATE_LIMITS = {"default": (10**6, 10**6)}
+        game = make_nfl_game(timestamp=datetime.now(UTC) - timedelta(hours=1))
+        feed = StandInFeed([game], final_after=10**6)
+        transports = []
+
+        def transport(**kwargs):
+            transports.append(feed.transport)
+            return transports[-1]
+
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", transport)
+        yield feed, transports
+        close_thread_loop()
+
+    def test_pool_reused(self, espn_transports):
+        feed, transports = espn_transports
+        for _i in range(3):
+            EspnApiClient().check_games()
+            EspnApiClient(background=True).check_games()
+        assert list(feed.polls.values()) == [6]
+        # One pool per priority on the managed loop of this thread
+        assert len(transports) == 2
+        assert len(ManagedLoop.for_thread().objects) == 2
+
+    @pytest.mark.skipif(
+        not os.path.isdir("/proc/self/fd"), reason="Needs the procfs of Linux"
+    )
+    def test_soak(self, espn_transports):
+        feed, transports = espn_transports
+
+        def check_games(count):
+            for _i in range(count):
+                EspnApiClient().check_games()
+
+        check_games(200)
+        fds, rss, threads = open_fds(), rss_bytes(), threading.active_count()
+        check_games(2000)
+        assert open_fds() - fds <= 2
+        assert threading.active_count() == threads
+        assert rss_bytes() - rss < 20 * 2**20
+        assert list(feed.polls.values()) == [2200]
+        assert len(transports) == 1
@@ -0,0 +1,90 @@
+import pytest
+from django.core.management import call_command
+from nfl.api import EspnApiClient, EspnApiError
+from nfl.backfill import BackfillRun
+from nfl.tasks import (
+    nfl_backfill_season,
+    nfl_finish_backfill,
+    nfl_import_week,
+    retry_backfill,
+)
+
+
+@pytest.mark.django_db
+class TestBackfill:
+    @pytest.fixture
+    def espn_api(self, monkeypatch, make_week):
+        """Fake API with three weeks of two games, imports of week 6 fail
+        as long as ``failing`` contains it.
+        """
+        weeks = [make_week(week=value) for value in (5, 6, 7)]
+        failing = {6}
+        imported = []
+
+        def import_season(self, season=None, strict=False):
+            return weeks
+
+        async def import_games_async(self, week_object, strict=False):
+            if week_object.value in failing:
+                raise EspnApiError("Could not query list of events")
+            imported.append(week_object.value)
+            return [None, None]
+
+        monkeypatch.setattr(EspnApiClient, "import_season", import_season)
+        monkeypatch.setattr(EspnApiClient, "import_games_async", import_games_async)
+        # Immediate tasks can't be retried by huey
+        monkeypatch.setattr(nfl_import_week.task_class, "default_retries", 0)
+        return failing, imported
+
+    def test_retry_failed_weeks(self, espn_api):
+        failing, imported = espn_api
+        run = BackfillRun.create(2019)
+        nfl_backfill_season(2019, run.run_id)
+        assert imported == [5, 7]
+        report = run.report()
+        assert report["rounds"] == 1
+        assert report["weeks"] == 3
+        assert report["imported_weeks"] == 2
+        assert report["games"] == 4
+        assert len(report["failed_weeks"]) == 1
+
+        failing.clear()
+        assert retry_backfill(run.run_id) == report["failed_weeks"]
+        assert imported == [5, 7, 6]
+        report = run.report()
+        assert report["rounds"] == 2
+        assert report["imported_weeks"] == 3
+        assert report["games"] == 6
+        assert report["failed_weeks"] == []
+        assert retry_backfill(run.run_id) == []
+
+    def test_unexpected_error(self, espn_api, monkeypatch):
+        _failing, imported = espn_api
+
+        async def import_games_async(self, week_object, strict=False):
+            if week_object.value == 7:
+                raise KeyError("events")
+            imported.append(week_object.value)
+            return [None]
+
+        monkeypatch.setattr(EspnApiClient, "import_games_async", import_games_async)
+        run = BackfillRun.create(2019)
+        nfl_backfill_season(2019, run.run_id)
+        # The round finishes with the week recorded as failed
+        report = run.report()
+        assert imported == [5, 6]
+        assert (report["imported_weeks"], len(report["failed_weeks"])) == (2, 1)
+
+    def test_expired_run(self, espn_api):
+        nfl_import_week("expired", 1, 42)
+        assert espn_api[1] == []
+        assert nfl_finish_backfill.call_local("expired") is None
+
+    def test_command(self, espn_api, capsys):
+        call_command("backfill", "2019")
+        run_id = capsys.readouterr().out.split()[-1]
+        call_command("backfill", "--report", run_id)
+        assert '"imported_weeks": 2' in capsys.readouterr().out
+        espn_api[0].clear()
+        call_command("backfill", "--retry", run_id)
+        assert capsys.readouterr().out.startswith("Retrying 1 weeks")
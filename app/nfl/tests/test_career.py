@@ -0,0 +1,120 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nfl.defines import PickChoices
+from nfl.models import SeasonResult, Team, Year
+
+HOME, VISITOR = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM
+
+
+@pytest.mark.django_db
+class TestSeasonResult:
+    @pytest.fixture
+    def years(self, year):
+        return [
+            year,
+            Year.objects.create(
+                start_timestamp=datetime(2020, 7, 17, 7, tzinfo=UTC),
+                end_timestamp=datetime(2021, 2, 16, 7, 59, tzinfo=UTC),
+                value=2020,
+            ),
+        ]
+
+    def make_season(self, year, make_week, make_nfl_game, selections):
+        """Final games won by the home team, picked as given."""
+        week = make_week(year=year, week=6)
+        games = []
+        for idx, _selection in enumerate(selections):
+            game = make_nfl_game(
+                week=week,
+                timestamp=week.start_timestamp + timedelta(hours=idx),
+                home_team=Team.objects.get(pk=3 + 2 * idx),
+                visitor_team=Team.objects.get(pk=4 + 2 * idx),
+            )
+            game.home_team_score, game.visitor_team_score = 21, 14
+            game.final = True
+            game.save()
+            games.append(game)
+        return games
+
+    @pytest.fixture
+    def player(self, years, make_week, make_nfl_game, make_pick, make_pick_pool_user):
+        player, rival = make_pick_pool_user(), make_pick_pool_user()
+        for year, selections in (
+            (years[0], (HOME, VISITOR, HOME, HOME)),
+            (years[1], (HOME, HOME, VISITOR)),
+        ):
+            games = self.make_season(year, make_week, make_nfl_game, selections)
+            for game, selection in zip(games, selections):
+                make_pick(user=player, game=game, selection=selection)
+                make_pick(user=rival, game=game, selection=VISITOR)
+        return player
+
+    def test_compute(self, years, player):
+        stats = SeasonResult.objects.compute(years[0])[player.id]
+        assert stats == {
+            "points": 3,
+            "won": 3,
+            "lost": 1,
+            "weeks_won": 1,
+            "longest_streak": 2,
+            "first_streak": 1,
+            "last_streak": 2,
+        }
+
+    def test_freeze(self, years, player):
+        assert SeasonResult.objects.freeze() == years
+        assert SeasonResult.objects.count() == 4
+        assert SeasonResult.objects.freeze() == []
+        # Seasons which didn't end yet are left to the live rollup
+        SeasonResult.objects.all().delete()
+        assert SeasonResult.objects.freeze(now=datetime(2020, 12, 1, tzinfo=UTC)) == [
+            years[0]
+        ]
+
+    def test_careers(self, years, player):
+        SeasonResult.objects.freeze()
+        careers = SeasonResult.objects.careers()
+        assert careers["seasons"] == [2019, 2020]
+        career = careers["careers"][player.id]
+        assert (career["won"], career["lost"], career["weeks_won"]) == (5, 2, 2)
+        assert (career["best_season"], career["best_points"]) == (2019, 3)
+        # The streak of 2019 continues in 2020
+        assert (career["longest_streak"], career["streak"]) == (4, 0)
+
+    def test_career_view(
+        self, client, years, player, make_week, make_nfl_game, make_pick
+    ):
+        SeasonResult.objects.freeze(now=datetime(2020, 12, 1, tzinfo=UTC))
+        client.force_login(player)
+        response = client.get(reverse("nfl:career"))
+        assert response.status_code == HTTPStatus.OK
+        live = dict(response.context["careers"])[player]
+
+        SeasonResult.objects.freeze()
+        client.get(reverse("nfl:career"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("nfl:career"))
+        stored = dict(response.context["careers"])[player]
+        assert stored == live
+        assert stored["points"] == 5
+        assert stored["won_lost_ratio"] == pytest.approx(5 / 7)
+
+        # Another stored season doesn't need more queries
+        year = Year.objects.create(
+            start_timestamp=datetime(2021, 7, 17, 7, tzinfo=UTC),
+            end_timestamp=datetime(2022, 2, 16, 7, 59, tzinfo=UTC),
+            value=2021,
+        )
+        for game in self.make_season(year, make_week, make_nfl_game, (HOME,)):
+            make_pick(user=player, game=game, selection=HOME)
+        SeasonResult.objects.freeze()
+        client.get(reverse("nfl:career"))
+        with CaptureQueriesContext(connection) as cached:
+            response = client.get(reverse("nfl:career"))
+        assert len(cached) == len(ctx)
+        assert dict(response.context["careers"])[player]["seasons"] == 3
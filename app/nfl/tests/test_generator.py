@@ -0,0 +1,60 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+from django.core.management import call_command
+from nfl.generator import LeagueGenerator
+from nfl.models import Game, Pick, Week, Year
+
+
+@pytest.mark.django_db
+class TestLeagueGenerator:
+    def test_generate(self):
+        now = datetime(2021, 11, 10, 12, tzinfo=UTC)
+        counts = LeagueGenerator(
+            players=10, seasons=2, current_week=10, now=now
+        ).generate()
+        assert counts["players"] == 10
+        assert counts["seasons"] == 2
+        assert counts["games"] == Game.objects.count() == 2 * 331
+        assert counts["picks"] == Pick.objects.count() > 0
+        assert list(Year.objects.values_list("value", flat=True)) == [2020, 2021]
+
+        current_week = Week.objects.get(start_timestamp__lte=now, end_timestamp__gt=now)
+        assert (current_week.year.value, current_week.value) == (2021, 10)
+        games = current_week.games.all()
+        assert games.filter(final=True).count() == 1
+        assert not games.filter(timestamp__gt=now, final=True).exists()
+        assert not Game.objects.filter(final=True, home_team_score=None).exists()
+        assert not Game.objects.filter(timestamp__lte=now, final=False).exists()
+
+    def test_flush(self):
+        LeagueGenerator(players=2).generate()
+        LeagueGenerator.flush()
+        assert not Year.objects.exists()
+        assert not Pick.objects.exists()
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommand:
+    def test_benchmark_views(self, tmp_path):
+        output = tmp_path / "benchmark.json"
+        call_command(
+            "benchmark_views",
+            sizes=[(3, 1)],
+            repeat=1,
+            in_place=True,
+            output=str(output),
+        )
+        result = json.loads(output.read_text())
+        (run,) = result["runs"]
+        assert run["players"] == 3
+        assert set(run["benchmarks"]) == {
+            "standings",
+            "teams",
+            "schedule",
+            "picks",
+            "evaluate_week",
+        }
+        # Season standings come from the cache after the warm-up request
+        assert run["benchmarks"]["standings"]["queries"] == 4
@@ -0,0 +1,117 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nfl.defines import PickChoices
+from nfl.headtohead import PickMatrix
+from nfl.models import Team
+
+HOME, VISITOR, TBP = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM, PickChoices.TBP
+
+
+class TestPickMatrix:
+    def test_compare(self):
+        matrix = PickMatrix(
+            2019,
+            [1, 2, 3],
+            [10, 11, 12],
+            np.array(
+                [
+                    [HOME, HOME, VISITOR],
+                    [HOME, VISITOR, VISITOR],
+                    [VISITOR, TBP, HOME],
+                ]
+            ),
+        )
+        matrix.winners = np.array([HOME, VISITOR, TBP])
+        assert matrix.compare(1) == {
+            2: {"games": 3, "agreed": 2, "agreement": 2 / 3, "won": 0, "lost": 1},
+            3: {"games": 2, "agreed": 0, "agreement": 0, "won": 1, "lost": 0},
+        }
+        assert matrix.compare(4) == {}
+        assert matrix.majority().tolist() == [HOME, TBP, VISITOR]
+        assert matrix.contrarian() == {
+            1: {"score": 0, "against": 0, "won": 0},
+            2: {"score": 0, "against": 0, "won": 0},
+            3: {"score": 1.0, "against": 2, "won": 0},
+        }
+        agree, common = matrix.agreement()
+        assert (agree == agree.T).all()
+        assert (matrix.records().diagonal() == 0).all()
+
+
+@pytest.mark.django_db
+class TestPickMatrixLoad:
+    @pytest.fixture
+    def games(self, make_nfl_game):
+        now = datetime.now(UTC)
+        return [
+            make_nfl_game(
+                timestamp=now + timedelta(days=days),
+                home_team=Team.objects.get(pk=home),
+                visitor_team=Team.objects.get(pk=home + 1),
+            )
+            for days, home in ((-1, 3), (1, 5))
+        ]
+
+    @pytest.fixture
+    def users(self, games, make_pick, make_pick_pool_user):
+        users = [make_pick_pool_user() for _i in range(3)]
+        for user, selection in zip(users, (HOME, VISITOR, HOME)):
+            for game in games:
+                make_pick(user=user, game=game, selection=selection)
+        return users
+
+    def test_load_incremental(self, games, users):
+        with CaptureQueriesContext(connection) as ctx:
+            matrix = PickMatrix.load(2019)
+        assert len(ctx) == 2
+        # Picks of games which didn't kick off are hidden
+        assert games[0].id in matrix.game_ids
+        assert games[1].id not in matrix.game_ids
+        assert matrix.compare(users[0].id)[users[2].id]["agreed"] == 1
+
+        games[0].final = True
+        games[0].home_team_score, games[0].visitor_team_score = 3, 7
+        games[0].save()
+        with CaptureQueriesContext(connection) as ctx:
+            matrix = PickMatrix.load(2019)
+        assert len(ctx) == 1
+        assert matrix.compare(users[1].id)[users[0].id]["won"] == 1
+
+        with CaptureQueriesContext(connection) as ctx:
+            matrix = PickMatrix.load(2019, now=datetime.now(UTC) + timedelta(days=2))
+        assert len(ctx) == 2
+        assert matrix.game_ids[-1] == games[1].id
+        assert matrix.compare(users[1].id)[users[0].id] == {
+            "games": 2,
+            "agreed": 0,
+            "agreement": 0,
+            "won": 1,
+            "lost": 0,
+        }
+
+    def test_views(self, client, games, users):
+        client.force_login(users[0])
+        response = client.get(reverse("nfl:head-to-head-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        assert [player for player, _stats in response.context["head_to_head"]] == [
+            users[2],
+            users[1],
+        ]
+        response = client.get(
+            reverse("nfl:head-to-head-week-json", args=(2019, 5)),
+            {"user": users[1].id},
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data["user"] == users[1].id
+        assert [row["user"] for row in data["head_to_head"]] == [
+            users[0].id,
+            users[2].id,
+        ]
+        assert data["head_to_head"][0]["agreement"] == 0
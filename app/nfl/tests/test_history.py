@@ -0,0 +1,133 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nfl.api import EspnApiClient
+from nfl.defines import PickChoices
+from nfl.models import Game, Pick, Team
+from nfl.views import history_cursor, parse_history_cursor
+
+HOME, VISITOR = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM
+
+
+@pytest.mark.django_db
+class TestPickHistory:
+    @pytest.fixture
+    def games(self, make_nfl_game):
+        """Five games won by the home team, two of them at the same time,
+        and a game which didn't kick off yet."""
+        now = datetime.now(UTC)
+        games = []
+        for hours, home in ((-50, 3), (-30, 5), (-30, 7), (-10, 9), (-5, 11), (5, 13)):
+            game = make_nfl_game(
+                timestamp=now + timedelta(hours=hours),
+                home_team=Team.objects.get(pk=home),
+                visitor_team=Team.objects.get(pk=home + 1),
+            )
+            if hours < 0:
+                game.home_team_score, game.visitor_team_score = 21, 14
+                game.final = True
+                game.save()
+            games.append(game)
+        return games
+
+    @pytest.fixture
+    def player(self, games, make_pick, pick_pool_user):
+        for idx, game in enumerate(games):
+            make_pick(game=game, selection=HOME if idx % 2 == 0 else VISITOR)
+        Pick.objects.score()
+        return pick_pool_user
+
+    def pages(self, client, **params):
+        pages, params = [], dict(params)
+        while True:
+            response = client.get(reverse("nfl:history-json"), params)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            pages.append([pick["game"] for pick in data["picks"]])
+            if data["next"] is None:
+                return pages
+            params["cursor"] = data["next"]
+
+    def test_cursor(self, player):
+        pick = Pick.objects.filter(user=player).first()
+        assert parse_history_cursor(history_cursor(pick)) == (
+            pick.kickoff,
+            pick.game_id,
+        )
+        with pytest.raises(ValueError):
+            parse_history_cursor("not a cursor")
+
+    def test_score_correct(self, games, player):
+        correct = dict(
+            Pick.objects.filter(user=player).values_list("game_id", "correct")
+        )
+        assert [correct[game.id] for game in games] == [
+            True,
+            False,
+            True,
+            False,
+            True,
+            None,
+        ]
+
+    def test_rescheduled_game(self, games, player):
+        game = games[5]
+        game.timestamp += timedelta(days=1)
+        game.save()
+        assert Pick.objects.get(user=player, game=game).kickoff == game.timestamp
+        # Imports update the kickoff of existing games
+        kickoff = game.timestamp + timedelta(hours=3)
+        async_to_sync(EspnApiClient()._get_or_create)(
+            Game, event_id=game.event_id, defaults={"timestamp": kickoff}
+        )
+        assert Pick.objects.get(user=player, game=game).kickoff == kickoff
+
+    def test_save_without_reschedule(self, games, player):
+        game = Game.objects.get(pk=games[5].pk)
+        game.final = True
+        with CaptureQueriesContext(connection) as ctx:
+            game.save()
+        # Only the game is updated, its picks keep their kickoff
+        assert len(ctx) == 1
+
+    def test_pages(self, client, settings, games, player):
+        settings.NFL_HISTORY_PAGE_SIZE = 2
+        client.force_login(player)
+        pages = self.pages(client)
+        assert [len(page) for page in pages] == [2, 2, 2]
+        # The games at the same time are ordered by id
+        assert sum(pages, []) == [
+            games[5].id,
+            games[4].id,
+            games[3].id,
+            games[2].id,
+            games[1].id,
+            games[0].id,
+        ]
+
+    def test_filters(self, client, settings, games, player, year):
+        settings.NFL_HISTORY_PAGE_SIZE = 2
+        client.force_login(player)
+        assert sum(self.pages(client, result="won"), []) == [
+            games[4].id,
+            games[2].id,
+            games[0].id,
+        ]
+        assert sum(self.pages(client, result="open"), []) == [games[5].id]
+        assert sum(self.pages(client, team=6), []) == [games[1].id]
+        assert sum(self.pages(client, season=2018), []) == []
+        # Invalid filters are ignored
+        assert len(sum(self.pages(client, team="x", result="tied"), [])) == 6
+
+    def test_other_player(self, client, games, player, user):
+        client.force_login(user)
+        response = client.get(reverse("nfl:history"), {"user": player.id})
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["player"] == player
+        # Picks of games which didn't kick off yet are hidden
+        assert [pick.game for pick in response.context["history"]] == games[4::-1]
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from nfl.defines import LiveEventType, PickChoices
+from nfl.live import LIVE_STREAM, event_stream, game_events, publish_events
+
+
+def read_events(week_id, last_event_id=None, count=1):
+    async def _read():
+        res = []
+        stream = event_stream(week_id, last_event_id)
+        async for chunk in stream:
+            if chunk.startswith("retry:"):
+                continue
+            res.append(chunk)
+            if len(res) == count:
+                break
+        await stream.aclose()
+        return res
+
+    return asyncio.run(_read())
+
+
+@pytest.mark.django_db
+class TestLiveEvents:
+    def test_game_events(self, nfl_game):
+        nfl_game.home_team_score = 24
+        nfl_game.visitor_team_score = 17
+        nfl_game.final = True
+        events = game_events([nfl_game], [nfl_game])
+        assert [e[0] for e in events] == [
+            LiveEventType.SCORE,
+            LiveEventType.FINAL,
+            LiveEventType.STANDINGS,
+        ]
+        assert events[0][1]["home_team_score"] == 24
+        assert events[1][1]["winner"] == PickChoices.HOME_TEAM
+        assert events[2][1] == {"week": nfl_game.week_id}
+
+    def test_publish_events(self, fake_redis, nfl_game):
+        event_ids = publish_events(game_events([nfl_game], []))
+        assert len(event_ids) == 1
+        assert fake_redis.xlen(LIVE_STREAM) == 1
+        assert publish_events([]) == []
+
+    def test_replay_after_last_event_id(self, fake_redis, nfl_game):
+        first_id = publish_events(game_events([nfl_game], []))[0]
+        nfl_game.home_team_score = 7
+        publish_events([(LiveEventType.SCORE, {"game": 0, "week": 0})])
+        publish_events(game_events([nfl_game], []))
+
+        res = read_events(nfl_game.week_id, last_event_id=first_id)
+        assert res[0].startswith("id: ")
+        assert "event: score\n" in res[0]
+        data = json.loads(res[0].split("data: ")[1])
+        assert data["home_team_score"] == 7
+
+    def test_heartbeat(self, fake_redis, nfl_game, settings):
+        settings.NFL_LIVE_HEARTBEAT_INTERVAL = 0.01
+        publish_events(game_events([nfl_game], []))
+        # Without last event id only new events are sent.
+        assert read_events(nfl_game.week_id) == [": heartbeat\n\n"]
+
+
+@pytest.mark.django_db
+class TestLiveEventsView:
+    def test_view_requires_login(self, client, user):
+        response = client.get(reverse("nfl:live"))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        client.force_login(user)
+        response = client.get(reverse("nfl:live"))
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "text/event-stream"
+        assert response.streaming
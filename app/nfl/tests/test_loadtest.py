@@ -0,0 +1,76 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from core.db import connection_stats
+from pick_pool.asgi import application
+from nfl.api import EspnApiClient
+from nfl.defines import PickChoices
+from nfl.generator import LeagueGenerator
+from nfl.loadtest import LoadTest, StandInFeed
+from nfl.models import Game, Pick
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+class TestStandInFeed:
+    def test_check_games(self, fake_redis, make_nfl_game):
+        game = make_nfl_game()
+        feed = StandInFeed([game], final_after=2)
+        client = EspnApiClient(transport=feed.transport)
+        games = list(Game.objects.select_related("home_team", "visitor_team"))
+        for _i in range(3):
+            asyncio.run(client.check_games_async(games))
+        game.refresh_from_db()
+        assert game.final
+        assert game.home_team_score == feed.scores[game.event_id]["home"]
+        assert game.visitor_team_score == feed.scores[game.event_id]["away"]
+        assert game.winner != PickChoices.TIED_GAME
+
+    def test_check_games_in_calling_thread(self, fake_redis, make_nfl_game):
+        game = make_nfl_game(timestamp=datetime.now(UTC) - timedelta(hours=1))
+        feed = StandInFeed([game], final_after=0)
+        connection_stats.reset()
+        assert EspnApiClient(transport=feed.transport).check_games() == [game]
+        assert connection_stats.as_dict()["opened"] == {}
+        game.refresh_from_db()
+        assert game.final
+
+
+# Concurrent writers lock the in-memory SQLite test database, so a single
+# player and the ingestion are tested separately.
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+class TestLoadTest:
+    def test_players(self):
+        LeagueGenerator(players=1, password="secret").generate()
+        load_test = LoadTest(
+            base_url="http://testserver",
+            usernames=["player0"],
+            password="secret",
+            duration=2,
+            # Without known games a submit loads the picks page first
+            mix={"submit": 1},
+            think_time=0,
+            transport=httpx.ASGITransport(app=application),
+        )
+        report = asyncio.run(load_test.run())
+        assert set(report) == {"login", "picks", "submit"}
+        for name, stats in report.items():
+            assert stats["errors"] == 0, name
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert report["login"]["requests"] == 2
+        assert Pick.objects.filter(game__final=False).exists()
+
+    def test_ingest(self, fake_redis):
+        LeagueGenerator(players=1).generate()
+        load_test = LoadTest(
+            base_url="http://testserver",
+            usernames=[],
+            password="",
+            duration=1,
+            ingest_interval=0.01,
+        )
+        report = asyncio.run(load_test.run())
+        assert report["ingest"]["errors"] == 0
+        assert report["ingest"]["requests"] > 1
+        assert not Game.objects.filter(final=True, visitor_team_score=None).exists()
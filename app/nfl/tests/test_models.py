@@ -1,6 +1,12 @@
+from datetime import UTC, datetime, timedelta
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from nfl.defines import PickChoices, TeamChoices
-from nfl.models import Game, Team, Week
+from nfl.loaders import RequestLoader
+from nfl.models import Game, Pick, Team, TeamStanding, Week, WeekResult
 
 
 @pytest.mark.django_db
@@ -58,6 +64,16 @@ class TestGameModel:
         assert game_results[p2] == 1
         assert game_results[p3] == 0
 
+    def test_mark_tie_break_games(self, make_nfl_game, week):
+        first = make_nfl_game()
+        last = make_nfl_game(timestamp=first.timestamp + timedelta(days=4))
+        assert Game.objects.mark_tie_break_games([week.id]) == [last.id]
+        assert list(Game.objects.filter(tie_break=True)) == [last]
+
+        later = make_nfl_game(timestamp=last.timestamp + timedelta(hours=3))
+        Game.objects.mark_tie_break_games([week.id])
+        assert list(Game.objects.filter(tie_break=True)) == [later]
+
     def test_is_monday_night(self, nfl_game):
         assert not nfl_game.is_monday_night()
 
@@ -143,3 +159,176 @@ class TestWeekModel:
         assert res[0] == (17, [user2])
         assert res[1] == (9, [user4])
         assert res[2] == (0, [user1, user3])
+
+
+@pytest.mark.django_db
+class TestWeekResult:
+    @pytest.fixture
+    def games(self, nfl_game, make_nfl_game, week):
+        """Two final games won 24:17 by the home team, the second is the tie
+        break game."""
+        games = [
+            nfl_game,
+            make_nfl_game(
+                home_team=Team.objects.get(pk=3), visitor_team=Team.objects.get(pk=4)
+            ),
+        ]
+        games[1].timestamp += timedelta(days=4)
+        for game in games:
+            game.final = True
+            game.home_team_score, game.visitor_team_score = 24, 17
+            game.save()
+        Game.objects.mark_tie_break_games([week.id])
+        return games
+
+    @pytest.fixture
+    def players(self, games, make_pick, make_pick_pool_user):
+        home, visitor = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM
+        players = []
+        for first, tie_break_game, tie_break in (
+            (home, home, 7),
+            (home, home, 3),
+            (home, home, 11),
+            (visitor, visitor, 3),
+            (home, None, 0),
+        ):
+            user = make_pick_pool_user()
+            make_pick(user=user, game=games[0], selection=first)
+            if tie_break_game is not None:
+                make_pick(
+                    user=user,
+                    game=games[1],
+                    selection=tie_break_game,
+                    tie_break=tie_break,
+                )
+            players.append(user)
+        return players
+
+    def test_rank(self, week, players):
+        with CaptureQueriesContext(connection) as ctx:
+            results = WeekResult.objects.rank(week)
+        assert len(ctx) == 1
+        assert [
+            (result.user_id, result.points, result.tie_break, result.rank)
+            for result in results
+        ] == [
+            (players[0].id, 2, 0, 1),
+            (players[1].id, 2, 4, 2),
+            (players[2].id, 2, 4, 2),
+            (players[4].id, 1, None, 4),
+            (players[3].id, 0, 27, 5),
+        ]
+        for result in results:
+            pick = Pick.objects.filter(
+                user=result.user_id, game__tie_break=True
+            ).first()
+            assert result.tie_break == (pick.tie_break if pick else None)
+
+    def test_leaderboard_stored(self, week, games, players):
+        results = WeekResult.objects.leaderboard(week)
+        assert [result.user for result in results] == [
+            players[0],
+            players[1],
+            players[2],
+            players[4],
+            players[3],
+        ]
+        assert WeekResult.objects.filter(week=week).count() == 5
+
+        Pick.objects.filter(user=players[3]).update(selection=PickChoices.HOME_TEAM)
+        with CaptureQueriesContext(connection) as ctx:
+            stored = WeekResult.objects.leaderboard(week)
+        assert len(ctx) == 1
+        assert [(r.user, r.points, r.rank) for r in stored] == [
+            (r.user, r.points, r.rank) for r in results
+        ]
+
+    def test_leaderboard_not_final(self, week, games, players):
+        games[1].final = False
+        games[1].save()
+        results = WeekResult.objects.leaderboard(week)
+        assert results[0].points == 1
+        assert results[0].tie_break is None
+        assert not WeekResult.objects.exists()
+
+
+@pytest.mark.django_db
+class TestTeamStanding:
+    @pytest.fixture
+    def weeks(self, make_week, make_nfl_game):
+        weeks = [make_week(week=value) for value in (5, 6)]
+        for week, scores in zip(weeks, ((24, 10), (3, 7))):
+            game = make_nfl_game(week=week, timestamp=week.start_timestamp)
+            game.home_team_score, game.visitor_team_score = scores
+            game.final = True
+            game.save()
+        return [Week.objects.select_related("year").get(id=week.id) for week in weeks]
+
+    def standings(self, week):
+        return {
+            row.team_id: (row.won, row.lost, row.tie, row.points_for)
+            for row in TeamStanding.objects.filter(week=week)
+        }
+
+    def test_snapshot(self, weeks):
+        assert TeamStanding.objects.snapshot(weeks) == weeks
+        assert self.standings(weeks[0]) == {1: (1, 0, 0, 24), 2: (0, 1, 0, 0)}
+        assert self.standings(weeks[1]) == {1: (1, 1, 0, 24), 2: (1, 1, 0, 7)}
+
+        # A score correction patches the snapshots
+        game = Game.objects.get(week=weeks[0])
+        game.home_team_score = 3
+        game.save()
+        TeamStanding.objects.snapshot(weeks)
+        assert self.standings(weeks[1]) == {1: (0, 2, 0, 0), 2: (2, 0, 0, 17)}
+
+    def test_team_stats_read_snapshot(self, weeks):
+        TeamStanding.objects.snapshot(weeks)
+        with CaptureQueriesContext(connection) as ctx:
+            stats = async_to_sync(RequestLoader().team_stats)(weeks[1])
+        # A single read of the snapshot instead of the aggregation
+        assert len(ctx) == 1
+        assert stats == TeamStanding.objects.compute(weeks[1])
+
+    def test_snapshot_completed_weeks_only(self, weeks, make_nfl_game):
+        make_nfl_game(week=weeks[1], home_team=Team.objects.get(pk=3))
+        assert TeamStanding.objects.snapshot(weeks) == [weeks[0]]
+        assert not TeamStanding.objects.filter(week=weeks[1]).exists()
+        before = weeks[1].end_timestamp - timedelta(days=1)
+        assert TeamStanding.objects.snapshot(weeks, now=before) == [weeks[0]]
+        assert (
+            TeamStanding.objects.snapshot(weeks, now=datetime(2019, 1, 1, tzinfo=UTC))
+            == []
+        )
+
+
+@pytest.mark.django_db
+class TestPickManager:
+    def test_submit(self, nfl_game, pick_pool_user):
+        before_kickoff = nfl_game.timestamp - timedelta(minutes=1)
+        picks, rejected = Pick.objects.submit(
+            pick_pool_user,
+            {nfl_game.id: (PickChoices.HOME_TEAM, 3), 0: (PickChoices.HOME_TEAM, 0)},
+            now=before_kickoff,
+        )
+        assert len(picks) == 1
+        assert rejected == [0]
+
+        Pick.objects.submit(
+            pick_pool_user, {nfl_game.id: (PickChoices.TIED_GAME, 0)}, before_kickoff
+        )
+        pick = Pick.objects.get(user=pick_pool_user, game=nfl_game)
+        assert pick.selection == PickChoices.TIED_GAME
+        assert pick.picked_tie_break == 0
+
+        picks, rejected = Pick.objects.submit(
+            pick_pool_user,
+            {nfl_game.id: (PickChoices.HOME_TEAM, 0)},
+            now=nfl_game.timestamp,
+        )
+        assert picks == []
+        assert rejected == [nfl_game.id]
+
+    def test_unique_pick(self, pick):
+        with pytest.raises(IntegrityError):
+            Pick.objects.create(user=pick.user, game=pick.game)
@@ -0,0 +1,130 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nfl.api import EspnApiClient, games_updated
+from nfl.defines import PickChoices
+from nfl.live import LIVE_STREAM
+from nfl.models import Team
+from nfl.projections import LiveProjection
+
+HOME, VISITOR = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM
+
+
+def score(game, home, visitor, final=False):
+    game.home_team_score, game.visitor_team_score, game.final = home, visitor, final
+    game.save()
+    return game
+
+
+@pytest.mark.django_db
+class TestLiveProjection:
+    @pytest.fixture
+    def games(self, make_nfl_game):
+        now = datetime.now(UTC)
+        return [
+            make_nfl_game(
+                timestamp=now - timedelta(hours=1),
+                home_team=Team.objects.get(pk=home),
+                visitor_team=Team.objects.get(pk=home + 1),
+            )
+            for home in (3, 5, 7)
+        ]
+
+    @pytest.fixture
+    def users(self, games, make_pick, make_pick_pool_user):
+        home, visitor = make_pick_pool_user(), make_pick_pool_user()
+        for game in games:
+            make_pick(user=home, game=game, selection=HOME)
+            make_pick(user=visitor, game=game, selection=VISITOR)
+        return home, visitor
+
+    def test_update_changed_leaders_only(self, games, users, week):
+        home, visitor = users
+        LiveProjection.load(week.id)
+
+        score(games[0], 7, 0)
+        with CaptureQueriesContext(connection) as ctx:
+            assert LiveProjection.update([games[0]]) == [week.id]
+        assert len(ctx) == 1
+        assert LiveProjection.load(week.id).points == {home.id: 1}
+
+        # Scores without a change of the leader don't load any picks
+        score(games[0], 14, 3)
+        with CaptureQueriesContext(connection) as ctx:
+            assert LiveProjection.update([games[0]]) == []
+        assert len(ctx) == 0
+
+        score(games[0], 14, 17)
+        score(games[1], 3, 3)
+        assert LiveProjection.update(games[:2]) == [week.id]
+        projection = LiveProjection.load(week.id)
+        assert projection.points == {visitor.id: 1}
+        assert projection.leaders == {
+            games[0].id: VISITOR,
+            games[1].id: PickChoices.TIED_GAME,
+        }
+
+    def test_final_games_leave_projection(self, games, users, week):
+        home, visitor = users
+        LiveProjection.update([score(games[0], 7, 0), score(games[1], 0, 3)])
+        assert LiveProjection.load(week.id).points == {home.id: 1, visitor.id: 1}
+        LiveProjection.update([score(games[0], 7, 0, final=True)])
+        projection = LiveProjection.load(week.id)
+        assert projection.points == {visitor.id: 1}
+        assert projection.leaders == {games[1].id: VISITOR}
+
+    def test_scoring_rules(self, settings, games, users, week):
+        settings.NFL_SCORING_RULES = [
+            {"RULE": "nfl.scoring.CorrectPick", "OPTIONS": {"points": 2}},
+            {"RULE": "nfl.scoring.CorrectTieBonus", "OPTIONS": {"points": 3}},
+        ]
+        home, visitor = users
+        LiveProjection.update([score(games[0], 7, 0)])
+        assert LiveProjection.load(week.id).points == {home.id: 2}
+        # A tie only projects points for a tie pick
+        LiveProjection.update([score(games[0], 7, 7), score(games[1], 0, 3)])
+        assert LiveProjection.load(week.id).points == {visitor.id: 2}
+
+    def test_rebuild_matches_updates(self, games, users, week, locmem_cache):
+        LiveProjection.load(week.id)
+        for home_score, visitor_score in ((7, 0), (7, 10), (17, 10), (17, 17)):
+            LiveProjection.update([score(games[0], home_score, visitor_score)])
+            LiveProjection.update([score(games[2], visitor_score, home_score)])
+        projection = LiveProjection.load(week.id)
+        locmem_cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            rebuilt = LiveProjection.load(week.id)
+        assert len(ctx) == 2
+        assert (rebuilt.leaders, rebuilt.points) == (
+            projection.leaders,
+            projection.points,
+        )
+
+    def test_games_updated(self, games, users, week, fake_redis):
+        home, _visitor = users
+        games_updated.send(
+            sender=EspnApiClient,
+            scored_games=[score(games[0], 7, 0)],
+            finalized_games=[],
+        )
+        assert LiveProjection.load(week.id).points == {home.id: 1}
+        # Browsers reload the standings of the week
+        assert fake_redis.xlen(LIVE_STREAM) == 1
+
+    def test_live_standings(self, client, games, users, week):
+        home, visitor = users
+        score(games[0], 21, 7, final=True)
+        LiveProjection.update([score(games[1], 0, 3), score(games[2], 0, 7)])
+        client.force_login(home)
+        response = client.get(reverse("nfl:standings-live-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["live"]
+        standings = response.context["standings"]
+        assert standings[home]["points"] == standings[home]["points_live"] == 1
+        assert standings[visitor]["week"] == 0
+        assert standings[visitor]["projected"] == 2
+        assert standings[visitor]["week_live"] == standings[visitor]["points_live"] == 2
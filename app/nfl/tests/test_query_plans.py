@@ -0,0 +1,122 @@
+from datetime import UTC, datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from nfl.generator import LeagueGenerator
+from nfl.loaders import RequestLoader
+from nfl.models import Game, Pick, TeamStanding, TeamStandingManager, Week
+
+NOW = datetime(2021, 11, 10, 12, tzinfo=UTC)
+
+
+def query_plan(queryset) -> list:
+    """Rows of the database's query plan of a queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [{"detail": row[-1]} for row in cursor.fetchall()]
+        if connection.vendor == "mysql":
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    pytest.skip(f"Query plans of {connection.vendor} are not checked")
+
+
+def full_scans(plan: list) -> list:
+    """Tables which are read completely according to a query plan.
+
+    On SQLite every ``SCAN`` of a table is reported, on MySQL every table
+    with the access type ``ALL`` or ``index``.
+    """
+    if connection.vendor == "sqlite":
+        return [
+            row["detail"].split()[1]
+            for row in plan
+            if row["detail"].startswith("SCAN ") and "CONSTANT ROW" not in row["detail"]
+        ]
+    return [row["table"] for row in plan if row["type"] in ("ALL", "index")]
+
+
+def hot_queries():
+    week = Week.objects.select_related("year").get(
+        start_timestamp__lte=NOW, end_timestamp__gt=NOW
+    )
+    user = get_user_model().objects.first()
+    game_ids = list(Game.objects.filter(week=week).values_list("id", flat=True))
+    return {
+        "current_week": Week.objects.filter(
+            start_timestamp__lte=NOW, end_timestamp__gt=NOW
+        ),
+        "week_games": Game.objects.filter(week=week).order_by("timestamp", "home_team"),
+        "missing_games": Game.objects.missing(NOW),
+        "user_game_pick": Pick.objects.filter(user=user, game_id=game_ids[0]),
+        "game_picks": Pick.objects.filter(game__in=game_ids),
+        "week_picks": Pick.objects.filter(game__week=week).order_by(
+            "user__first_name", "game__timestamp", "game__home_team"
+        ),
+        "season_standings": Pick.objects.filter(
+            game__week__year__value=week.year.value, game__final=True
+        )
+        .values("user")
+        .annotate(picks=Count("id"))
+        .order_by(),
+        "team_stats": RequestLoader.season_games(week)
+        .values("home_team")
+        .annotate(games=Count("id"))
+        .order_by(),
+        "team_snapshot": TeamStanding.objects.filter(week=week).values(
+            "team", *TeamStandingManager.fields
+        ),
+        "pick_history": Pick.objects.history(
+            user, cursor=(NOW, game_ids[0]), result="won"
+        )[:50],
+    }
+
+
+HOT_QUERIES = [
+    "current_week",
+    "week_games",
+    "missing_games",
+    "user_game_pick",
+    "game_picks",
+    "week_picks",
+    "season_standings",
+    "team_stats",
+    "team_snapshot",
+    "pick_history",
+]
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    @pytest.fixture(autouse=True)
+    def league(self):
+        LeagueGenerator(players=10, seasons=2, now=NOW).generate()
+
+    @pytest.mark.parametrize("name", HOT_QUERIES)
+    def test_no_full_scan(self, name):
+        plan = query_plan(hot_queries()[name])
+        assert full_scans(plan) == [], plan
+
+    def test_hot_query_indexes(self):
+        if connection.vendor != "sqlite":
+            pytest.skip("Index names are checked on SQLite only")
+        queries = hot_queries()
+        for name, index in (
+            ("current_week", "nfl_week_range_idx"),
+            ("week_games", "nfl_game_week_ts_idx"),
+            ("missing_games", "nfl_game_ts_idx"),
+            ("pick_history", "nfl_pick_history_idx"),
+        ):
+            plan = query_plan(queries[name])
+            assert any(index in row["detail"] for row in plan), plan
+
+    def test_pick_history_range(self):
+        if connection.vendor != "sqlite":
+            pytest.skip("Index ranges are checked on SQLite only")
+        plan = query_plan(hot_queries()["pick_history"])
+        # Deep pages start at the cursor instead of skipping the newer picks
+        assert any("kickoff<" in row["detail"] for row in plan), plan
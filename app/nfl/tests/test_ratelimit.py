@@ -0,0 +1,72 @@
+import time
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from nfl.ratelimit import RateLimitedTransport, endpoint
+from redis import asyncio as aioredis
+
+BASE_URL = "http://sports.core.api.espn.com/v2/sports/football/leagues/nfl"
+
+
+@pytest.fixture
+def rate_limits(settings):
+    settings.NFL_ESPN_RATE_LIMITS = {"default": (20, 4), "score": (20, 2)}
+    settings.NFL_ESPN_RATE_RESERVE = 0.5
+    return settings
+
+
+def limited_transport(background=False):
+    return RateLimitedTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)), background
+    )
+
+
+def test_endpoint():
+    assert endpoint(httpx.URL(f"{BASE_URL}/seasons/2019")) == "seasons"
+    assert endpoint(httpx.URL(f"{BASE_URL}/events/1/competitors/2/score")) == "score"
+
+
+class TestRateLimitedTransport:
+    def test_burst_then_rate(self, fake_redis, rate_limits):
+        async def acquire(transport, count):
+            res = [await transport.acquire("score") for _ in range(count)]
+            await transport.aclose()
+            return res
+
+        waits = async_to_sync(acquire)(limited_transport(), 3)
+        assert waits[:2] == [0, 0]
+        # One token every 50ms after the burst of two
+        assert 0.03 < waits[2] < 0.1
+        assert fake_redis.exists("nfl:espn:ratelimit:score")
+
+    def test_reserve_for_live_requests(self, fake_redis, rate_limits):
+        async def acquire():
+            live, background = limited_transport(), limited_transport(True)
+            res = [await background.acquire("events") for _ in range(3)]
+            res += [await live.acquire("events") for _ in range(2)]
+            await live.aclose()
+            await background.aclose()
+            return res
+
+        waits = async_to_sync(acquire)()
+        # Background requests leave two of four tokens to live ones
+        assert waits[:2] == [0, 0]
+        assert waits[2] > 0
+        assert waits[3] == 0
+
+    def test_shared_between_clients(self, fake_redis, rate_limits):
+        async def get(count):
+            start = time.perf_counter()
+            for _ in range(count):
+                async with httpx.AsyncClient(transport=limited_transport()) as client:
+                    assert (await client.get(f"{BASE_URL}/seasons")).status_code == 200
+            return time.perf_counter() - start
+
+        # Four requests are free, the next four take 50ms each
+        assert async_to_sync(get)(4) < 0.1
+        assert async_to_sync(get)(4) > 0.15
+
+    def test_no_redis(self, monkeypatch, rate_limits):
+        monkeypatch.setattr("nfl.live.get_async_redis", lambda: aioredis.Redis(port=1))
+        assert async_to_sync(limited_transport().acquire)("events") == 0
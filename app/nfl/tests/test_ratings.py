@@ -0,0 +1,106 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from django.urls import reverse
+from nfl.api import EspnApiClient, games_updated
+from nfl.models import Game, Team, TeamRating
+from nfl.ratings import INITIAL_RATING, elo_home_win, elo_pass, rounds
+
+
+def test_rounds():
+    home, visitor = np.array([1, 3, 1, 2, 5]), np.array([2, 4, 3, 4, 6])
+    assert rounds(home, visitor) == [slice(0, 2), slice(2, 5)]
+
+
+def test_elo_pass_matches_sequential():
+    rng = np.random.default_rng(0)
+    teams = rng.integers(0, 8, (400, 2))
+    teams = teams[teams[:, 0] != teams[:, 1]]
+    home, visitor = teams[:, 0], teams[:, 1]
+    game_seasons = np.repeat([2019, 2020], len(home) // 2 + 1)[: len(home)]
+    results = rng.choice([0, 0.5, 1], len(home))
+    ratings, seasons = np.full(8, INITIAL_RATING, dtype=float), np.zeros(8, int)
+    elo_pass(ratings, seasons, home, visitor, game_seasons, results, 20, 48, 1 / 3)
+
+    expected, last = np.full(8, INITIAL_RATING, dtype=float), np.zeros(8, int)
+    for h, v, season, result in zip(home, visitor, game_seasons, results):
+        for team in (h, v):
+            if last[team] and last[team] != season:
+                expected[team] -= (expected[team] - INITIAL_RATING) / 3
+            last[team] = season
+        delta = 20 * (result - elo_home_win(expected[h] + 48, expected[v]))
+        expected[h] += delta
+        expected[v] -= delta
+    assert ratings == pytest.approx(expected)
+    assert (seasons == last).all()
+
+
+@pytest.mark.django_db
+class TestTeamRating:
+    @pytest.fixture
+    def games(self, make_nfl_game):
+        now = datetime.now(UTC)
+        games = []
+        for days, home, visitor, scores in (
+            (-14, 3, 4, (24, 10)),
+            (-7, 4, 5, (17, 17)),
+            (-7, 3, 6, (7, 10)),
+        ):
+            game = make_nfl_game(
+                timestamp=now + timedelta(days=days),
+                home_team=Team.objects.get(pk=home),
+                visitor_team=Team.objects.get(pk=visitor),
+            )
+            game.home_team_score, game.visitor_team_score = scores
+            game.final = True
+            game.save()
+            games.append(game)
+        return games
+
+    def ratings(self):
+        return dict(TeamRating.objects.values_list("team_id", "rating"))
+
+    def test_rate_games(self, games):
+        assert TeamRating.objects.rate_games() == [game.id for game in games]
+        ratings = self.ratings()
+        assert ratings[3] < INITIAL_RATING + 20
+        assert ratings[6] > INITIAL_RATING
+        assert sum(ratings.values()) == pytest.approx(INITIAL_RATING * len(ratings))
+        assert TeamRating.objects.get(team_id=3).games == 2
+        assert TeamRating.objects.rate_games() == []
+
+    def test_incremental_matches_rebuild(self, games):
+        games[-1].final = False
+        games[-1].save()
+        TeamRating.objects.rate_games()
+        games[-1].final = True
+        games[-1].save()
+        assert TeamRating.objects.rate_games() == [games[-1].id]
+        ratings = self.ratings()
+        assert TeamRating.objects.rebuild() == [game.id for game in games]
+        assert self.ratings() == pytest.approx(ratings)
+        assert not Game.objects.filter(final=True, rated=False).exists()
+
+    def test_games_updated(self, games):
+        games_updated.send(
+            sender=EspnApiClient, scored_games=games, finalized_games=games
+        )
+        assert set(self.ratings()) == {3, 4, 5, 6}
+
+    def test_schedule_win_probabilities(self, client, games, make_nfl_game, user):
+        TeamRating.objects.rate_games()
+        upcoming = make_nfl_game(
+            timestamp=datetime.now(UTC) + timedelta(days=1),
+            home_team=Team.objects.get(pk=6),
+            visitor_team=Team.objects.get(pk=3),
+        )
+        client.force_login(user)
+        response = client.get(reverse("nfl:schedule-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        games = {game.id: game for game in response.context["week_games"]}
+        assert games[upcoming.id].home_win_probability > 0.5
+        assert games[upcoming.id].visitor_win_probability == pytest.approx(
+            1 - games[upcoming.id].home_win_probability
+        )
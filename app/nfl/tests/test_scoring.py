@@ -0,0 +1,124 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nfl.defines import PickChoices
+from nfl.models import Pick, SeasonResult, Team, Week, WeekResult, Year
+from nfl.scoring import CorrectPick, CorrectTieBonus, PlayoffMultiplier, Scoring
+
+RULES = [
+    {"RULE": "nfl.scoring.CorrectPick", "OPTIONS": {"points": 2}},
+    {"RULE": "nfl.scoring.CorrectTieBonus", "OPTIONS": {"points": 3}},
+    {"RULE": "nfl.scoring.PlayoffMultiplier", "OPTIONS": {"factor": 2}},
+]
+
+
+def test_from_settings(settings):
+    settings.NFL_SCORING_RULES = RULES
+    rules = Scoring.from_settings().rules
+    assert [type(rule) for rule in rules] == [
+        CorrectPick,
+        CorrectTieBonus,
+        PlayoffMultiplier,
+    ]
+    assert [rule.value for rule in rules] == [2, 3, 2]
+
+
+@pytest.mark.django_db
+class TestScoring:
+    @pytest.fixture
+    def games(self, make_week, make_nfl_game):
+        """Final games of a regular and a playoff week, a home win, a
+        visitor win and a tie each, and a game which is not final."""
+        games = []
+        for week in (make_week(week=5), make_week(week=23)):
+            for home, scores in ((3, (24, 10)), (5, (3, 7)), (7, (17, 17))):
+                game = make_nfl_game(
+                    week=week,
+                    home_team=Team.objects.get(pk=home),
+                    visitor_team=Team.objects.get(pk=home + 1),
+                )
+                game.home_team_score, game.visitor_team_score = scores
+                game.final = True
+                game.save()
+                games.append(game)
+        games.append(
+            make_nfl_game(
+                home_team=Team.objects.get(pk=9), visitor_team=Team.objects.get(pk=10)
+            )
+        )
+        return games
+
+    @pytest.fixture
+    def picks(self, games, make_pick, make_pick_pool_user):
+        users = [make_pick_pool_user() for _ in range(3)]
+        selections = (
+            PickChoices.HOME_TEAM,
+            PickChoices.VISITOR_TEAM,
+            PickChoices.TIED_GAME,
+        )
+        return [
+            make_pick(user=user, game=game, selection=selection)
+            for user, selection in zip(users, selections)
+            for game in games
+        ]
+
+    def test_expression_matches_python(self, settings, picks):
+        settings.NFL_SCORING_RULES = RULES
+        scoring = Scoring.from_settings()
+        points = dict(
+            Pick.objects.annotate(score=scoring.expression()).values_list("id", "score")
+        )
+        assert points == {pick.id: scoring.points(pick) for pick in picks}
+        # A correct tie in the playoffs, (2 + 3) * 2
+        assert max(points.values()) == 10
+
+    def test_score(self, settings, picks):
+        settings.NFL_SCORING_RULES = RULES
+        with CaptureQueriesContext(connection) as ctx:
+            count = Pick.objects.score()
+        assert len(ctx) == 1
+        assert count == Pick.objects.count()
+        scoring = Scoring.from_settings()
+        for pick in Pick.objects.select_related("game__week"):
+            assert pick.points == scoring.points(pick)
+
+    def test_evaluations(self, settings, picks):
+        settings.NFL_SCORING_RULES = RULES
+        home, visitor, tie = (pick.user for pick in picks[::7])
+        # Correct picks in week 5 and doubled in week 23
+        assert Year.objects.evaluate_year(2019) == [
+            (15, [tie]),
+            (6, [home, visitor]),
+        ]
+        week = Week.objects.get(year__value=2019, value=23)
+        assert [(r.user, r.points) for r in WeekResult.objects.rank(week)] == [
+            (tie, 10),
+            (home, 4),
+            (visitor, 4),
+        ]
+
+    def test_unpicked_open_game(self, games, make_pick, make_pick_pool_user):
+        pick = make_pick(
+            user=make_pick_pool_user(), game=games[-1], selection=PickChoices.TBP
+        )
+        scoring = Scoring.from_settings()
+        assert scoring.points(pick) == 0
+        assert Pick.objects.filter(pk=pick.pk).aggregate(points=scoring.total()) == {
+            "points": 0
+        }
+        Pick.objects.score(Pick.objects.filter(pk=pick.pk))
+        pick.refresh_from_db()
+        assert (pick.points, pick.correct) == (0, None)
+        results = WeekResult.objects.rank(games[-1].week)
+        assert [r.points for r in results if r.user_id == pick.user_id] == [0]
+
+    def test_score_picks_command(self, settings, picks):
+        week = Week.objects.get(year__value=2019, value=5)
+        WeekResult.objects.bulk_create(WeekResult.objects.rank(week))
+
+        settings.NFL_SCORING_RULES = RULES
+        call_command("score_picks", season=2019)
+        assert set(Pick.objects.values_list("points", flat=True)) == {0, 2, 4, 5, 10}
+        assert not WeekResult.objects.exists()
+        assert set(SeasonResult.objects.values_list("points", flat=True)) == {15, 6}
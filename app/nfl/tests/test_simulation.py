@@ -0,0 +1,172 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nfl.api import EspnApiClient, games_updated
+from nfl.defines import PickChoices
+from nfl.models import Team
+from nfl.ratings import INITIAL_RATING, elo_home_win
+from nfl.simulation import (
+    WinSimulator,
+    results_key,
+    simulate_season,
+    simulate_week,
+)
+
+HOME, VISITOR = PickChoices.HOME_TEAM, PickChoices.VISITOR_TEAM
+
+
+class TestWinSimulator:
+    def test_eliminated(self):
+        simulator = WinSimulator(
+            [1, 2, 3, 4],
+            np.array(
+                [
+                    [HOME, HOME],
+                    [HOME, VISITOR],
+                    [VISITOR, VISITOR],
+                    [HOME, HOME],
+                ]
+            ),
+            np.array([3, 2, 1, 2]),
+        )
+        # User 4 picked like the leader and can't catch up. User 2 ties for
+        # first if the second visitor wins, user 3 if both visitors win
+        assert simulator.eliminated().tolist() == [False, False, False, True]
+        probabilities = simulator.win_probabilities(20_000)
+        assert probabilities[0] == 1
+        assert probabilities[1] == pytest.approx(0.5, abs=0.02)
+        assert probabilities[2] == pytest.approx(0.25, abs=0.02)
+        assert probabilities[3] == 0
+
+    def test_weighted_outcomes(self):
+        simulator = WinSimulator(
+            [1, 2], np.array([[HOME], [VISITOR]]), np.zeros(2), np.array([0.8])
+        )
+        assert simulator.win_probabilities(20_000).tolist() == pytest.approx(
+            [0.8, 0.2], abs=0.02
+        )
+
+    def test_scoring_weights(self):
+        # The second game counts twice, e.g. a playoff game
+        simulator = WinSimulator(
+            [1, 2, 3],
+            np.array([[HOME, HOME], [VISITOR, VISITOR], [VISITOR, HOME]]),
+            np.array([2, 0, 0]),
+            weights=np.array([[1, 2], [1, 2], [1, 2]]),
+        )
+        assert simulator.eliminated().tolist() == [False, False, True]
+        probabilities = simulator.win_probabilities(20_000)
+        assert probabilities[0] == pytest.approx(0.75, abs=0.02)
+        assert probabilities[1] == pytest.approx(0.25, abs=0.02)
+        assert probabilities[2] == 0
+
+    def test_from_rows_ratings(self, settings):
+        settings.NFL_ELO_HOME_ADVANTAGE = 48
+        games = [
+            {
+                "id": game_id,
+                "final": False,
+                "home_team_id": home,
+                "visitor_team_id": home + 1,
+                "home_team_score": None,
+                "visitor_team_score": None,
+                "week__value": 5,
+            }
+            for game_id, home in ((1, 1), (2, 3))
+        ]
+        simulator = WinSimulator.from_rows([1], games, [], ratings={1: 1600})
+        # Unrated teams start at the initial rating, both with home advantage
+        assert simulator.home_win.tolist() == pytest.approx(
+            [
+                elo_home_win(1648, INITIAL_RATING),
+                elo_home_win(INITIAL_RATING + 48, INITIAL_RATING),
+            ]
+        )
+
+    def test_performance(self):
+        rng = np.random.default_rng(0)
+        simulator = WinSimulator(
+            list(range(500)), rng.integers(0, 3, (500, 16)), rng.integers(0, 5, 500)
+        )
+        start = time.perf_counter()
+        simulator.win_probabilities(100_000)
+        simulator.eliminated()
+        assert time.perf_counter() - start < 1
+
+
+@pytest.mark.django_db
+class TestSimulate:
+    @pytest.fixture
+    def games(self, make_nfl_game):
+        """A final game won by the home team and two upcoming games."""
+        now = datetime.now(UTC)
+        final = make_nfl_game(timestamp=now - timedelta(days=1))
+        final.final = True
+        final.home_team_score, final.visitor_team_score = 24, 17
+        final.save()
+        return [final] + [
+            make_nfl_game(
+                timestamp=now + timedelta(days=1),
+                home_team=Team.objects.get(pk=home),
+                visitor_team=Team.objects.get(pk=home + 1),
+            )
+            for home in (3, 5)
+        ]
+
+    def test_simulate_week(self, games, week, make_pick, make_pick_pool_user):
+        leader, chaser, behind = (make_pick_pool_user() for _i in range(3))
+        for user, selections in (
+            (leader, [HOME, HOME, HOME]),
+            (chaser, [VISITOR, VISITOR, VISITOR]),
+            (behind, [VISITOR, HOME, HOME]),
+        ):
+            for game, selection in zip(games, selections):
+                make_pick(user=user, game=game, selection=selection)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = simulate_week(week, simulations=10_000)
+        assert len(ctx) == 3
+        assert res[behind.id] == {"win_probability": 0.0, "eliminated": True}
+        assert not res[chaser.id]["eliminated"]
+        assert res[chaser.id]["win_probability"] == pytest.approx(0.25, abs=0.03)
+        assert res[leader.id]["win_probability"] == pytest.approx(0.75, abs=0.03)
+
+        assert simulate_week(week, simulations=10_000) == res
+        # Cached until the next score change
+        games[1].final = True
+        games[1].home_team_score, games[1].visitor_team_score = 10, 13
+        games[1].save()
+        res = simulate_week(week, simulations=10_000)
+        assert res[chaser.id]["win_probability"] == pytest.approx(0.5, abs=0.03)
+
+    def test_simulate_season(self, games, year, make_pick, make_pick_pool_user):
+        user = make_pick_pool_user()
+        make_pick(user=user, game=games[0], selection=HOME)
+        res = simulate_season(year, simulations=1_000)
+        assert res.pop(user.id) == {"win_probability": 1.0, "eliminated": False}
+        # Nobody else picked any game
+        assert res
+        for other in res.values():
+            assert other == {"win_probability": 0.0, "eliminated": True}
+
+    def test_precomputed_on_final_scores(
+        self, client, games, week, make_pick, pick_pool_user, fake_redis, locmem_cache
+    ):
+        make_pick(game=games[0], selection=HOME)
+        games_updated.send(
+            sender=EspnApiClient, scored_games=[], finalized_games=[games[0]]
+        )
+        res = locmem_cache.get(results_key("week", week.id))
+        assert res[pick_pool_user.id]["win_probability"] > 0
+        assert locmem_cache.get(results_key("season", week.year_id))
+
+        client.force_login(pick_pool_user)
+        response = client.get(reverse("nfl:standings-week", args=(2019, 5)))
+        assert response.context["simulated"]
+        standings = response.context["standings"][pick_pool_user]
+        assert standings["week_simulation"] == res[pick_pool_user.id]
@@ -0,0 +1,91 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+from asgiref.sync import async_to_sync
+from core.tasks import TaskLock, task_stats
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nfl.api import EspnApiClient
+from nfl.defines import LiveEventType
+from nfl.generator import LeagueGenerator
+from nfl.live import LIVE_STREAM
+from nfl.loadtest import StandInFeed
+from nfl.loaders import RequestLoader, aggregates_version_key
+from nfl.models import Game
+from nfl.tasks import enqueue_once, nfl_check_games, nfl_refresh_aggregates
+
+
+def season_standings(season):
+    return async_to_sync(RequestLoader().season_standings)(season)
+
+
+@pytest.mark.django_db
+class TestPostIngestion:
+    @pytest.fixture
+    def started_game(self):
+        """First game of the current week of a generated league, not final yet."""
+        LeagueGenerator(players=5, now=datetime.now(UTC)).generate()
+        game = (
+            Game.objects.filter(timestamp__lte=datetime.now(UTC))
+            .select_related("week__year")
+            .latest("timestamp")
+        )
+        game.final = False
+        game.home_team_score = game.visitor_team_score = None
+        game.save()
+        return game
+
+    def test_refresh_after_ingestion(self, fake_redis, locmem_cache, started_game):
+        season = started_game.week.year.value
+        before = season_standings(season)
+        feed = StandInFeed([started_game], final_after=0)
+        assert EspnApiClient(transport=feed.transport).check_games() == [started_game]
+        assert locmem_cache.get(aggregates_version_key(season))
+
+        with CaptureQueriesContext(connection) as ctx:
+            after = season_standings(season)
+        assert len(ctx) == 0
+        assert sum(s["won"] + s["lost"] for s in after.values()) > sum(
+            s["won"] + s["lost"] for s in before.values()
+        )
+        events = [
+            (fields[b"type"].decode(), json.loads(fields[b"data"]))
+            for _id, fields in fake_redis.xrange(LIVE_STREAM)
+        ]
+        assert events[-1] == (
+            str(LiveEventType.STANDINGS),
+            {"week": started_game.week_id},
+        )
+
+    def test_refresh_in_progress(self, fake_redis, locmem_cache, nfl_game):
+        nfl_game.final = True
+        nfl_game.save()
+        lock = TaskLock(f"nfl_refresh_aggregates:{nfl_game.week_id}", 60)
+        assert lock.acquire()
+        nfl_refresh_aggregates(nfl_game.week_id)
+        assert locmem_cache.get(aggregates_version_key(2019)) is None
+        assert fake_redis.xlen(LIVE_STREAM) == 0
+
+        lock.release()
+        nfl_refresh_aggregates(nfl_game.week_id)
+        assert locmem_cache.get(aggregates_version_key(2019))
+        assert fake_redis.xlen(LIVE_STREAM) == 1
+
+    def test_check_games_skipped(self, monkeypatch):
+        monkeypatch.setattr(EspnApiClient, "check_games", pytest.fail)
+        task_stats.reset()
+        assert TaskLock("nfl_check_games", 60).acquire()
+        nfl_check_games()
+        assert task_stats.as_dict()["nfl_check_games"]["skips"] == 1
+
+
+class TestEnqueueOnce:
+    def test_pending(self, huey_immediate):
+        calls = []
+        huey_immediate.put_if_empty("pending:test", 1)
+        assert enqueue_once(calls.append, "test", 1) is None
+        huey_immediate.delete("pending:test")
+        enqueue_once(calls.append, "test", 2)
+        enqueue_once(calls.append, "test", 3)
+        assert calls == [2]
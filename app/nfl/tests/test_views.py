@@ -1,7 +1,12 @@
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from nfl.defines import PickChoices
+from nfl.models import Pick
 
 
 @pytest.mark.django_db
@@ -27,3 +32,226 @@ class TestPicksView:
         response = client.get(reverse("nfl:picks"))
         assert response.status_code == HTTPStatus.OK
         assert "nfl/picks.html" in (t.name for t in response.templates)
+
+
+@pytest.mark.django_db
+class TestPicksViewData:
+    def test_picks_of_week(self, client, nfl_games, make_pick, make_pick_pool_user):
+        user1 = make_pick_pool_user()
+        user2 = make_pick_pool_user()
+        for game in nfl_games:
+            make_pick(user=user1, game=game)
+            make_pick(user=user2, game=game, selection=PickChoices.VISITOR_TEAM)
+        game = nfl_games.first()
+        game.final = True
+        game.home_team_score = 3
+        game.visitor_team_score = 7
+        game.save()
+
+        client.force_login(user1)
+        response = client.get(reverse("nfl:picks-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        picks = response.context["picks"]
+        assert len(picks[user1]["picks"]) == nfl_games.count()
+        assert picks[user1]["score"] == 0
+        assert picks[user2]["score"] == 1
+        assert picks[user2]["season_score"] == 1
+        assert response.context["unpicked_games"] == []
+
+    def test_scoring_rules(
+        self, client, settings, nfl_games, make_pick, pick_pool_user
+    ):
+        settings.NFL_SCORING_RULES = [
+            {"RULE": "nfl.scoring.CorrectPick", "OPTIONS": {"points": 3}}
+        ]
+        game = nfl_games.first()
+        make_pick(game=game, selection=PickChoices.VISITOR_TEAM)
+        game.final = True
+        game.home_team_score, game.visitor_team_score = 3, 7
+        game.save()
+
+        client.force_login(pick_pool_user)
+        response = client.get(reverse("nfl:picks-week", args=(2019, 5)))
+        picks = response.context["picks"][pick_pool_user]
+        assert (picks["score"], picks["season_score"]) == (3, 3)
+
+    def test_post_picks(self, client, make_nfl_game, pick_pool_user):
+        game = make_nfl_game(timestamp=datetime.now(UTC) + timedelta(days=1))
+        client.force_login(pick_pool_user)
+        response = client.post(
+            reverse("nfl:picks-week", args=(2019, 5)),
+            {f"pick_{game.id}": "2_14"},
+        )
+        assert response.status_code == HTTPStatus.OK
+        pick = Pick.objects.get(user=pick_pool_user, game=game)
+        assert pick.selection == PickChoices.VISITOR_TEAM
+        assert pick.picked_tie_break == 14
+
+    def test_post_picks_twice(self, client, make_nfl_game, pick_pool_user):
+        game = make_nfl_game(timestamp=datetime.now(UTC) + timedelta(days=1))
+        client.force_login(pick_pool_user)
+        url = reverse("nfl:picks-week", args=(2019, 5))
+        client.post(url, {f"pick_{game.id}": "2_14"})
+        client.post(url, {f"pick_{game.id}": "1_3"})
+        pick = Pick.objects.get(user=pick_pool_user, game=game)
+        assert pick.selection == PickChoices.HOME_TEAM
+        assert pick.picked_tie_break == 3
+
+    def test_post_picks_after_kickoff(
+        self, client, nfl_game, make_nfl_game, pick_pool_user
+    ):
+        game = make_nfl_game(timestamp=datetime.now(UTC) + timedelta(days=1))
+        client.force_login(pick_pool_user)
+        response = client.post(
+            reverse("nfl:picks-week", args=(2019, 5)),
+            {
+                f"pick_{nfl_game.id}": "1_0",
+                f"pick_{game.id}": "3_0",
+                "pick_0": "1_0",
+                "pick_x": "1_0",
+            },
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert list(Pick.objects.values_list("game", "selection")) == [
+            (game.id, PickChoices.TIED_GAME)
+        ]
+        assert [str(m) for m in response.context["messages"]] == [
+            "2 picks were rejected, the games already started."
+        ]
+
+    def test_post_picks_query_count(self, client, make_nfl_game, pick_pool_user):
+        kickoff = datetime.now(UTC) + timedelta(days=1)
+        games = [
+            make_nfl_game(timestamp=kickoff + timedelta(hours=i)) for i in range(8)
+        ]
+        client.force_login(pick_pool_user)
+        url = reverse("nfl:picks-week", args=(2019, 5))
+        client.post(url, {f"pick_{game.id}": "2_0" for game in games})
+        with CaptureQueriesContext(connection) as get_queries:
+            client.get(url)
+        with CaptureQueriesContext(connection) as post_queries:
+            client.post(url, {f"pick_{game.id}": "1_0" for game in games})
+        # One query to fetch the games and one upsert on top of the page
+        assert len(post_queries) == len(get_queries) + 2
+        assert list(
+            Pick.objects.filter(user=pick_pool_user).values_list("selection", flat=True)
+        ) == [PickChoices.HOME_TEAM] * len(games)
+
+
+@pytest.mark.django_db
+class TestScheduleView:
+    def test_games_of_week(self, client, nfl_games, user):
+        client.force_login(user)
+        response = client.get(reverse("nfl:schedule-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["week"].value == 5
+        assert response.context["week_games"] == list(
+            nfl_games.order_by("timestamp", "home_team")
+        )
+
+    def test_consensus(
+        self, client, nfl_game, make_nfl_game, make_pick, make_pick_pool_user, user
+    ):
+        upcoming = make_nfl_game(timestamp=datetime.now(UTC) + timedelta(days=1))
+        for selection in (PickChoices.HOME_TEAM,) * 3 + (PickChoices.VISITOR_TEAM,):
+            picker = make_pick_pool_user()
+            make_pick(user=picker, game=nfl_game, selection=selection)
+            make_pick(user=picker, game=upcoming, selection=selection)
+        nfl_game.final = True
+        nfl_game.home_team_score, nfl_game.visitor_team_score = 10, 13
+        nfl_game.save()
+        client.force_login(user)
+        response = client.get(reverse("nfl:schedule-week", args=(2019, 5)))
+        games = {game.id: game for game in response.context["week_games"]}
+        assert games[nfl_game.id].consensus == {
+            "picks": 4,
+            "home": 0.75,
+            "visitor": 0.25,
+            "tie": 0,
+            "majority": PickChoices.HOME_TEAM,
+            "minority_won": True,
+        }
+        # Picks of games which didn't kick off are hidden
+        assert games[upcoming.id].consensus is None
+
+
+@pytest.mark.django_db
+class TestStandingsView:
+    def test_standings(self, client, nfl_game, make_pick, pick_pool_user):
+        make_pick(user=pick_pool_user, game=nfl_game)
+        nfl_game.final = True
+        nfl_game.home_team_score = 21
+        nfl_game.visitor_team_score = 7
+        nfl_game.save()
+        response = client.get(reverse("nfl:standings-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.FOUND
+        client.force_login(pick_pool_user)
+        response = client.get(reverse("nfl:standings-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["standings"][pick_pool_user] == {
+            "points": 1,
+            "won": 1,
+            "lost": 0,
+            "won_lost_ratio": 1.0,
+        }
+
+
+@pytest.mark.django_db
+class TestTeamsView:
+    def test_team_standings(self, client, nfl_game, user):
+        nfl_game.final = True
+        nfl_game.home_team_score = 21
+        nfl_game.visitor_team_score = 7
+        nfl_game.save()
+        client.force_login(user)
+        response = client.get(reverse("nfl:teams-week", args=(2019, 5)))
+        assert response.status_code == HTTPStatus.OK
+        verbose_teams = response.context["verbose_teams"]
+        assert len(verbose_teams) == 32
+        assert verbose_teams[0]["db_team"] == nfl_game.home_team
+        assert verbose_teams[0]["won"] == 1
+        assert verbose_teams[0]["points_diff"] == 21
+        assert verbose_teams[-1]["db_team"] == nfl_game.visitor_team
+        assert verbose_teams[-1]["lost"] == 1
+
+
+@pytest.mark.django_db
+class TestViewQueryCount:
+    @pytest.mark.parametrize(
+        "url_name",
+        [
+            "nfl:standings-week",
+            "nfl:standings-live-week",
+            "nfl:teams-week",
+            "nfl:schedule-week",
+            "nfl:picks-week",
+        ],
+    )
+    def test_query_count_independent_of_data(
+        self, client, url_name, nfl_games, make_pick, make_pick_pool_user, locmem_cache
+    ):
+        def count_queries():
+            # Games are changed without an ingestion run refreshing the cache
+            locmem_cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(reverse(url_name, args=(2019, 5)))
+            assert response.status_code == HTTPStatus.OK
+            return len(ctx)
+
+        games = list(nfl_games)
+        users = [make_pick_pool_user() for _ in range(2)]
+        for user in users:
+            for game in games[:2]:
+                make_pick(user=user, game=game)
+        client.force_login(users[0])
+        few_queries = count_queries()
+
+        users += [make_pick_pool_user() for _ in range(4)]
+        for idx, game in enumerate(games):
+            for user in users if idx >= 2 else users[2:]:
+                make_pick(user=user, game=game, selection=1 + idx % 2)
+            game.final = True
+            game.home_team_score = 10 + idx
+            game.visitor_team_score = 20 - idx
+            game.save()
+        assert count_queries() == few_queries
@@ -1,11 +1,30 @@
 from django.urls import path
 
-from nfl.views import ScheduleView, StandingsView, TeamsView, PicksView
+from nfl.views import (
+    CareerView,
+    HeadToHeadJsonView,
+    HeadToHeadView,
+    LiveEventsView,
+    LiveStandingsView,
+    PickHistoryJsonView,
+    PickHistoryView,
+    PicksView,
+    ScheduleView,
+    StandingsView,
+    TeamsView,
+)
 
 app_name = "nfl"
 urlpatterns = [
     path("", StandingsView.as_view(), name="standings"),
     path("<int:season>/<int:week>/", StandingsView.as_view(), name="standings-week"),
+    path("projected/", LiveStandingsView.as_view(), name="standings-live"),
+    path(
+        "projected/<int:season>/<int:week>/",
+        LiveStandingsView.as_view(),
+        name="standings-live-week",
+    ),
+    path("all-time/", CareerView.as_view(), name="career"),
     path("teams/", TeamsView.as_view(), name="teams"),
     path("teams/<int:season>/<int:week>/", TeamsView.as_view(), name="teams-week"),
     path("schedule/", ScheduleView.as_view(), name="schedule"),
@@ -16,4 +35,20 @@ urlpatterns = [
     ),
     path("picks/", PicksView.as_view(), name="picks"),
     path("picks/<int:season>/<int:week>/", PicksView.as_view(), name="picks-week"),
+    path("head-to-head/", HeadToHeadView.as_view(), name="head-to-head"),
+    path(
+        "head-to-head/<int:season>/<int:week>/",
+        HeadToHeadView.as_view(),
+        name="head-to-head-week",
+    ),
+    path("head-to-head.json", HeadToHeadJsonView.as_view(), name="head-to-head-json"),
+    path(
+        "head-to-head/<int:season>/<int:week>.json",
+        HeadToHeadJsonView.as_view(),
+        name="head-to-head-week-json",
+    ),
+    path("history/", PickHistoryView.as_view(), name="history"),
+    path("history.json", PickHistoryJsonView.as_view(), name="history-json"),
+    path("live/", LiveEventsView.as_view(), name="live"),
+    path("live/<int:season>/<int:week>/", LiveEventsView.as_view(), name="live-week"),
 ]
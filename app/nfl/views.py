@@ -1,25 +1,81 @@
+import asyncio
+import base64
+import binascii
 import logging
 from datetime import datetime, timezone
-
-from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import F, Q
-from django.db.models.aggregates import Count, Sum
-from django.db.models.functions import Coalesce
-from django.views.generic import ListView, TemplateView
-
-from nfl.defines import (
-    CityChoices,
-    SeasonType,
-    StadiumChoices,
-    TeamChoices,
-)
-from nfl.models import Game, Pick, Team, Week
+from typing import Any, Dict, Tuple
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from core.mixins import AsyncLoginRequiredMixin
+from core.models import PickPoolUser
+from django.contrib import messages
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.translation import gettext as _
+from django.views.generic import ListView, TemplateView, View
+
+from nfl.defines import CityChoices, PickChoices, StadiumChoices, TeamChoices
+from nfl.live import event_stream
+from nfl.loaders import RequestLoader
+from nfl.models import Pick, Week, Year
 
 logger = logging.getLogger(__name__)
 
 
-class WeekMixin(object):
+def week_query(kwargs) -> Q:
+    if "season" in kwargs and "week" in kwargs:
+        return Q(year__value=kwargs["season"], value=kwargs["week"])
+    cur_date = datetime.now(timezone.utc)
+    return Q(start_timestamp__lte=cur_date, end_timestamp__gt=cur_date)
+
+
+def history_cursor(pick: Pick) -> str:
+    """Opaque cursor of the page of the pick history after a pick."""
+    key = f"{pick.kickoff.isoformat()}|{pick.game_id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def parse_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Kickoff and game id of a cursor, raises ``ValueError`` if invalid."""
+    try:
+        kickoff, game_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+    except (UnicodeDecodeError, binascii.Error):
+        raise ValueError(f"Invalid cursor {cursor}")
+    return datetime.fromisoformat(kickoff), int(game_id)
+
+
+class DataMixin(object):
+    """Base of all view mixins which load their data asynchronously.
+
+    Mixins contribute coroutines with ``get_data_loaders``, these are awaited
+    concurrently before the context is built, so the context and the template
+    never have to hit the database from within the event loop. All mixins
+    share the request's ``RequestLoader``.
+    """
+
+    @property
+    def loader(self) -> RequestLoader:
+        if not hasattr(self.request, "nfl_loader"):
+            self.request.nfl_loader = RequestLoader()
+        return self.request.nfl_loader
+
+    def get_data_loaders(self):
+        return []
+
+    async def load_data(self):
+        await asyncio.gather(*self.get_data_loaders())
+
+
+class AsyncTemplateView(DataMixin, TemplateView):
+    async def get(self, request, *args, **kwargs):
+        await self.load_data()
+        context = self.get_context_data(**kwargs)
+        return self.render_to_response(context)
+
+
+class WeekMixin(DataMixin):
     week = None
 
     def get_context_data(self, **kwargs):
@@ -27,14 +83,9 @@ class WeekMixin(object):
         context.update({"week": self.week})
         return context
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
-        if "season" in kwargs and "week" in kwargs:
-            query = Q(year__value=kwargs["season"], value=kwargs["week"])
-        else:
-            cur_date = datetime.now(timezone.utc)
-            query = Q(start_timestamp__lte=cur_date, end_timestamp__gt=cur_date)
-        self.week = Week.objects.select_related("year").filter(query).first()
+    async def load_data(self):
+        self.week = await self.loader.week(week_query(self.kwargs))
+        await super().load_data()
 
 
 class SeasonGamesMixin(WeekMixin):
@@ -42,23 +93,13 @@ class SeasonGamesMixin(WeekMixin):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        season_games = self.season_games
-        cur_season_type = self.week.season_type if self.week else SeasonType.OFF
-        if cur_season_type in [SeasonType.REGULAR, SeasonType.POST]:
-            season_games = season_games.exclude(week__value__lt=5)
-        elif cur_season_type == SeasonType.OFF:
-            pass
-        context["season_games"] = season_games
+        context["season_games"] = self.season_games
         return context
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
+    async def load_data(self):
+        await super().load_data()
         if self.week:
-            self.season_games = Game.objects.filter(
-                final=True,
-                week__year__value=self.week.year.value,
-                week__value__lte=self.week.value,
-            )
+            self.season_games = self.loader.season_games(self.week)
 
 
 class WeekGamesMixin(WeekMixin):
@@ -69,15 +110,23 @@ class WeekGamesMixin(WeekMixin):
         context["week_games"] = self.week_games
         return context
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_week_games()]
+
+    async def load_week_games(self):
         if self.week:
-            self.week_games = Game.objects.filter(week=self.week).order_by(
-                "timestamp", "home_team"
+            self.week_games, team_stats, consensus, team_ratings = await asyncio.gather(
+                self.loader.week_games(self.week),
+                self.loader.team_stats(self.week),
+                self.loader.consensus(self.week),
+                self.loader.team_ratings(),
             )
+            self.loader.prime_team_standings(self.week_games, team_stats)
+            self.loader.prime_consensus(self.week_games, consensus)
+            self.loader.prime_win_probabilities(self.week_games, team_ratings)
 
 
-class TeamsMixin(object):
+class TeamsMixin(DataMixin):
     teams = None
 
     def get_context_data(self, **kwargs):
@@ -85,68 +134,49 @@ class TeamsMixin(object):
         context["teams"] = self.teams
         return context
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
-        self.teams = Team.objects.exclude(id__in=(TeamChoices.AFC, TeamChoices.NFC))
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_teams()]
+
+    async def load_teams(self):
+        self.teams = await self.loader.all_teams()
 
 
 class SeasonStandingsMixin(SeasonGamesMixin, TeamsMixin):
+    team_stats = None
+
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_team_stats()]
+
+    async def load_team_stats(self):
+        self.team_stats = {}
+        if self.week:
+            self.team_stats = await self.loader.team_stats(self.week)
+
+    def get_verbose_team(self, team, season_game_agg):
+        if season_game_agg.get("won") or season_game_agg.get("lost"):
+            won_lost_ratio = 1 - season_game_agg.get("lost") / float(
+                season_game_agg.get("won") + season_game_agg.get("lost")
+            )
+        else:
+            won_lost_ratio = 0
+        return {
+            "db_team": team,
+            "city": CityChoices(team.city).label,
+            "stadium": StadiumChoices(team.stadium).label,
+            "won": season_game_agg.get("won") or 0,
+            "lost": season_game_agg.get("lost") or 0,
+            "tie": season_game_agg.get("tie") or 0,
+            "won_lost_ratio": won_lost_ratio,
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         verbose_teams = []
-        if self.teams and self.season_games:
-            for team in self.teams:
-                season_team_games = self.season_games.filter(
-                    Q(home_team=team.id) | Q(visitor_team=team.id),
-                )
-                season_game_agg = season_team_games.aggregate(
-                    won=Count(
-                        "id",
-                        filter=Q(
-                            home_team=team.id,
-                            home_team_score__gt=F("visitor_team_score"),
-                        ),
-                    )
-                    + Count(
-                        "id",
-                        filter=Q(
-                            visitor_team=team.id,
-                            visitor_team_score__gt=F("home_team_score"),
-                        ),
-                    ),
-                    lost=Count(
-                        "id",
-                        filter=Q(
-                            home_team=team.id,
-                            home_team_score__lt=F("visitor_team_score"),
-                        ),
-                    )
-                    + Count(
-                        "id",
-                        filter=Q(
-                            visitor_team=team.id,
-                            visitor_team_score__lt=F("home_team_score"),
-                        ),
-                    ),
-                    tie=Count("id", filter=Q(home_team_score=F("visitor_team_score"))),
-                )
-                if season_game_agg.get("won") or season_game_agg.get("lost"):
-                    won_lost_ratio = 1 - season_game_agg.get("lost") / float(
-                        season_game_agg.get("won") + season_game_agg.get("lost")
-                    )
-                else:
-                    won_lost_ratio = 0
-                verbose_teams.append(
-                    {
-                        "db_team": team,
-                        "city": CityChoices(team.city).label,
-                        "stadium": StadiumChoices(team.stadium).label,
-                        "won": season_game_agg.get("won") or 0,
-                        "lost": season_game_agg.get("lost") or 0,
-                        "tie": season_game_agg.get("tie") or 0,
-                        "won_lost_ratio": won_lost_ratio,
-                    }
-                )
+        if self.teams and self.team_stats:
+            verbose_teams = [
+                self.get_verbose_team(team, self.team_stats.get(team.id, {}))
+                for team in self.teams
+            ]
         context.update(
             {
                 "verbose_teams": sorted(
@@ -160,70 +190,25 @@ class SeasonStandingsMixin(SeasonGamesMixin, TeamsMixin):
 
 
 class SeasonPointsMixin(SeasonStandingsMixin):
+    def get_verbose_team(self, team, season_game_agg):
+        verbose_team = super().get_verbose_team(team, season_game_agg)
+        if season_game_agg.get("points_for") or season_game_agg.get("points_against"):
+            points_diff = season_game_agg.get("points_for", 0) - season_game_agg.get(
+                "points_against", 0
+            )
+        else:
+            points_diff = 0
+        verbose_team.update(
+            {
+                "points_for": season_game_agg.get("points_for") or 0,
+                "points_against": season_game_agg.get("points_against") or 0,
+                "points_diff": points_diff,
+            }
+        )
+        return verbose_team
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        for team in context.get("verbose_teams"):
-            season_team_games = context.get("season_games").filter(
-                Q(home_team=team.get("db_team").id)
-                | Q(visitor_team=team.get("db_team").id),
-            )
-            season_game_agg = season_team_games.aggregate(
-                points_for=Coalesce(
-                    Sum(
-                        "home_team_score",
-                        filter=Q(
-                            home_team=team.get("db_team").id,
-                            home_team_score__gt=F("visitor_team_score"),
-                        ),
-                    ),
-                    0,
-                )
-                + Coalesce(
-                    Sum(
-                        "visitor_team_score",
-                        filter=Q(
-                            visitor_team=team.get("db_team").id,
-                            visitor_team_score__gt=F("home_team_score"),
-                        ),
-                    ),
-                    0,
-                ),
-                points_against=Coalesce(
-                    Sum(
-                        "visitor_team_score",
-                        filter=Q(
-                            home_team=team.get("db_team").id,
-                            home_team_score__lt=F("visitor_team_score"),
-                        ),
-                    ),
-                    0,
-                )
-                + Coalesce(
-                    Sum(
-                        "home_team_score",
-                        filter=Q(
-                            visitor_team=team.get("db_team").id,
-                            visitor_team_score__lt=F("home_team_score"),
-                        ),
-                    ),
-                    0,
-                ),
-            )
-            if season_game_agg.get("points_for") or season_game_agg.get(
-                "points_against"
-            ):
-                points_diff = season_game_agg.get(
-                    "points_for", 0
-                ) - season_game_agg.get("points_against", 0)
-            else:
-                points_diff = 0
-            team.update(
-                {
-                    "points_for": season_game_agg.get("points_for") or 0,
-                    "points_against": season_game_agg.get("points_against") or 0,
-                    "points_diff": points_diff,
-                }
-            )
         context.update(
             {
                 "verbose_teams": sorted(
@@ -236,25 +221,304 @@ class SeasonPointsMixin(SeasonStandingsMixin):
         return context
 
 
-class ScheduleView(WeekGamesMixin, TemplateView):
+class ScheduleView(WeekGamesMixin, AsyncTemplateView):
+    query_budget = 10
     template_name = "nfl/schedule.html"
 
 
-class StandingsView(LoginRequiredMixin, WeekMixin, TemplateView):
+class StandingsView(AsyncLoginRequiredMixin, WeekMixin, AsyncTemplateView):
+    query_budget = 5
     login_url = "/login/"
     template_name = "nfl/standings.html"
+    standings = None
+    simulated = False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({"standings": self.standings, "simulated": self.simulated})
+        return context
+
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_standings()]
+
+    async def load_standings(self):
+        self.standings = {}
+        if self.week:
+            players, season_standings, (week_sim, season_sim) = await asyncio.gather(
+                self.loader.all_users(),
+                self.loader.season_standings(self.week.year.value),
+                self.loader.simulations(self.week),
+            )
+            self.standings = {
+                player: season_standings.get(
+                    player.id, {"points": 0, "won": 0, "lost": 0, "won_lost_ratio": 0}
+                )
+                for player in players
+            }
+            # Win probabilities once simulated after a score change
+            self.simulated = bool(week_sim or season_sim)
+            if self.simulated:
+                for player, standings in self.standings.items():
+                    self.standings[player] = dict(
+                        standings,
+                        week_simulation=week_sim.get(player.id),
+                        season_simulation=season_sim.get(player.id),
+                    )
+
+
+class LiveStandingsView(StandingsView):
+    """Standings with the points the picks of the live games would get if
+    they ended with the current score.
+
+    Projected points are shown next to the confirmed ones of the week and
+    the season. They are kept up to date by the ingestion, see
+    ``LiveProjection``, rebuilding them costs two more queries.
+    """
+
+    query_budget = 8
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        standings = {}
-        pick_pool_user = get_user_model()
-        for player in pick_pool_user.objects.all():
-            standings[player] = player.standings(self.week.year.value)
-        context.update({"standings": standings})
+        context.update({"live": True})
         return context
 
+    async def load_standings(self):
+        await super().load_standings()
+        if self.week:
+            week_points, projection = await asyncio.gather(
+                self.loader.week_points(self.week),
+                self.loader.live_projection(self.week),
+            )
+            for player, standings in self.standings.items():
+                week = week_points.get(player.id, 0)
+                projected = projection.points.get(player.id, 0)
+                self.standings[player] = dict(
+                    standings,
+                    week=week,
+                    projected=projected,
+                    week_live=week + projected,
+                    points_live=standings["points"] + projected,
+                )
+
+
+class CareerView(AsyncLoginRequiredMixin, AsyncTemplateView):
+    """All-time standings of all players, see
+    ``RequestLoader.career_standings``."""
 
-class TeamsView(LoginRequiredMixin, SeasonPointsMixin, TemplateView):
+    # The rollup of the current season adds three queries until it's cached
+    query_budget = 9
+    login_url = "/login/"
+    template_name = "nfl/career.html"
+    careers = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({"careers": self.careers})
+        return context
+
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_careers()]
+
+    async def load_careers(self):
+        players, careers = await asyncio.gather(
+            self.loader.all_users(),
+            self.loader.career_standings(),
+        )
+        self.careers = sorted(
+            (
+                (player, careers[player.id])
+                for player in players
+                if player.id in careers
+            ),
+            key=lambda i: (i[1]["points"], i[1]["won_lost_ratio"]),
+            reverse=True,
+        )
+
+
+class PlayerMixin(DataMixin):
+    """The user a page is about, see ``select_player``."""
+
+    player = None
+
+    def select_player(self, players: Dict[int, PickPoolUser]) -> PickPoolUser:
+        """The player of the ``user`` parameter, the requesting one if not
+        given or unknown."""
+        try:
+            player = players.get(int(self.request.GET["user"]))
+        except (KeyError, ValueError):
+            player = None
+        return player or players.get(self.request.user.id)
+
+
+class HeadToHeadMixin(PlayerMixin, WeekMixin):
+    """Agreement and head-to-head records of a user, the requesting one or
+    the one of the ``user`` parameter, with all other users of a season."""
+
+    head_to_head = None
+
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_head_to_head()]
+
+    async def load_head_to_head(self):
+        self.head_to_head = []
+        if not self.week:
+            return
+        players, matrix = await asyncio.gather(
+            self.loader.all_users(),
+            self.loader.pick_matrix(self.week.year.value),
+        )
+        players = {player.id: player for player in players}
+        self.player = self.select_player(players)
+        comparisons = matrix.compare(self.player.id) if self.player else {}
+        self.head_to_head = sorted(
+            (
+                (players[user_id], stats)
+                for user_id, stats in comparisons.items()
+                if user_id in players
+            ),
+            key=lambda i: (i[1]["agreement"], i[1]["games"]),
+            reverse=True,
+        )
+
+
+class HeadToHeadView(AsyncLoginRequiredMixin, HeadToHeadMixin, AsyncTemplateView):
+    query_budget = 7
+    login_url = "/login/"
+    template_name = "nfl/head_to_head.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({"player": self.player, "head_to_head": self.head_to_head})
+        return context
+
+
+class HeadToHeadJsonView(AsyncLoginRequiredMixin, HeadToHeadMixin, View):
+    query_budget = 7
+
+    async def get(self, request, *args, **kwargs):
+        await self.load_data()
+        return JsonResponse(
+            {
+                "season": self.week.year.value if self.week else None,
+                "user": self.player.id if self.player else None,
+                "head_to_head": [
+                    dict(stats, user=player.id, first_name=player.first_name)
+                    for player, stats in self.head_to_head
+                ],
+            }
+        )
+
+
+class PickHistoryMixin(PlayerMixin):
+    """A page of the pick history of a user, the requesting one or the one of
+    the ``user`` parameter, filtered by the ``season``, ``team`` and
+    ``result`` parameters. Other users' picks are shown once the game
+    kicked off.
+
+    The ``cursor`` parameter selects the page, see ``PickManager.history``.
+    """
+
+    picks = None
+    filters = None
+    next_cursor = None
+
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_history()]
+
+    async def load_history(self):
+        self.picks, self.filters = [], self.parse_filters()
+        players = {player.id: player for player in await self.loader.all_users()}
+        self.player = self.select_player(players)
+        if self.player is None:
+            return
+        filters = dict(self.filters)
+        if self.player.id != self.request.user.id:
+            filters["until"] = datetime.now(timezone.utc)
+        try:
+            filters["cursor"] = parse_history_cursor(self.request.GET["cursor"])
+        except (KeyError, ValueError):
+            pass
+        if "season" in filters:
+            filters["season"] = await Year.objects.filter(
+                value=filters["season"]
+            ).afirst()
+            if filters["season"] is None:
+                return
+        limit = settings.NFL_HISTORY_PAGE_SIZE
+        picks = await self.loader.pick_history(self.player, limit + 1, **filters)
+        self.picks = picks[:limit]
+        if len(picks) > limit:
+            self.next_cursor = history_cursor(self.picks[-1])
+
+    def parse_filters(self) -> Dict[str, Any]:
+        """The valid ``season``, ``team`` and ``result`` parameters, invalid
+        ones are ignored."""
+        params, filters = self.request.GET, {}
+        for name in ("season", "team"):
+            try:
+                filters[name] = int(params[name])
+            except (KeyError, ValueError):
+                pass
+        if "team" in filters and filters["team"] not in TeamChoices.values:
+            del filters["team"]
+        if params.get("result") in Pick.objects.history_results:
+            filters["result"] = params["result"]
+        return filters
+
+
+class PickHistoryView(AsyncLoginRequiredMixin, PickHistoryMixin, AsyncTemplateView):
+    query_budget = 7
+    login_url = "/login/"
+    template_name = "nfl/history.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = dict(self.filters, user=self.player.id) if self.player else {}
+        context.update(
+            {
+                "player": self.player,
+                "history": self.picks,
+                "filters": self.filters,
+                "teams": TeamChoices.choices,
+                "next_query": (
+                    urlencode(dict(params, cursor=self.next_cursor))
+                    if self.next_cursor
+                    else None
+                ),
+            }
+        )
+        return context
+
+
+class PickHistoryJsonView(AsyncLoginRequiredMixin, PickHistoryMixin, View):
+    query_budget = 7
+
+    async def get(self, request, *args, **kwargs):
+        await self.load_data()
+        return JsonResponse(
+            {
+                "user": self.player.id if self.player else None,
+                "picks": [
+                    {
+                        "game": pick.game_id,
+                        "kickoff": pick.kickoff,
+                        "home_team": pick.game.home_team_id,
+                        "visitor_team": pick.game.visitor_team_id,
+                        "home_team_score": pick.game.home_team_score,
+                        "visitor_team_score": pick.game.visitor_team_score,
+                        "selection": pick.selection,
+                        "correct": pick.correct,
+                        "points": pick.points,
+                    }
+                    for pick in self.picks
+                ],
+                "next": self.next_cursor,
+            }
+        )
+
+
+class TeamsView(AsyncLoginRequiredMixin, SeasonPointsMixin, AsyncTemplateView):
+    query_budget = 7
     login_url = "/login/"
     template_name = "nfl/teams.html"
 
@@ -272,45 +536,75 @@ class TeamsView(LoginRequiredMixin, SeasonPointsMixin, TemplateView):
         return context
 
 
-class PicksView(LoginRequiredMixin, WeekGamesMixin, ListView):
+class LiveEventsView(View):
+    """Push score, final and standings events of a week as server-sent events."""
+
+    query_budget = 3
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return HttpResponseForbidden()
+        week = await Week.objects.filter(week_query(kwargs)).afirst()
+        response = StreamingHttpResponse(
+            event_stream(
+                week.id if week else None, request.headers.get("Last-Event-ID")
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class PicksView(AsyncLoginRequiredMixin, WeekGamesMixin, ListView):
+    # Submitting picks adds two queries and a BEGIN on SQLite
+    query_budget = 18
     context_object_name = "picks"
     login_url = "/login/"
     model = Pick
     template_name = "nfl/picks.html"
+    season_scores = None
+    contrarian = None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.week_games and self.context_object_name in context:
             picks = context.get(self.context_object_name)
-            user_picks = picks.filter(user=self.request.user)
+            user_picks = [
+                pick for pick in picks if pick.user_id == self.request.user.id
+            ]
             picked_games = [pick.game for pick in user_picks]
+            picked_game_ids = [g.id for g in picked_games]
             now_dt = datetime.now(timezone.utc)
-            missed_games = list(
-                self.week_games.filter(timestamp__lte=now_dt).exclude(
-                    id__in=[g.id for g in picked_games]
-                )
-            )
+            missed_games = [
+                g
+                for g in self.week_games
+                if g.timestamp <= now_dt and g.id not in picked_game_ids
+            ]
             overview_games = picked_games + missed_games
-            unpicked_games = list(
-                self.week_games.exclude(Q(id__in=[g.id for g in overview_games]))
-            )
+            unpicked_games = [
+                g for g in self.week_games if g.id not in [o.id for o in overview_games]
+            ]
             new_picks = {}
             for pick in picks:
                 try:
                     new_picks[pick.user]["picks"].append(pick)
                 except KeyError:
-                    new_picks[pick.user] = {"picks": [pick], "score": 0, "season": 0}
-                if pick.game.winner and pick.selection == pick.game.winner:
-                    new_picks[pick.user]["score"] += 1
+                    new_picks[pick.user] = {
+                        "picks": [pick],
+                        "score": self.week_points.get(pick.user.id, 0),
+                        "season": 0,
+                    }
             for idx, game in enumerate(self.week_games):
                 for user, picks in new_picks.items():
                     if game not in [
                         p.game if isinstance(p, Pick) else p for p in picks["picks"]
                     ]:
-                        picks["picks"].insert(
-                            idx, "missed"
-                        ) if game.timestamp < now_dt else picks["picks"].insert(
-                            idx, None
+                        (
+                            picks["picks"].insert(idx, "missed")
+                            if game.timestamp < now_dt
+                            else picks["picks"].insert(idx, None)
                         )
             if len(missed_games) or len(unpicked_games):
                 for idx, game in enumerate(self.week_games):
@@ -320,46 +614,70 @@ class PicksView(LoginRequiredMixin, WeekGamesMixin, ListView):
                                 continue
                             picks["picks"][idx] = None
             for user, res_dict in new_picks.items():
-                cur_standings = user.standings(self.week.year.value)
-                res_dict["season_score"] = cur_standings.get("won")
+                res_dict["season_score"] = self.season_scores.get(user.id, {}).get(
+                    "points", 0
+                )
+                res_dict["contrarian"] = self.contrarian.get(user.id, {}).get(
+                    "score", 0
+                )
             context[self.context_object_name] = new_picks
             context["unpicked_games"] = unpicked_games
         return context
 
-    def get_queryset(self):
-        try:
-            if self.week_games and self.week_games.exists():
-                return Pick.objects.filter(game__in=self.week_games).order_by(
-                    "user__first_name", "game__timestamp", "game__home_team",
+    def get_data_loaders(self):
+        return super().get_data_loaders() + [self.load_picks()]
+
+    async def load_picks(self):
+        self.object_list = []
+        self.week_points = {}
+        self.season_scores = {}
+        self.contrarian = {}
+        if self.week:
+            self.object_list, self.week_points, self.season_scores, self.contrarian = (
+                await asyncio.gather(
+                    self.loader.week_picks(self.week),
+                    self.loader.week_points(self.week),
+                    self.loader.season_standings(self.week.year.value),
+                    self.loader.contrarian(self.week.year.value),
                 )
-        except Pick.DoesNotExist:
-            pass
-        return Pick.objects.none()
+            )
+
+    async def get(self, request, *args, **kwargs):
+        await self.load_data()
+        context = self.get_context_data()
+        return self.render_to_response(context)
+
+    async def post(self, request, *args, **kwargs):
+        await sync_to_async(self.save_picks)(request)
+        return await self.get(request, *args, **kwargs)
 
-    def post(self, request, *args, **kwargs):
-        picks = []
+    def save_picks(self, request):
+        selections = {}
         for k, v in request.POST.items():
             if k[:4] != "pick":
                 continue
-            game_id = k.split("_")[1]
             tie_break = 0
             try:
-                pick_choice, tie_break = v.split("_")
-            except ValueError:
-                pick_choice = v
-            try:
-                game = Game.objects.get(id=game_id)
-            except Game.DoesNotExist:
-                logger.warning(f"Unknown game_id={game_id}")
+                game_id = int(k.split("_")[1])
+                try:
+                    pick_choice, tie_break = map(int, v.split("_"))
+                except ValueError:
+                    pick_choice = int(v)
+                selection = PickChoices(pick_choice)
+            except (IndexError, ValueError):
+                logger.warning(f"Invalid pick {k}={v}")
                 continue
-            picks.append(
-                Pick(
-                    user=request.user,
-                    game=game,
-                    selection=pick_choice,
-                    picked_tie_break=tie_break,
-                )
+            if selection == PickChoices.TBP or tie_break < 0:
+                logger.warning(f"Invalid pick {k}={v}")
+                continue
+            selections[game_id] = (selection, tie_break)
+        if not selections:
+            return
+        _picks, rejected = Pick.objects.submit(request.user, selections)
+        if rejected:
+            logger.warning(f"Rejected picks of user={request.user.id} games={rejected}")
+            messages.warning(
+                request,
+                _("%(count)d picks were rejected, the games already started.")
+                % {"count": len(rejected)},
             )
-        if len(picks):
-            Pick.objects.bulk_create(picks)
-        return self.get(request, *args, **kwargs)
@@ -30,8 +30,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestStatsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -72,8 +74,26 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "secret"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", "3306"),
+        # Keep connections per worker thread, checked before their reuse
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "300")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
+# Threads with persistent connections kept per ASGI worker process
+ASGI_DB_THREADS = int(os.environ.get("ASGI_DB_THREADS", "8"))
+# Read replicas of the default database, e.g. DB_REPLICA_HOSTS=db-r1,db-r2
+DATABASE_REPLICAS = []
+replica_hosts = os.environ.get("DB_REPLICA_HOSTS", "").split(",")
+for idx, host in enumerate(filter(None, replica_hosts)):
+    DATABASE_REPLICAS.append(f"replica_{idx}")
+    DATABASES[f"replica_{idx}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Seconds a user reads from the primary after writing
+REPLICA_STICKY_SECONDS = 10
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 
@@ -112,9 +132,56 @@ STATIC_ROOT = str((Path(BASE_DIR) / "static").resolve())
 
 AUTH_USER_MODEL = "core.PickPoolUser"
 
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/?db=0")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}
+# Cached season standings and team stats are versioned per season
+NFL_AGGREGATES_CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+# Progress of backfills, see nfl.backfill, failed weeks can be retried until then
+NFL_BACKFILL_TIMEOUT = 60 * 60 * 24 * 7  # seconds
+# Requests per second and burst of all processes per ESPN endpoint, see nfl.ratelimit
+NFL_ESPN_RATE_LIMITS = {
+    "default": (10, 20),
+    "score": (20, 40),
+}
+# Share of the burst background requests like backfills leave to the live sync
+NFL_ESPN_RATE_RESERVE = 0.5
+# Simulations of "who can still win", results are cached per inputs
+NFL_SIMULATIONS = 100_000
+NFL_SIMULATION_CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+# Picks of a season for head-to-head comparisons, see nfl.headtohead
+NFL_HEAD_TO_HEAD_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # seconds
+# Picks per page of the pick history
+NFL_HISTORY_PAGE_SIZE = 50
+# Scoring rules of the pool, see nfl.scoring. Stored points are recomputed
+# with manage.py score_picks after a change.
+NFL_SCORING_RULES = [
+    {"RULE": "nfl.scoring.CorrectPick", "OPTIONS": {"points": 1}},
+]
+# Elo ratings of the teams, see nfl.ratings
+NFL_ELO_K = 20
+NFL_ELO_HOME_ADVANTAGE = 48  # rating points
+NFL_ELO_REVERSION = 1 / 3  # share reverted to the mean between seasons
+
 HUEY = {
+    # Tasks with a higher priority are dequeued first, see core.tasks
+    "huey_class": "huey.PriorityRedisHuey",
     "immediate": DEBUG,
     "immediate_use_memory": DEBUG,
-    "connection": {"url": os.environ.get("REDIS_URL", "redis://redis:6379/?db=0")},
+    "connection": {"url": REDIS_URL},
     "consumer": {"workers": 2},
 }
+
+
+# Live score events (server-sent events)
+
+NFL_LIVE_HEARTBEAT_INTERVAL = 15  # seconds
+NFL_LIVE_REPLAY_SIZE = 1000  # events kept for Last-Event-ID replay
+NFL_LIVE_RETRY = 5000  # milliseconds until a browser reconnects
+# Projected points of the picks of live games, see nfl.projections
+NFL_PROJECTION_CACHE_TIMEOUT = 60 * 60 * 24  # seconds